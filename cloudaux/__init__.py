@@ -1,4 +1,4 @@
-from cloudaux.aws.sts import sts_conn
+from cloudaux.aws.sts import sts_conn, ConnectionPool
 
 
 class CloudAux:
@@ -9,12 +9,16 @@ class CloudAux:
             **{'account_number': '000000000000',
                'assume_role': 'role_name',
             })
+
+        The clients are reused across calls. Pass in a `connection_pool` to share them between CloudAux objects.
         """
         self.conn_details = {
             'session_name': 'cloudaux',
             'region': 'us-east-1'
         }
         self.conn_details.update(kwargs)
+        if self.conn_details.get('connection_pool') is None:
+            self.conn_details['connection_pool'] = ConnectionPool()
 
     def call(self, function_expr, **kwargs):
         """
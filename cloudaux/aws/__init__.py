@@ -0,0 +1 @@
+from cloudaux.aws.sts import sts_conn, ConnectionPool
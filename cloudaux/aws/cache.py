@@ -0,0 +1,144 @@
+"""
+.. module: cloudaux.aws.cache
+    :platform: Unix
+    :copyright: (c) 2018 by Netflix Inc., see AUTHORS for more
+    :license: Apache, see LICENSE for more details.
+"""
+from collections import OrderedDict
+import copy
+import datetime
+import threading
+
+import dateutil.tz
+
+
+class AWSCache(object):
+    """
+    LRU cache of AWS responses, with a TTL per item.
+
+    Disabled by default. Call `enable_cache()` to opt in to caching the responses
+    of the wrappers decorated with `aws_cache`.
+    """
+
+    def __init__(self, max_size=1024):
+        self.enabled = False
+        self.max_size = max_size
+        self.ttls = {}
+        self._CACHE = OrderedDict()
+        self._CACHE_STATS = {'access_stats': {}}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Retrieve key from Cache.
+
+        :param key: key to look up in cache. key[0] must be the (service, operation) tuple
+                    that the stats are recorded against.
+        :returns: (found, value) -- value is a copy of the cached item.
+        """
+        operation = key[0]
+        with self._lock:
+            self._update_cache_stats(operation, None)
+
+            if key in self._CACHE:
+                (expiration, obj) = self._CACHE[key]
+                if expiration > self._now():
+                    self._CACHE.move_to_end(key)
+                    self._update_cache_stats(operation, 'hit')
+                    return True, copy.deepcopy(obj)
+
+                del self._CACHE[key]
+                self._update_cache_stats(operation, 'expired')
+                return False, None
+
+            self._update_cache_stats(operation, 'miss')
+            return False, None
+
+    def insert(self, key, obj, future_expiration_minutes=15):
+        """
+        Insert item into cache, evicting the least recently used items if the cache is full.
+
+        The TTL set for the operation in `ttls` (if any) overrides future_expiration_minutes.
+        """
+        operation = key[0]
+        future_expiration_minutes = self.ttls.get(operation[1], future_expiration_minutes)
+        expiration_time = self._now() + datetime.timedelta(minutes=future_expiration_minutes)
+
+        with self._lock:
+            self._CACHE[key] = (expiration_time, copy.deepcopy(obj))
+            self._CACHE.move_to_end(key)
+
+            while len(self._CACHE) > self.max_size:
+                evicted_key, _ = self._CACHE.popitem(last=False)
+                self._update_cache_stats(evicted_key[0], None)
+                self._update_cache_stats(evicted_key[0], 'evicted')
+
+        return True
+
+    def clear(self):
+        with self._lock:
+            self._CACHE = OrderedDict()
+            self._CACHE_STATS = {'access_stats': {}}
+
+    def _now(self):
+        return datetime.datetime.now(dateutil.tz.tzutc())
+
+    def _update_cache_stats(self, operation, result):
+        """
+        Update the cache stats.
+
+        If no cache-result is specified, we initialize the operation.
+        Otherwise, we increment the correct cache-result.
+        """
+        if result is None:
+            self._CACHE_STATS['access_stats'].setdefault(operation,
+                                                         {'hit': 0, 'miss': 0, 'expired': 0, 'evicted': 0})
+        else:
+            self._CACHE_STATS['access_stats'][operation][result] += 1
+
+    def get_access_details(self, operation=None):
+        """Get access details in cache, for a (service, operation) tuple or for all operations."""
+        if operation in self._CACHE_STATS['access_stats']:
+            return self._CACHE_STATS['access_stats'][operation]
+        else:
+            return self._CACHE_STATS['access_stats']
+
+    def get_stats(self):
+        """Get general stats for the cache."""
+        totals = {'keys': len(self._CACHE), 'hit': 0, 'miss': 0, 'expired': 0, 'evicted': 0}
+        for stats in self._CACHE_STATS['access_stats'].values():
+            for result, count in stats.items():
+                totals[result] += count
+
+        return {'totals': totals}
+
+
+_AWS_CACHE = AWSCache()
+
+
+def enable_cache(max_size=1024, ttls=None):
+    """
+    Opt in to caching the responses of the read-only wrappers decorated with `aws_cache`.
+
+    :param max_size: Maximum number of responses to keep. The least recently used are evicted first.
+    :param ttls: Optional dict of operation name (i.e. 'describe_images') -> minutes to cache its responses for.
+    """
+    _AWS_CACHE.max_size = max_size
+    _AWS_CACHE.ttls = dict(ttls or {})
+    _AWS_CACHE.enabled = True
+
+
+def disable_cache():
+    """Stops caching, and drops the cached responses and stats."""
+    _AWS_CACHE.enabled = False
+    _AWS_CACHE.clear()
+
+
+def get_cache_stats():
+    """Helper to retrieve stats cache."""
+    return _AWS_CACHE.get_stats()
+
+
+def get_cache_access_details(operation=None):
+    """Retrieve detailed cache information."""
+    return _AWS_CACHE.get_access_details(operation=operation)
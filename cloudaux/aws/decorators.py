@@ -7,13 +7,26 @@
 .. moduleauthor:: Mike Grima <mgrima@netflix.com>
 """
 import functools
+import json
 import time
 
 import boto
 import botocore
 
+from cloudaux.aws.cache import _AWS_CACHE
+from cloudaux.stats import StatsRegistry, timed
+
 RATE_LIMITING_ERRORS = ['Throttling', 'RequestLimitExceeded', 'SlowDown', 'RequestThrottled']
 
+# Only the responses of operations with these prefixes may be cached:
+READ_ONLY_OPERATION_PREFIXES = ('describe_', 'list_', 'get_')
+
+_AWS_STATS = StatsRegistry()
+
+# Connection details that don't change the response, and are left out of the cache keys:
+_UNCACHED_CONN_KWARGS = frozenset(['session_name', 'external_id', 'retry_max_attempts', 'sts_client_kwargs',
+                                   'client_kwargs', 'connection_pool'])
+
 
 def rate_limited(max_attempts=None, max_delay=4):
     def decorator(f):
@@ -76,3 +89,102 @@ def paginated(response_key, request_pagination_marker="Marker", response_paginat
             return results
         return decorated_function
     return decorator
+
+
+def iter_pages(func, kwargs, request_pagination_marker="NextToken", response_pagination_marker="NextToken"):
+    """
+    Yields the response pages of func, one request at a time, following the pagination markers like `paginated`.
+
+    Each page is fetched by a separate call to func, so wrap it in `rate_limited` to retry the pages on throttling.
+    """
+    kwargs = dict(kwargs)
+    while True:
+        response = func(**kwargs)
+        yield response
+
+        if not response.get(response_pagination_marker):
+            break
+        kwargs[request_pagination_marker] = response[response_pagination_marker]
+
+
+def paginated_iterator(response_key, request_pagination_marker="NextToken", response_pagination_marker="NextToken",
+                       page_size_key="MaxResults"):
+    """
+    Streams the items under `response_key`, one page at a time.
+
+    The decorated function makes a single request (and should be `rate_limited`, so that each page fetch
+    is retried on throttling). It is called again for each page, with the request pagination marker set
+    from the previous response. Pages are only fetched as the items are consumed, so memory stays bounded
+    by the page size. Pass `max_results` to set the page size (`page_size_key`).
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def decorated_function(*args, **kwargs):
+            max_results = kwargs.pop('max_results', None)
+            if max_results:
+                kwargs[page_size_key] = max_results
+
+            pages = iter_pages(lambda **page_kwargs: func(*args, **page_kwargs), kwargs,
+                               request_pagination_marker=request_pagination_marker,
+                               response_pagination_marker=response_pagination_marker)
+            return (item for page in pages for item in page.get(response_key, []))
+        return decorated_function
+    return decorator
+
+
+def aws_cache(future_expiration_minutes=15):
+    """
+    Caches the responses of an idempotent (describe/list/get) wrapper. Must be applied above `sts_conn`.
+
+    Caching is opt-in: responses are only cached after `cloudaux.aws.cache.enable_cache()` is called.
+    Responses are keyed on the account, region, service (the wrapper's module), operation and the
+    normalized arguments. Calls made with `force_client` are never cached.
+
+    :param future_expiration_minutes: Default number of minutes to cache the responses for. This can be
+                                      overridden per operation with the `ttls` passed to `enable_cache()`.
+    """
+    def decorator(func):
+        if not func.__name__.startswith(READ_ONLY_OPERATION_PREFIXES):
+            raise ValueError('Refusing to cache {}: only describe, list, and get operations can be cached.'.format(
+                func.__name__))
+
+        operation = (func.__module__.split('.')[-1], func.__name__)
+
+        @functools.wraps(func)
+        def decorated_function(*args, **kwargs):
+            if not _AWS_CACHE.enabled or kwargs.get('force_client'):
+                return func(*args, **kwargs)
+
+            key_kwargs = {k: v for k, v in kwargs.items() if k not in _UNCACHED_CONN_KWARGS}
+            key = (
+                operation,
+                kwargs.get('account_number'),
+                kwargs.get('region', 'us-east-1'),
+                json.dumps([args, key_kwargs], sort_keys=True, default=str)
+            )
+
+            found, result = _AWS_CACHE.get(key)
+            if found:
+                return result
+
+            result = func(*args, **kwargs)
+            _AWS_CACHE.insert(key, result, future_expiration_minutes)
+            return result
+
+        return decorated_function
+    return decorator
+
+
+def aws_stats():
+    """Times each call to the decorated function. See `get_aws_stats()`."""
+    return timed(_AWS_STATS)
+
+
+def get_aws_stats(reset=False):
+    """
+    Retrieve the timings of the functions decorated with `aws_stats`.
+
+    :param reset: Clear the stats after taking this snapshot. Default is False.
+    :returns: dict of function name -> count, sum, min, max, mean, p50, p90 and p99 of the call durations.
+    """
+    return _AWS_STATS.snapshot(reset=reset)
@@ -9,7 +9,7 @@
 """
 from cloudaux.aws.sts import sts_conn
 from cloudaux.exceptions import CloudAuxException
-from cloudaux.aws.decorators import rate_limited, paginated
+from cloudaux.aws.decorators import aws_cache, rate_limited, paginated, paginated_iterator
 
 
 @sts_conn('ec2')
@@ -89,7 +89,7 @@ def add_groups_to_instance(instance_id, groups, account_number=None, region=None
 @sts_conn('ec2')
 @rate_limited()
 def describe_instances(**kwargs):
-    return kwargs.pop('client').get_paginator('describe_instances').paginate()
+    return kwargs.pop('client').get_paginator('describe_instances').paginate(**kwargs)
 
 
 @sts_conn('ec2')
@@ -98,6 +98,7 @@ def describe_vpn_connections(**kwargs):
     return kwargs.pop('client').describe_vpn_connections(**kwargs).get("VpnConnections", [])
 
 
+@aws_cache()
 @sts_conn('ec2')
 @rate_limited()
 def describe_images(**kwargs):
@@ -210,3 +211,88 @@ def describe_flow_logs(**kwargs):
     return kwargs.pop('client').describe_flow_logs(**kwargs).get("FlowLogs", [])
 # ------------------ #
 
+
+# -------------------------------------------- #
+# Streaming variants, fetched a page at a time #
+# -------------------------------------------- #
+@sts_conn('ec2')
+@paginated_iterator('Reservations')
+@rate_limited()
+def iter_reservations(client=None, **kwargs):
+    return client.describe_instances(**kwargs)
+
+
+def iter_instances(**kwargs):
+    for reservation in iter_reservations(**kwargs):
+        for instance in reservation.get('Instances', []):
+            yield instance
+
+
+@sts_conn('ec2')
+@paginated_iterator('Images')
+@rate_limited()
+def iter_images(client=None, **kwargs):
+    return client.describe_images(**kwargs)
+
+
+@sts_conn('ec2')
+@paginated_iterator('SecurityGroups')
+@rate_limited()
+def iter_security_groups(client=None, **kwargs):
+    return client.describe_security_groups(**kwargs)
+
+
+@sts_conn('ec2')
+@paginated_iterator('Vpcs')
+@rate_limited()
+def iter_vpcs(client=None, **kwargs):
+    return client.describe_vpcs(**kwargs)
+
+
+@sts_conn('ec2')
+@paginated_iterator('DhcpOptions')
+@rate_limited()
+def iter_dhcp_options(client=None, **kwargs):
+    return client.describe_dhcp_options(**kwargs)
+
+
+@sts_conn('ec2')
+@paginated_iterator('InternetGateways')
+@rate_limited()
+def iter_internet_gateways(client=None, **kwargs):
+    return client.describe_internet_gateways(**kwargs)
+
+
+@sts_conn('ec2')
+@paginated_iterator('VpcPeeringConnections')
+@rate_limited()
+def iter_vpc_peering_connections(client=None, **kwargs):
+    return client.describe_vpc_peering_connections(**kwargs)
+
+
+@sts_conn('ec2')
+@paginated_iterator('Subnets')
+@rate_limited()
+def iter_subnets(client=None, **kwargs):
+    return client.describe_subnets(**kwargs)
+
+
+@sts_conn('ec2')
+@paginated_iterator('RouteTables')
+@rate_limited()
+def iter_route_tables(client=None, **kwargs):
+    return client.describe_route_tables(**kwargs)
+
+
+@sts_conn('ec2')
+@paginated_iterator('NetworkAcls')
+@rate_limited()
+def iter_network_acls(client=None, **kwargs):
+    return client.describe_network_acls(**kwargs)
+
+
+@sts_conn('ec2')
+@paginated_iterator('FlowLogs')
+@rate_limited()
+def iter_flow_logs(client=None, **kwargs):
+    return client.describe_flow_logs(**kwargs)
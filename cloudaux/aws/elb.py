@@ -6,6 +6,7 @@
 .. moduleauthor:: Patrick Kelley <patrick@netflix.com>
 """
 from cloudaux.aws.sts import sts_conn
+from cloudaux.aws.decorators import aws_cache
 from cloudaux.aws.decorators import rate_limited
 from cloudaux.aws.decorators import paginated
 
@@ -32,6 +33,7 @@ def describe_load_balancer_policies(load_balancer_name, policy_names, client=Non
         PolicyNames=policy_names)['PolicyDescriptions']
 
 
+@aws_cache()
 @sts_conn('elb')
 @rate_limited()
 def describe_load_balancer_policy_types(policy_type_names, client=None):
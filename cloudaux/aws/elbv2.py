@@ -1,4 +1,5 @@
 from cloudaux.aws.sts import sts_conn
+from cloudaux.aws.decorators import aws_cache
 from cloudaux.aws.decorators import rate_limited
 from cloudaux.aws.decorators import paginated
 
@@ -57,6 +58,7 @@ def describe_rules(listener_arn=None, rule_arns=None, client=None):
     return client.describe_rules(**kwargs)['Rules']
 
 
+@aws_cache()
 @paginated('SslPolicies', response_pagination_marker='NextMarker')
 @sts_conn('elbv2')
 @rate_limited()
@@ -11,6 +11,7 @@
 """
 from cloudaux import get_iso_string
 from cloudaux.aws.sts import sts_conn
+from cloudaux.aws.decorators import aws_cache
 from cloudaux.aws.decorators import rate_limited
 from cloudaux.aws.decorators import paginated
 from joblib import Parallel, delayed
@@ -245,6 +246,7 @@ def get_managed_policy_document(policy_arn, policy_metadata=None, client=None, *
     return policy_document['PolicyVersion']['Document']
 
 
+@aws_cache()
 @sts_conn('iam', service_type='client')
 @rate_limited()
 def get_policy(policy_arn, client=None, **kwargs):
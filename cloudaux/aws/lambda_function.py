@@ -1,5 +1,5 @@
 from cloudaux.aws.sts import sts_conn
-from cloudaux.aws.decorators import rate_limited, paginated
+from cloudaux.aws.decorators import rate_limited, paginated, paginated_iterator
 
 
 @sts_conn('lambda')
@@ -45,4 +45,12 @@ def get_policy(client=None, **kwargs):
 @paginated('Functions')
 @rate_limited()
 def list_functions(client=None, **kwargs):
-    return client.list_functions(**kwargs)
\ No newline at end of file
+    return client.list_functions(**kwargs)
+
+
+@sts_conn('lambda')
+@paginated_iterator('Functions', request_pagination_marker='Marker', response_pagination_marker='NextMarker',
+                    page_size_key='MaxItems')
+@rate_limited()
+def iter_functions(client=None, **kwargs):
+    return client.list_functions(**kwargs)
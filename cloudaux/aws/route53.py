@@ -7,9 +7,10 @@
 """
 
 from cloudaux.aws.sts import sts_conn
-from cloudaux.aws.decorators import rate_limited
+from cloudaux.aws.decorators import aws_cache, rate_limited
 
 
+@aws_cache()
 @sts_conn('route53', service_type='client')
 @rate_limited()
 def list_hosted_zones(**kwargs):
@@ -1,5 +1,18 @@
+import csv
+import gzip
+import io
+import json
+import re
+import threading
+from contextlib import contextmanager
+
+import dateutil.parser
+from inflection import camelize
+from six.moves.urllib.parse import unquote_plus
+
 from cloudaux.aws.sts import sts_conn
-from cloudaux.aws.decorators import rate_limited, paginated
+from cloudaux.aws.decorators import rate_limited, paginated, paginated_iterator, iter_pages
+from cloudaux.streaming import iter_sharded
 from botocore.exceptions import ClientError
 
 
@@ -13,6 +26,18 @@ S3_REGION_MAPPING = dict(
     USWest='us-west-1',
     USWest2='us-west-2')
 
+# The fields of an object in a ListObjectsV2 listing:
+OBJECT_FIELDS = ('Key', 'LastModified', 'ETag', 'Size', 'StorageClass')
+
+# Maximum number of concurrent listings of any one bucket, across all of the list_objects_sharded calls:
+BUCKET_LISTING_CONCURRENCY = 10
+
+_BUCKET_SEMAPHORES = {}
+_BUCKET_SEMAPHORES_LOCK = threading.Lock()
+
+# Inventory reports are delivered under <prefix>/<source bucket>/<inventory id>/<date>/, i.e. 2018-01-01T00-00Z/:
+INVENTORY_DATE_PREFIX = re.compile(r'.*/(\d{4}-\d{2}-\d{2}T\d{2}-\d{2}Z)/$')
+
 
 @sts_conn('s3')
 @rate_limited()
@@ -173,6 +198,15 @@ def list_bucket_inventory_configurations(client=None, **kwargs):
     return result
 
 
+@sts_conn('s3')
+@rate_limited()
+def get_object(client=None, **kwargs):
+    """
+    Bucket='string', Key='string'
+    """
+    return client.get_object(**kwargs)
+
+
 @sts_conn('s3', service_type='resource')
 @rate_limited()
 def get_bucket_resource(bucket_name, resource=None, **kwargs):
@@ -195,3 +229,258 @@ def get_bucket_region(**kwargs):
         return 'us-east-1'
 
     return S3_REGION_MAPPING.get(location, location)
+
+
+@sts_conn('s3')
+@paginated_iterator('Contents', request_pagination_marker='ContinuationToken',
+                    response_pagination_marker='NextContinuationToken', page_size_key='MaxKeys')
+@rate_limited()
+def list_objects(client=None, **kwargs):
+    """
+    Streams the objects in a bucket with ListObjectsV2, a page (of up to 1000) at a time.
+
+    Bucket='string', Prefix='string', Delimiter='string', StartAfter='string'
+    Pass max_results to set the page size.
+
+    :returns: generator of objects, with the OBJECT_FIELDS
+    """
+    return client.list_objects_v2(**kwargs)
+
+
+@sts_conn('s3')
+def _iter_delimited(client=None, common_prefixes=None, **kwargs):
+    """Streams the objects directly under Prefix, appending the common prefixes to common_prefixes."""
+    pages = iter_pages(rate_limited()(client.list_objects_v2), kwargs, request_pagination_marker='ContinuationToken',
+                       response_pagination_marker='NextContinuationToken')
+    for page in pages:
+        common_prefixes.extend(p['Prefix'] for p in page.get('CommonPrefixes', []))
+        for obj in page.get('Contents', []):
+            yield obj
+
+
+@contextmanager
+def _bucket_listing_slot(bucket):
+    with _BUCKET_SEMAPHORES_LOCK:
+        semaphore = _BUCKET_SEMAPHORES.get(bucket)
+        if semaphore is None:
+            semaphore = _BUCKET_SEMAPHORES[bucket] = threading.BoundedSemaphore(BUCKET_LISTING_CONCURRENCY)
+
+    with semaphore:
+        yield
+
+
+def list_objects_sharded(bucket, prefix='', delimiter='/', shards=None, max_workers=10, buffer_size=1000,
+                         **conn):
+    """
+    Streams the objects in a bucket, listing prefixes (shards) concurrently.
+
+    Unless the shards are given, the bucket is first listed with the delimiter under the prefix: the
+    objects found directly under the prefix are yielded, and each common prefix becomes a shard.
+    The shards are then listed concurrently (at most BUCKET_LISTING_CONCURRENCY at once per bucket), and
+    their objects are yielded as they arrive. At most buffer_size objects are held in memory.
+
+    :param shards: optional list of prefixes, in place of discovering them. These must not overlap.
+                   Use this for buckets without a (useful) delimited structure, i.e. ['0', '1', ..., 'f']
+                   for hex keyed objects.
+    :param max_workers: maximum number of shards listed concurrently by this call. Default is 10.
+    :returns: generator of objects, in no particular order.
+    """
+    if shards is None:
+        shards = []
+        for obj in _iter_delimited(Bucket=bucket, Prefix=prefix, Delimiter=delimiter, common_prefixes=shards,
+                                   **conn):
+            yield obj
+
+    def list_shard(shard):
+        with _bucket_listing_slot(bucket):
+            for obj in list_objects(Bucket=bucket, Prefix=shard, **conn):
+                yield obj
+
+    for obj in iter_sharded(list_shard, shards, max_workers=max_workers, buffer_size=buffer_size):
+        yield obj
+
+
+def _serialize(value):
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+
+def write_objects(objects, fileobj, output_format='ndjson', fields=OBJECT_FIELDS):
+    """
+    Writes a stream of objects (i.e. from list_objects_sharded) to a file, one at a time.
+
+    :param output_format: 'ndjson' (one JSON object per line) or 'csv' (a header row, then a column per field).
+    :param fields: the fields to write. Default is OBJECT_FIELDS.
+    :returns: the number of objects written.
+    """
+    if output_format == 'ndjson':
+        def write(obj):
+            fileobj.write(json.dumps({field: _serialize(obj.get(field)) for field in fields}) + '\n')
+    elif output_format == 'csv':
+        writer = csv.writer(fileobj)
+        writer.writerow(fields)
+
+        def write(obj):
+            writer.writerow([_serialize(obj.get(field)) for field in fields])
+    else:
+        raise ValueError('Unsupported output_format: {}. Must be ndjson or csv.'.format(output_format))
+
+    count = 0
+    for obj in objects:
+        write(obj)
+        count += 1
+
+    return count
+
+
+class InventoryNotFoundException(Exception):
+    pass
+
+
+def _get_inventory_configuration(bucket, inventory_id=None, **conn):
+    configurations = list_bucket_inventory_configurations(Bucket=bucket, **conn)
+    for configuration in configurations:
+        # A disabled configuration's reports are stale:
+        if not configuration.get('IsEnabled', True):
+            continue
+        if inventory_id is None or configuration['Id'] == inventory_id:
+            return configuration
+
+    raise InventoryNotFoundException('No enabled inventory configuration {}found for bucket {}.'.format(
+        '{} '.format(inventory_id) if inventory_id else '', bucket))
+
+
+def get_inventory_manifest(bucket, inventory_id=None, **conn):
+    """
+    Follows a bucket's inventory configuration to the manifest of its latest inventory report.
+
+    :param inventory_id: Id of the inventory configuration. Default is the bucket's first enabled configuration.
+                         Disabled configurations are skipped.
+    :returns: the manifest (with its sourceBucket, destinationBucket, fileFormat, fileSchema and files).
+    """
+    configuration = _get_inventory_configuration(bucket, inventory_id=inventory_id, **conn)
+    destination = configuration['Destination']['S3BucketDestination']
+    destination_bucket = destination['Bucket'].split(':')[-1]
+
+    base_prefix = '{}/{}/'.format(bucket, configuration['Id'])
+    if destination.get('Prefix'):
+        base_prefix = '{}/{}'.format(destination['Prefix'].rstrip('/'), base_prefix)
+
+    reports = []
+    for _ in _iter_delimited(Bucket=destination_bucket, Prefix=base_prefix, Delimiter='/', common_prefixes=reports,
+                             **conn):
+        pass
+    reports = sorted((r for r in reports if INVENTORY_DATE_PREFIX.match(r)), reverse=True)
+
+    # The newest report may still be being written, in which case it has no manifest yet:
+    for report in reports:
+        try:
+            manifest = get_object(Bucket=destination_bucket, Key=report + 'manifest.json', **conn)
+        except ClientError as e:
+            if e.response['Error']['Code'] not in ('NoSuchKey', '404'):
+                raise
+            continue
+
+        return json.loads(manifest['Body'].read().decode('utf-8'))
+
+    raise InventoryNotFoundException('No inventory reports found under s3://{}/{}.'.format(
+        destination_bucket, base_prefix))
+
+
+def _inventory_record(record):
+    """Maps an inventory record to the ListObjectsV2 fields (OBJECT_FIELDS). The other columns are kept as is."""
+    result = dict(record)
+    result.pop('Bucket', None)
+
+    if 'LastModifiedDate' in result:
+        last_modified = result.pop('LastModifiedDate')
+        if last_modified and not hasattr(last_modified, 'isoformat'):
+            last_modified = dateutil.parser.parse(last_modified)
+        result['LastModified'] = last_modified
+    if result.get('Size') not in (None, ''):
+        result['Size'] = int(result['Size'])
+    if result.get('ETag'):
+        # The listing quotes the ETags:
+        result['ETag'] = '"{}"'.format(result['ETag'])
+
+    return result
+
+
+def _iter_columnar_records(fileobj, file_format):
+    try:
+        import pyarrow
+        if file_format == 'Parquet':
+            import pyarrow.parquet
+        else:
+            import pyarrow.orc
+    except ImportError:
+        raise ImportError('pyarrow is required to read {} inventory reports.'.format(file_format))
+
+    # These formats can't be decoded from a stream, but are decoded a batch (or stripe) at a time:
+    data = pyarrow.BufferReader(fileobj.read())
+    if file_format == 'Parquet':
+        batches = pyarrow.parquet.ParquetFile(data).iter_batches()
+    else:
+        orc_file = pyarrow.orc.ORCFile(data)
+        batches = (orc_file.read_stripe(i) for i in range(orc_file.nstripes))
+
+    for batch in batches:
+        for record in batch.to_pylist():
+            # The columns are named i.e. last_modified_date rather than LastModifiedDate:
+            yield {camelize(column): value for column, value in record.items()}
+
+
+def iter_inventory_file(fileobj, file_format='CSV', file_schema=None):
+    """
+    Stream-decodes an inventory report file into records, with the same fields as list_objects.
+
+    Works on any file object, so local copies of the reports can be read too.
+
+    :param fileobj: the report file (gzipped, for CSV).
+    :param file_format: 'CSV', or 'Parquet' or 'ORC' (which require pyarrow).
+    :param file_schema: the manifest's fileSchema, i.e. 'Bucket, Key, Size, LastModifiedDate, ETag, StorageClass'.
+                        Required for CSV, which has no header row.
+    """
+    if file_format == 'CSV':
+        columns = [column.strip() for column in file_schema.split(',')]
+        with gzip.GzipFile(fileobj=fileobj) as gz:
+            for row in csv.reader(io.TextIOWrapper(gz, encoding='utf-8')):
+                record = dict(zip(columns, row))
+                if 'Key' in record:
+                    # CSV reports URL-encode the keys:
+                    record['Key'] = unquote_plus(record['Key'])
+                yield _inventory_record(record)
+
+    elif file_format in ('Parquet', 'ORC'):
+        for record in _iter_columnar_records(fileobj, file_format):
+            yield _inventory_record(record)
+
+    else:
+        raise ValueError('Unsupported inventory format: {}. Must be CSV, Parquet or ORC.'.format(file_format))
+
+
+def iter_inventory(bucket, inventory_id=None, max_workers=4, buffer_size=1000, **conn):
+    """
+    Streams the objects in a bucket from its latest S3 Inventory report, rather than listing them.
+
+    The report files are downloaded and decoded concurrently, and the records yielded as they are decoded.
+    At most buffer_size records are held in memory (plus the Parquet or ORC file being decoded).
+
+    :param inventory_id: Id of the inventory configuration. Default is the bucket's first enabled configuration.
+    :param max_workers: maximum number of report files read concurrently. Default is 4.
+    :returns: generator of objects, with the same fields as list_objects (and any other columns in the report).
+    """
+    manifest = get_inventory_manifest(bucket, inventory_id=inventory_id, **conn)
+
+    def read_file(report_file):
+        body = get_object(Bucket=manifest['destinationBucket'].split(':')[-1], Key=report_file['key'], **conn)['Body']
+        try:
+            for record in iter_inventory_file(body, file_format=manifest['fileFormat'],
+                                              file_schema=manifest.get('fileSchema')):
+                yield record
+        finally:
+            body.close()
+
+    for record in iter_sharded(read_file, manifest['files'], max_workers=max_workers, buffer_size=buffer_size):
+        yield record
@@ -1,6 +1,27 @@
+from botocore.exceptions import ClientError
+
 from cloudaux.aws.decorators import rate_limited, paginated
 from cloudaux.aws.sts import sts_conn
 
+# DescribeSecurityGroups doesn't document a maximum for GroupIds, but large requests are rejected.
+# Stay within the 200 value limit that applies to the EC2 describe filters.
+SECURITY_GROUP_IDS_CHUNK_SIZE = 200
+
+SECURITY_GROUP_FIELDS = ['Description', 'GroupName', 'IpPermissions', 'OwnerId', 'GroupId', 'IpPermissionsEgress',
+                         'VpcId']
+
+
+def _format_security_group(sg_data):
+    return_obj = dict()
+
+    for field in SECURITY_GROUP_FIELDS:
+        try:
+            return_obj[field] = sg_data[field]
+        except KeyError:
+            pass
+
+    return return_obj
+
 
 @sts_conn('ec2')
 @paginated('SecurityGroups', request_pagination_marker="nexttoken")
@@ -17,12 +38,28 @@ def describe_security_group(sg_id, client=None, **kwargs):
     except (KeyError, IndexError):
         return None
 
-    return_obj = dict()
+    return _format_security_group(sg_data)
 
-    for field in ['Description', 'GroupName', 'IpPermissions', 'OwnerId', 'GroupId', 'IpPermissionsEgress', 'VpcId']:
-        try:
-            return_obj[field] = sg_data[field]
-        except KeyError:
-            pass
 
-    return return_obj
+@sts_conn('ec2')
+@rate_limited()
+def describe_security_groups(sg_ids, client=None, **kwargs):
+    """
+    Describes the given Security Groups with a single DescribeSecurityGroups call.
+
+    If any of the groups no longer exist, the call is retried with a `group-id` filter
+    (which skips missing groups instead of failing the whole request).
+
+    :param sg_ids: List of GroupIds -- at most SECURITY_GROUP_IDS_CHUNK_SIZE.
+    :return: Dict of GroupId -> Security Group. Missing groups are omitted.
+    """
+    try:
+        sg_data = client.describe_security_groups(GroupIds=sg_ids)['SecurityGroups']
+    except ClientError as e:
+        if e.response['Error']['Code'] != 'InvalidGroup.NotFound':
+            raise
+
+        sg_data = client.describe_security_groups(
+            Filters=[{'Name': 'group-id', 'Values': sg_ids}])['SecurityGroups']
+
+    return {sg['GroupId']: _format_security_group(sg) for sg in sg_data}
@@ -6,14 +6,63 @@
 .. moduleauthor:: Patrick Kelley <patrick@netflix.com>
 """
 from functools import wraps
+import threading
 import boto3
 import dateutil.tz
 import datetime
 from botocore.config import Config
 
+from cloudaux.aws.decorators import aws_stats
+
 CACHE = {}
 
 
+class ConnectionPool(object):
+    """
+    Holds live boto3 clients so that they can be reused across calls.
+
+    `boto3_cached_conn` only caches the assumed role credentials, so each call still builds a new client.
+    Pass a pool in through the conn dict to reuse the clients instead:
+
+        pool = ConnectionPool()
+        conn = dict(account_number='000000000000', assume_role='role_name', connection_pool=pool)
+        bucket = get_bucket('my-bucket', **conn)
+
+    Clients are pooled per (account, role, session, region, service, partition, ...) and expire along
+    with the credentials they were built from. Resources are not pooled, as they are not thread safe.
+    """
+
+    def __init__(self):
+        self._conns = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, future_expiration_minutes=15):
+        with self._lock:
+            entry = self._conns.get(key)
+            if not entry:
+                return None
+
+            conn, expiration = entry
+            now = datetime.datetime.now(dateutil.tz.tzutc()) + datetime.timedelta(minutes=future_expiration_minutes)
+            if expiration and expiration <= now:
+                del self._conns[key]
+                return None
+
+            return conn
+
+    def put(self, key, conn, expiration=None):
+        """Pools the connection. `expiration` is that of the credentials it was built with (None if it never expires)."""
+        with self._lock:
+            self._conns[key] = (conn, expiration)
+
+    def clear(self):
+        with self._lock:
+            self._conns = {}
+
+    def __len__(self):
+        return len(self._conns)
+
+
 def _conn_kwargs(region, role, retry_config):
     kwargs = dict(region_name=region)
     kwargs.update(dict(config=retry_config))
@@ -62,11 +111,11 @@ def _get_cached_creds(key, service, service_type, region, future_expiration_minu
         del CACHE[key]
 
 
-
+@aws_stats()
 def boto3_cached_conn(service, service_type='client', future_expiration_minutes=15, account_number=None,
                       assume_role=None, session_name='cloudaux', region='us-east-1', return_credentials=False,
                       external_id=None, arn_partition='aws', read_only=False, retry_max_attempts=10, config=None,
-                      sts_client_kwargs=None, client_kwargs=None):
+                      sts_client_kwargs=None, client_kwargs=None, connection_pool=None):
     """
     Used to obtain a boto3 client or resource connection.
     For cross account, provide both account_number and assume_role.
@@ -100,6 +149,8 @@ def boto3_cached_conn(service, service_type='client', future_expiration_minutes=
         single request
     :param config: Optional botocore.client.Config
     :param sts_client_kwargs: Optional arguments to pass during STS client creation
+    :param connection_pool: Optional ConnectionPool to reuse clients from (not used for resources, or
+        when return_credentials is set)
     :return: boto3 client or resource connection
     """
     key = (
@@ -119,9 +170,18 @@ def boto3_cached_conn(service, service_type='client', future_expiration_minutes=
     if config:
         client_config = client_config.merge(config)
 
+    pool_key = None
+    if connection_pool is not None and service_type == 'client' and not return_credentials:
+        pool_key = key + (retry_max_attempts, config, repr(sorted(client_kwargs.items())))
+        conn = connection_pool.get(pool_key, future_expiration_minutes)
+        if conn:
+            return conn
+
     if key in CACHE:
         retval = _get_cached_creds(key, service, service_type, region, future_expiration_minutes, return_credentials, client_config, client_kwargs)
         if retval:
+            if pool_key:
+                connection_pool.put(pool_key, retval, CACHE[key]['Credentials']['Expiration'])
             return retval
 
     role = None
@@ -165,6 +225,9 @@ def boto3_cached_conn(service, service_type='client', future_expiration_minutes=
     if role:
         CACHE[key] = role
 
+    if pool_key:
+        connection_pool.put(pool_key, conn, role['Credentials']['Expiration'] if role else None)
+
     if return_credentials:
         return conn, role['Credentials']
 
@@ -186,6 +249,8 @@ def sts_conn(service, service_type='client', future_expiration_minutes=15, retry
 
     If `force_client` is set to a boto3 client, then this will simply pass that in as the client.
     `force_client` is mostly useful for mocks and tests.
+
+    If `connection_pool` is set to a ConnectionPool, then the client is reused from (or added to) the pool.
     :param service:
     :param service_type:
     :param retry_max_attempts: An integer representing the maximum number of retry attempts that will be made on a
@@ -200,6 +265,7 @@ def sts_conn(service, service_type='client', future_expiration_minutes=15, retry
                 kwargs[service_type] = kwargs.pop("force_client")
                 kwargs.pop("account_number", None)
                 kwargs.pop("region", None)
+                kwargs.pop("connection_pool", None)
             else:
                 kwargs[service_type] = boto3_cached_conn(
                     service,
@@ -216,6 +282,7 @@ def sts_conn(service, service_type='client', future_expiration_minutes=15, retry
                     config=config,
                     sts_client_kwargs=kwargs.pop("sts_client_kwargs", None),
                     client_kwargs=kwargs.pop("client_kwargs", None),
+                    connection_pool=kwargs.pop("connection_pool", None),
                 )
             return f(*args, **kwargs)
         return decorated_function
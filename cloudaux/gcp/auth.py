@@ -6,17 +6,27 @@
 .. moduleauthor:: Tom Melendez (@supertom) <supertom@google.com>
 """
 import importlib
+import threading
 
 from httplib2 import Http
-from apiclient.discovery import build
+from apiclient.discovery import build, build_from_document
 from googleapiclient.http import set_user_agent
 from oauth2client.client import GoogleCredentials
 from oauth2client.service_account import ServiceAccountCredentials
 
+from cloudaux.gcp import config
 from cloudaux.gcp.config import USE_GAX, GOOGLE_CLIENT_MAP, DEFAULT_SCOPES
 from cloudaux.gcp.decorators import gcp_cache, gcp_stats
+from cloudaux.gcp.transport import DiscoveryCache, ThreadLocalHttp, get_vendored_document
 from cloudaux.gcp.utils import get_user_agent
 
+# General clients use a ThreadLocalHttp, so they are shared across projects and threads:
+_GOOGLE_CLIENTS = {}
+# Guards _GOOGLE_CLIENTS and _CLIENT_LOCKS. Clients are built under the per-key locks, so building
+# one service's client doesn't hold up the others:
+_GOOGLE_CLIENTS_LOCK = threading.Lock()
+_CLIENT_LOCKS = {}
+
 
 @gcp_stats()
 @gcp_cache(future_expiration_minutes=15)
@@ -135,7 +145,8 @@ def _gcp_client(project, mod_name, pkg_name, key_file=None, http_auth=None,
     """
     client = None
     if http_auth is None:
-        http_auth = _googleauth(key_file=key_file, user_agent=user_agent)
+        # Thread safe, so the client can be shared across threads:
+        http_auth = _thread_safe_googleauth(key_file=key_file, user_agent=user_agent)
     try:
         # Using a relative path, so we prefix with a dot (.)
         google_module = importlib.import_module('.' + mod_name,
@@ -163,14 +174,65 @@ def get_google_client(**kwargs):
 
 def _google_client(mod_name, key_file, scopes, http_auth, api_version,
                    user_agent):
-    if http_auth is None:
-        http_auth = _googleauth(key_file=key_file, scopes=scopes,
-                                user_agent=user_agent)
-    client = _build_google_client(service=mod_name, api_version=api_version,
-                                  http_auth=http_auth)
+    if http_auth is not None:
+        return _build_google_client(service=mod_name, api_version=api_version,
+                                    http_auth=http_auth)
+
+    key = (mod_name, key_file, tuple(scopes or []), api_version, user_agent)
+    with _GOOGLE_CLIENTS_LOCK:
+        key_lock = _CLIENT_LOCKS.setdefault(key, threading.Lock())
+
+    with key_lock:
+        with _GOOGLE_CLIENTS_LOCK:
+            client = _GOOGLE_CLIENTS.get(key)
+
+        if client is None:
+            http_auth = _thread_safe_googleauth(key_file=key_file, scopes=scopes,
+                                                user_agent=user_agent)
+            client = _build_google_client(service=mod_name, api_version=api_version,
+                                          http_auth=http_auth)
+            with _GOOGLE_CLIENTS_LOCK:
+                _GOOGLE_CLIENTS[key] = client
     return client
 
 
+def _get_credentials(key_file=None, scopes=[]):
+    """
+    Google credentials helper.
+
+    If key_file is not specified, default credentials will be used.
+
+    If scopes is specified (and key_file), will be used instead of DEFAULT_SCOPES
+    """
+    if key_file:
+        if not scopes:
+            scopes = DEFAULT_SCOPES
+        return ServiceAccountCredentials.from_json_keyfile_name(key_file,
+                                                                scopes=scopes)
+    return GoogleCredentials.get_application_default()
+
+
+def _authorize(creds, user_agent=None):
+    """Returns a new HTTPLib2 client, authorized with creds."""
+    http = Http()
+    if user_agent:
+        http = set_user_agent(http, user_agent)
+    return creds.authorize(http)
+
+
+def _thread_safe_googleauth(key_file=None, scopes=[], user_agent=None):
+    """
+    Thread safe variant of `_googleauth`.
+
+    The credentials are loaded once. Each thread making requests gets its own authorized HTTPLib2 client.
+
+    :return: authorized client, safe to share across threads.
+    :rtype: :class: `ThreadLocalHttp`
+    """
+    creds = _get_credentials(key_file=key_file, scopes=scopes)
+    return ThreadLocalHttp(lambda: _authorize(creds, user_agent=user_agent), credentials=creds)
+
+
 def _googleauth(key_file=None, scopes=[], user_agent=None):
     """
     Google http_auth helper.
@@ -191,24 +253,22 @@ def _googleauth(key_file=None, scopes=[], user_agent=None):
     :return: HTTPLib2 authorized client.
     :rtype: :class: `HTTPLib2`
     """
-    if key_file:
-        if not scopes:
-            scopes = DEFAULT_SCOPES
-        creds = ServiceAccountCredentials.from_json_keyfile_name(key_file,
-                                                                 scopes=scopes)
-    else:
-        creds = GoogleCredentials.get_application_default()
-    http = Http()
-    if user_agent:
-        http = set_user_agent(http, user_agent)
-    http_auth = creds.authorize(http)
-    return http_auth
+    creds = _get_credentials(key_file=key_file, scopes=scopes)
+    return _authorize(creds, user_agent=user_agent)
+
+
+def _get_discovery_cache():
+    """Returns the (in memory, and optionally disk) cache for discovery documents."""
+    return DiscoveryCache(config.DISCOVERY_CACHE_DIR, max_age=config.DISCOVERY_CACHE_MAX_AGE)
 
 
 def _build_google_client(service, api_version, http_auth):
     """
     Google build client helper.
 
+    The client is built from the vendored discovery document in DISCOVERY_DOCUMENTS_DIR if there
+    is one. Otherwise the document is fetched, unless it is already cached.
+
     :param service: service to build client for
     :type service: ``str``
 
@@ -221,5 +281,10 @@ def _build_google_client(service, api_version, http_auth):
     :return: google-python-api client initialized to use 'service'
     :rtype: ``object``
     """
-    client = build(service, api_version, http=http_auth)
+    if config.DISCOVERY_DOCUMENTS_DIR:
+        document = get_vendored_document(config.DISCOVERY_DOCUMENTS_DIR, service, api_version)
+        if document:
+            return build_from_document(document, http=http_auth)
+
+    client = build(service, api_version, http=http_auth, cache=_get_discovery_cache())
     return client
@@ -5,7 +5,6 @@
     :license: Apache, see LICENSE for more details.
 .. moduleauthor:: Tom Melendez (@supertom) <supertom@google.com>
 """
-
 USE_GAX=False
 # TODO(supertom): Change: this is not a good default scope.
 DEFAULT_SCOPES = ['https://www.googleapis.com/auth/cloud-platform']
@@ -26,3 +25,16 @@ GOOGLE_CLIENT_MAP = {
     'crm':
     {'client_type': 'general', 'module_name': 'cloudresourcemanager'},
 }
+
+# Number of calls per BatchHttpRequest. The Google APIs accept up to 1000, but many services
+# throttle (and fail) large batches, so this is kept lower by default.
+BATCH_SIZE = 100
+
+# Discovery documents are cached in memory, so clients can be built without refetching them.
+# Set DISCOVERY_CACHE_DIR to a directory to also cache them on disk (i.e. ~/.cache/cloudaux/discovery).
+DISCOVERY_CACHE_DIR = None
+DISCOVERY_CACHE_MAX_AGE = 24 * 60 * 60  # seconds
+
+# Optional directory of vendored discovery documents, named <service>.<api_version>.json.
+# These are used in place of fetching the documents. See cloudaux.gcp.transport.vendor_discovery_documents.
+DISCOVERY_DOCUMENTS_DIR = None
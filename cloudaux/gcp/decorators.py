@@ -5,21 +5,68 @@
     :license: Apache, see LICENSE for more details.
 .. moduleauthor:: Tom Melendez (@supertom) <supertom@google.com>
 """
-import time
+import hashlib
+import json
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from functools import wraps
 
 from six import string_types
 
 from cloudaux.gcp.gcpcache import GCPCache
 from cloudaux.gcp.utils import get_creds_from_kwargs, rewrite_kwargs
+from cloudaux.stats import StatsRegistry, timed
 
-_GCP_STATS = {}
+_GCP_STATS = StatsRegistry()
 _GCP_CACHE = GCPCache()
 
 
+ProjectResult = namedtuple('ProjectResult', ['project', 'zone', 'result', 'exception'])
+
+_PRIMITIVE_TYPES = string_types + (int, float, bool, type(None))
+
+# Connection objects that don't change the response, and are left out of the cache keys:
+_UNCACHED_KWARGS = frozenset(['client', 'http_auth', 'credentials'])
+
+_DROPPED = object()
+
+
+def _normalize(value):
+    """
+    Normalizes a value into something JSON serializable and deterministic.
+
+    Primitives (and containers of them) are kept as is. Other objects, like clients and credentials,
+    are left out: dict entries are dropped, and list items are replaced by their type name.
+    """
+    if isinstance(value, _PRIMITIVE_TYPES):
+        return value
+    if isinstance(value, (list, tuple)):
+        return [_normalize_item(v) for v in value]
+    if isinstance(value, dict):
+        normalized = {}
+        for k, v in value.items():
+            v = _normalize(v)
+            if v is not _DROPPED:
+                normalized[str(k)] = v
+        return normalized
+
+    return _DROPPED
+
+
+def _normalize_item(value):
+    normalized = _normalize(value)
+    if normalized is _DROPPED:
+        # Keeps the positions of the other items:
+        return '<%s>' % type(value).__name__
+    return normalized
+
+
 def _build_key(func_name, args, kwargs):
-    """Builds key for cache and stats."""
-    return "n=%s__args=%s__kwargs=%s" % (func_name, args, kwargs)
+    """Builds a canonical, fixed-size key for the cache from the function name and its arguments."""
+    kwargs = {k: v for k, v in kwargs.items() if k not in _UNCACHED_KWARGS}
+    normalized = json.dumps([_normalize(args), _normalize(kwargs)], sort_keys=True)
+    return "%s__%s" % (func_name, hashlib.sha1(normalized.encode('utf-8')).hexdigest())
 
 
 def gcp_conn(service, service_type='client', future_expiration_minutes=15):
@@ -51,24 +98,12 @@ def gcp_stats():
     """
     Collect stats
 
-    Specifically, time function calls
+    Specifically, time function calls. The timings are summarized per function name
+    in fixed memory (count, sum, min/max, and quantiles). See `get_gcp_stats()`.
     :returns: function response
     :rtype: varies
     """
-
-    def decorator(f):
-        @wraps(f)
-        def decorated_function(*args, **kwargs):
-            start_time = time.time()
-            result = f(*args, **kwargs)
-            end_time = time.time()
-            strkey = _build_key(f.__name__, args, kwargs)
-            _GCP_STATS.setdefault(strkey, []).append(end_time - start_time)
-            return result
-
-        return decorated_function
-
-    return decorator
+    return timed(_GCP_STATS)
 
 
 def gcp_cache(future_expiration_minutes=15):
@@ -124,13 +159,7 @@ def iter_project(projects, key_file=None):
             item_list = []
             exception_map = {}
             for project in projects:
-                if isinstance(project, string_types):
-                    kwargs['project'] = project
-                    if key_file:
-                        kwargs['key_file'] = key_file
-                elif isinstance(project, dict):
-                    kwargs['project'] = project['project']
-                    kwargs['key_file'] = project['key_file']
+                kwargs.update(_project_kwargs(project, key_file))
                 itm, exc = func(*args, **kwargs)
                 item_list.extend(itm)
                 exception_map.update(exc)
@@ -139,3 +168,66 @@ def iter_project(projects, key_file=None):
         return decorated_function
 
     return decorator
+
+
+def _project_kwargs(project, key_file=None):
+    """Returns the project (and key_file) kwargs for an item of a project list. See `iter_project`."""
+    if isinstance(project, dict):
+        return {'project': project['project'], 'key_file': project.get('key_file', key_file)}
+
+    project_kwargs = {'project': project}
+    if key_file:
+        project_kwargs['key_file'] = key_file
+    return project_kwargs
+
+
+def iter_project_zone(projects, zones=None, key_file=None, max_workers=10, max_per_project=2):
+    """
+    Call decorated function concurrently for each project (and zone, if zones are given).
+
+    The GCP counterpart to `iter_account_region`. The decorated function returns a generator
+    of ProjectResult(project, zone, result, exception), in the order the calls complete. An exception
+    raised for one project is returned in its ProjectResult, and doesn't stop the others.
+
+    Clients are cached by `get_client`, and general clients are shared by all projects using the same credentials.
+
+    :param projects: list (or iterable) of project strings or dictionaries, as for `iter_project`. Required.
+    :param zones: list of zones. If given, the function is called for each project and zone, with zone=zone.
+    :param key_file: path on disk to keyfile, for use with all projects
+    :param max_workers: maximum number of concurrent calls overall. Default is 10.
+    :param max_per_project: maximum number of concurrent calls for any one project. Default is 2.
+    :returns: generator of ProjectResult
+    """
+
+    def decorator(func):
+        @wraps(func)
+        def decorated_function(*args, **kwargs):
+            semaphores = {}
+
+            def call(project_kwargs, zone):
+                call_kwargs = dict(kwargs, **project_kwargs)
+                if zone is not None:
+                    call_kwargs['zone'] = zone
+
+                with semaphores[project_kwargs['project']]:
+                    try:
+                        return ProjectResult(project_kwargs['project'], zone, func(*args, **call_kwargs), None)
+                    except Exception as e:
+                        return ProjectResult(project_kwargs['project'], zone, None, e)
+
+            all_project_kwargs = [_project_kwargs(project, key_file) for project in projects]
+            for project_kwargs in all_project_kwargs:
+                semaphores.setdefault(project_kwargs['project'], threading.BoundedSemaphore(max_per_project))
+
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                # Zone by zone, so that the calls for the different projects are interleaved,
+                # rather than workers waiting on the per-project limit:
+                futures = [executor.submit(call, project_kwargs, zone)
+                           for zone in (zones or [None]) for project_kwargs in all_project_kwargs]
+
+                for future in as_completed(futures):
+                    yield future.result()
+
+        return decorated_function
+
+    return decorator
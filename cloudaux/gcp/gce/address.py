@@ -11,10 +11,13 @@ from cloudaux.gcp.decorators import gcp_conn
 @gcp_conn('gce')
 def list_addresses(client=None, **kwargs):
     """
+    Lists the addresses in every region of the project, with aggregated list calls.
+    Each is tagged with its region as 'location'.
+
     :rtype: ``list``
     """
 
-    return gce_list_aggregated(service=client.addresses(), **kwargs)
+    return gce_list_aggregated(service=client.addresses(), key_name='addresses', tag_location=True, **kwargs)
 
 
 @gcp_conn('gce')
@@ -5,7 +5,7 @@
     :license: Apache, see LCIENSE for more details.
 .. moduleauthor:: Greg Harris <gharris@fitbit.com>
 """
-from cloudaux.gcp.utils import gce_list
+from cloudaux.gcp.utils import gce_list, gce_list_aggregated, gce_list_aggregated_iter, gce_list_iter
 from cloudaux.gcp.decorators import gcp_conn
 
 @gcp_conn('gce')
@@ -16,6 +16,35 @@ def list_disks(client=None, **kwargs):
     return gce_list(service=client.disks(),
                         **kwargs)
 
+@gcp_conn('gce')
+def iter_disks(client=None, **kwargs):
+    """
+    Yields the disks page by page, rather than building the whole list in memory.
+    Pass prefetch=True to fetch the next page while the current one is processed.
+
+    :rtype: ``generator``
+    """
+    return gce_list_iter(service=client.disks(), **kwargs)
+
+@gcp_conn('gce')
+def list_all_disks(client=None, **kwargs):
+    """
+    Lists the disks in every zone of the project, with aggregated list calls
+    (rather than a list call per zone). Each is tagged with its zone as 'location'.
+
+    :rtype: ``list``
+    """
+    return gce_list_aggregated(service=client.disks(), key_name='disks', tag_location=True, **kwargs)
+
+@gcp_conn('gce')
+def iter_all_disks(client=None, **kwargs):
+    """
+    Generator variant of list_all_disks.
+
+    :rtype: ``generator``
+    """
+    return gce_list_aggregated_iter(service=client.disks(), key_name='disks', tag_location=True, **kwargs)
+
 @gcp_conn('gce')
 def get_disk(client=None, **kwargs):
     service = client.disks()
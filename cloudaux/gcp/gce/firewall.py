@@ -5,7 +5,7 @@
     :license: Apache, see LICENSE for more details.
 .. moduleauthor:: Tom Melendez (@supertom) <supertom@google.com>
 """
-from cloudaux.gcp.utils import gce_list
+from cloudaux.gcp.utils import batch_execute, gce_list
 from cloudaux.gcp.decorators import gcp_conn
 
 @gcp_conn('gce')
@@ -22,3 +22,17 @@ def get_firewall_rule(client=None, **kwargs):
     req = service.get(project=kwargs['project'], firewall=kwargs['Firewall'])
     resp = req.execute()
     return resp
+
+
+@gcp_conn('gce')
+def get_firewall_rules(client=None, **kwargs):
+    """
+    Batched get_firewall_rule.
+
+    Firewalls=['string', ...]
+
+    :returns: tuple of a dict of name -> details and a dict of name -> exception
+    """
+    service = client.firewalls()
+    return batch_execute(client, {name: service.get(project=kwargs['project'], firewall=name)
+                                  for name in kwargs['Firewalls']})
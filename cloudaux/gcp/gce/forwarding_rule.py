@@ -12,10 +12,13 @@ from cloudaux.gcp.decorators import gcp_conn
 @gcp_conn('gce')
 def list_forwarding_rules(client=None, **kwargs):
     """
+    Lists the forwarding rules in every region of the project, with aggregated list calls.
+    Each is tagged with its region as 'location'.
+
     :rtype: ``list``
     """
 
-    return gce_list_aggregated(service=client.forwardingRules(), **kwargs)
+    return gce_list_aggregated(service=client.forwardingRules(), key_name='forwardingRules', tag_location=True, **kwargs)
 
 
 @gcp_conn('gce')
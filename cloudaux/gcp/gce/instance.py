@@ -5,7 +5,7 @@
     :license: Apache, see LCIENSE for more details.
 .. moduleauthor:: Greg Harris <gharris@fitbit.com>
 """
-from cloudaux.gcp.utils import gce_list
+from cloudaux.gcp.utils import gce_list, gce_list_aggregated, gce_list_aggregated_iter, gce_list_iter
 from cloudaux.gcp.decorators import gcp_conn
 
 @gcp_conn('gce')
@@ -16,6 +16,35 @@ def list_instances(client=None, **kwargs):
     return gce_list(service=client.instances(),
                         **kwargs)
 
+@gcp_conn('gce')
+def iter_instances(client=None, **kwargs):
+    """
+    Yields the instances page by page, rather than building the whole list in memory.
+    Pass prefetch=True to fetch the next page while the current one is processed.
+
+    :rtype: ``generator``
+    """
+    return gce_list_iter(service=client.instances(), **kwargs)
+
+@gcp_conn('gce')
+def list_all_instances(client=None, **kwargs):
+    """
+    Lists the instances in every zone of the project, with aggregated list calls
+    (rather than a list call per zone). Each is tagged with its zone as 'location'.
+
+    :rtype: ``list``
+    """
+    return gce_list_aggregated(service=client.instances(), key_name='instances', tag_location=True, **kwargs)
+
+@gcp_conn('gce')
+def iter_all_instances(client=None, **kwargs):
+    """
+    Generator variant of list_all_instances.
+
+    :rtype: ``generator``
+    """
+    return gce_list_aggregated_iter(service=client.instances(), key_name='instances', tag_location=True, **kwargs)
+
 @gcp_conn('gce')
 def get_instance(client=None, **kwargs):
     service = client.instances()
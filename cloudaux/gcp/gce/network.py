@@ -5,7 +5,7 @@
     :license: Apache, see LICENSE for more details.
 .. moduleauthor:: Tom Melendez (@supertom) <supertom@google.com>
 """
-from cloudaux.gcp.utils import gce_list, gce_list_aggregated
+from cloudaux.gcp.utils import batch_execute, gce_list, gce_list_aggregated
 from cloudaux.gcp.decorators import gcp_conn
 
 @gcp_conn('gce')
@@ -42,3 +42,17 @@ def get_subnetwork(client=None, **kwargs):
                       subnetwork=kwargs['Subnetwork'], region=kwargs['Region'])
     resp = req.execute()
     return resp
+
+
+@gcp_conn('gce')
+def get_networks(client=None, **kwargs):
+    """
+    Batched get_network.
+
+    Networks=['string', ...]
+
+    :returns: tuple of a dict of name -> details and a dict of name -> exception
+    """
+    service = client.networks()
+    return batch_execute(client, {name: service.get(project=kwargs['project'], network=name)
+                                  for name in kwargs['Networks']})
@@ -6,6 +6,10 @@
 .. moduleauthor:: Tom Melendez (@supertom) <supertom@google.com>
 """
 from cloudaux.gcp.decorators import gcp_conn
+from cloudaux.streaming import iter_sharded
+
+# Objects per page (the API maximum):
+OBJECTS_PAGE_SIZE = 1000
 
 @gcp_conn('gcs')
 def list_buckets(client=None, **kwargs):
@@ -21,6 +25,21 @@ def list_buckets(client=None, **kwargs):
     buckets = client.list_buckets(**kwargs)
     return [b.__dict__ for b in buckets]
 
+@gcp_conn('gcs')
+def iter_buckets(client=None, **kwargs):
+    """
+    Iterate over the buckets for a project.
+
+    Pass projection='full' to include the ACLs in the listing (for buckets the caller owns).
+
+    :param client: client object to use.
+    :type client: Google Cloud Storage client
+
+    :returns: iterator of Bucket
+    :rtype: ``iterator``
+    """
+    return client.list_buckets(**kwargs)
+
 @gcp_conn('gcs')
 def get_bucket(client=None, **kwargs):
     """
@@ -82,3 +101,83 @@ def get_object_in_bucket(**kwargs):
         return bucket.get_blob(kwargs['Object'])
     else:
         return None
+
+
+def _list_blobs(bucket, prefix=None, delimiter=None, page_size=OBJECTS_PAGE_SIZE, fields=None, versions=None):
+    """Lists the blobs in a bucket, page by page."""
+    if fields:
+        # Paging (and the prefixes of a delimited listing) would break without these:
+        fields = ','.join([fields] + [f for f in ('nextPageToken', 'prefixes') if f not in fields])
+
+    iterator = bucket.list_blobs(prefix=prefix, delimiter=delimiter, fields=fields, versions=versions)
+    # maxResults sets the page size. (max_results would also cap the total.)
+    iterator.extra_params['maxResults'] = page_size
+    return iterator
+
+
+@gcp_conn('gcs')
+def iter_objects(client=None, **kwargs):
+    """
+    Iterate over the objects in a bucket, fetching them a page at a time.
+
+    Unlike list_objects_in_bucket, the objects are not all held in memory, and the bucket isn't looked up first.
+
+    :param Bucket: name of bucket
+    :type Bucket: ``str``
+
+    :param Prefix: only list the objects whose names begin with this. Default is None.
+    :param Delimiter: i.e. '/' to only list the objects directly under Prefix. Default is None.
+    :param PageSize: objects per request, up to 1000. Default is OBJECTS_PAGE_SIZE.
+    :param Fields: partial response selector, i.e. 'items(name,size,updated)'. Default is None (all fields).
+    :param Versions: include noncurrent versions. Default is None.
+
+    :returns: iterator of Blob
+    :rtype: ``iterator``
+    """
+    bucket = client.bucket(kwargs['Bucket'])
+    return _list_blobs(bucket, prefix=kwargs.get('Prefix'), delimiter=kwargs.get('Delimiter'),
+                       page_size=kwargs.get('PageSize', OBJECTS_PAGE_SIZE), fields=kwargs.get('Fields'),
+                       versions=kwargs.get('Versions'))
+
+
+@gcp_conn('gcs')
+def iter_objects_sharded(client=None, **kwargs):
+    """
+    Iterate over the objects in a bucket, listing prefixes (shards) concurrently.
+
+    Unless the shards are given, the bucket is first listed with Delimiter under Prefix: the objects
+    found directly under Prefix are yielded, and each of the "directories" found becomes a shard.
+    The shards are then listed concurrently, and their objects yielded as they arrive (in no particular order).
+    At most BufferSize objects are held in memory.
+
+    :param Bucket: name of bucket
+    :param Prefix: Default is None, the whole bucket.
+    :param Delimiter: Default is '/'.
+    :param Shards: optional list of prefixes to list concurrently, in place of discovering them.
+                   These must not overlap, or objects will be yielded more than once.
+    :param Workers: maximum number of shards listed concurrently. Default is 10.
+    :param BufferSize: Default is 1000.
+    :param PageSize, Fields, Versions: as for iter_objects.
+
+    :returns: generator of Blob
+    :rtype: ``generator``
+    """
+    bucket = client.bucket(kwargs['Bucket'])
+    page_size = kwargs.get('PageSize', OBJECTS_PAGE_SIZE)
+    fields = kwargs.get('Fields')
+    versions = kwargs.get('Versions')
+
+    shards = kwargs.get('Shards')
+    if shards is None:
+        top = _list_blobs(bucket, prefix=kwargs.get('Prefix'), delimiter=kwargs.get('Delimiter', '/'),
+                          page_size=page_size, fields=fields, versions=versions)
+        for blob in top:
+            yield blob
+        shards = sorted(top.prefixes)
+
+    def list_shard(prefix):
+        return _list_blobs(bucket, prefix=prefix, page_size=page_size, fields=fields, versions=versions)
+
+    for blob in iter_sharded(list_shard, shards, max_workers=kwargs.get('Workers', 10),
+                             buffer_size=kwargs.get('BufferSize', 1000)):
+        yield blob
@@ -5,9 +5,8 @@
     :license: Apache, see LICENSE for more details.
 .. moduleauthor:: Tom Melendez (@supertom) <supertom@google.com>
 """
-from cloudaux.gcp.utils import service_list
 from cloudaux.gcp.decorators import gcp_conn, gcp_stats
-from cloudaux.gcp.utils import service_list
+from cloudaux.gcp.utils import batch_execute, service_list
 
 @gcp_conn('iam')
 def list_serviceaccounts(client=None, **kwargs):
@@ -46,6 +45,49 @@ def get_iam_policy(client=None, **kwargs):
     else:
         return None
 
+@gcp_conn('iam')
+def get_serviceaccounts(client=None, **kwargs):
+    """
+    Batched get_serviceaccount.
+
+    service_accounts=['string', ...]
+
+    :returns: tuple of a dict of service account -> details and a dict of service account -> exception
+    """
+    service = client.projects().serviceAccounts()
+    return batch_execute(client, {sa: service.get(name=sa) for sa in kwargs.pop('service_accounts')})
+
+
+@gcp_conn('iam')
+def get_serviceaccounts_keys(client=None, **kwargs):
+    """
+    Batched get_serviceaccount_keys.
+
+    service_accounts=['string', ...]
+
+    :returns: tuple of a dict of service account -> keys and a dict of service account -> exception
+    """
+    service = client.projects().serviceAccounts().keys()
+    responses, exceptions = batch_execute(client, {sa: service.list(name=sa)
+                                                   for sa in kwargs.pop('service_accounts')})
+    return {sa: resp.get('keys', []) for sa, resp in responses.items()}, exceptions
+
+
+@gcp_conn('iam')
+def get_iam_policies(client=None, **kwargs):
+    """
+    Batched get_iam_policy.
+
+    service_accounts=['string', ...]
+
+    :returns: tuple of a dict of service account -> bindings (or None) and a dict of service account -> exception
+    """
+    service = client.projects().serviceAccounts()
+    responses, exceptions = batch_execute(client, {sa: service.getIamPolicy(resource=sa)
+                                                   for sa in kwargs.pop('service_accounts')})
+    return {sa: resp.get('bindings') for sa, resp in responses.items()}, exceptions
+
+
 @gcp_conn('crm')
 def get_project_iam_policy(client=None, **kwargs):
     # body={} is a workaround for a bug in older version of the google libraries
@@ -0,0 +1,184 @@
+"""
+.. module: cloudaux.gcp.transport
+    :platform: Unix
+    :copyright: (c) 2018 by Netflix Inc., see AUTHORS for more
+    :license: Apache, see LICENSE for more details.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+from googleapiclient.discovery_cache.base import Cache
+from httplib2 import Http
+
+from cloudaux.gcp.config import GOOGLE_CLIENT_MAP
+
+DISCOVERY_URI = 'https://www.googleapis.com/discovery/v1/apis/{api}/{apiVersion}/rest'
+
+# Discovery documents already read in this process, shared across client builds:
+_DOCUMENTS = {}
+_DOCUMENTS_LOCK = threading.Lock()
+
+# Vendored discovery documents already read, by path. These don't expire:
+_VENDORED_DOCUMENTS = {}
+
+
+class ThreadLocalHttp(object):
+    """
+    Thread safe stand-in for an authorized httplib2.Http.
+
+    httplib2.Http is not thread safe, so a single google-api-python-client client can't normally
+    be shared across threads. This object gives each thread its own authorized Http (and so its own
+    pool of connections), created on first use with `http_factory`. Clients built with it can
+    be shared by all of the threads scanning projects concurrently.
+
+    :param http_factory: callable returning a new authorized httplib2.Http.
+    :param credentials: credentials used by the factory, exposed for googleapiclient's batch requests.
+    """
+
+    def __init__(self, http_factory, credentials=None):
+        self._http_factory = http_factory
+        self._local = threading.local()
+        self.credentials = credentials
+
+    @property
+    def http(self):
+        """The authorized Http for the current thread."""
+        http = getattr(self._local, 'http', None)
+        if http is None:
+            http = self._local.http = self._http_factory()
+
+        return http
+
+    def request(self, *args, **kwargs):
+        return self.http.request(*args, **kwargs)
+
+
+class DiscoveryCache(Cache):
+    """
+    Cache of discovery documents, for `apiclient.discovery.build(cache=...)`.
+
+    Documents are kept in memory for the life of the process, and stored in `cache_dir` (if set),
+    one file per discovery URL. Either copy is refetched once it is older than `max_age` seconds.
+    Writes are atomic, so the disk cache can be shared by threads and processes.
+    """
+
+    def __init__(self, cache_dir=None, max_age=24 * 60 * 60):
+        self.cache_dir = cache_dir
+        self.max_age = max_age
+
+    def _path(self, url):
+        return os.path.join(self.cache_dir, hashlib.sha1(url.encode('utf-8')).hexdigest() + '.json')
+
+    def get(self, url):
+        cached = _DOCUMENTS.get(url)
+        if cached and time.time() - cached[0] <= self.max_age:
+            return cached[1]
+
+        if not self.cache_dir:
+            return None
+
+        path = self._path(url)
+        try:
+            modified = os.path.getmtime(path)
+            if time.time() - modified > self.max_age:
+                return None
+
+            with open(path) as f:
+                content = f.read()
+        except (IOError, OSError):
+            return None
+
+        with _DOCUMENTS_LOCK:
+            _DOCUMENTS[url] = (modified, content)
+        return content
+
+    def set(self, url, content):
+        if isinstance(content, bytes):
+            content = content.decode('utf-8')
+
+        with _DOCUMENTS_LOCK:
+            _DOCUMENTS[url] = (time.time(), content)
+
+        if not self.cache_dir:
+            return
+
+        try:
+            if not os.path.isdir(self.cache_dir):
+                os.makedirs(self.cache_dir)
+
+            (fd, tmp_path) = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            with os.fdopen(fd, 'w') as f:
+                f.write(content)
+            os.rename(tmp_path, self._path(url))
+        except (IOError, OSError):
+            # The cache is only an optimization, the document will be refetched next time:
+            pass
+
+
+def _document_path(documents_dir, service, api_version):
+    return os.path.join(documents_dir, '%s.%s.json' % (service, api_version))
+
+
+def get_vendored_document(documents_dir, service, api_version):
+    """
+    Returns the vendored discovery document for the service, or None if there isn't one.
+
+    Documents are read from `<documents_dir>/<service>.<api_version>.json` (the naming used by
+    `vendor_discovery_documents`), once per process. Missing documents are looked for again on each call.
+    """
+    path = _document_path(documents_dir, service, api_version)
+    content = _VENDORED_DOCUMENTS.get(path)
+    if content is None:
+        try:
+            with open(path) as f:
+                content = f.read()
+        except (IOError, OSError):
+            # Not cached, so documents vendored later on are picked up:
+            return None
+
+        with _DOCUMENTS_LOCK:
+            _VENDORED_DOCUMENTS[path] = content
+
+    return content
+
+
+def vendor_discovery_documents(documents_dir, services=None, api_version='v1', http=None):
+    """
+    Downloads discovery documents into documents_dir, for use as `DISCOVERY_DOCUMENTS_DIR`.
+
+    Run this when building an image or a test environment, so clients can be built without network access.
+
+    :param services: discovery API names, i.e. ['compute', 'iam']. Default is the general
+                     clients in GOOGLE_CLIENT_MAP.
+    :return: list of the paths written.
+    """
+    if services is None:
+        services = [details['module_name'] for details in GOOGLE_CLIENT_MAP.values()
+                    if details['client_type'] == 'general']
+
+    http = http or Http()
+    if not os.path.isdir(documents_dir):
+        os.makedirs(documents_dir)
+
+    paths = []
+    for service in services:
+        (resp, content) = http.request(DISCOVERY_URI.format(api=service, apiVersion=api_version))
+        if resp.status >= 400:
+            raise ValueError('Unable to fetch the discovery document for %s %s: HTTP %s' % (
+                service, api_version, resp.status))
+
+        if isinstance(content, bytes):
+            content = content.decode('utf-8')
+        # Make sure it is a valid document before vendoring it:
+        json.loads(content)
+
+        path = _document_path(documents_dir, service, api_version)
+        with open(path, 'w') as f:
+            f.write(content)
+        paths.append(path)
+
+    return paths
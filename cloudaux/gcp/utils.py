@@ -5,6 +5,7 @@
     :license: Apache, see LICENSE for more details.
 .. moduleauthor:: Tom Melendez (@supertom) <supertom@google.com>
 """
+from concurrent.futures import ThreadPoolExecutor
 
 
 def strdate(dte):
@@ -61,53 +62,137 @@ def rewrite_kwargs(conn_type, kwargs, module_name=None):
     return kwargs
 
 
-def gce_list_aggregated(service=None, key_name='name', **kwargs):
-    """General aggregated list function for the GCE service."""
-    resp_list = []
-    req = service.aggregatedList(**kwargs)
+def _iter_pages(req, next_page, prefetch=False):
+    """
+    Yields each page (response) of a paginated request.
+
+    :param next_page: callable taking the previous request and response, returning the next request or None.
+    :param prefetch: If True, the next page is fetched in the background while the caller processes this one.
+    """
+    if not prefetch:
+        while req is not None:
+            resp = req.execute()
+            yield resp
+            req = next_page(req, resp)
+        return
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        future = executor.submit(req.execute) if req is not None else None
+        while future is not None:
+            resp = future.result()
+            req = next_page(req, resp)
+            future = executor.submit(req.execute) if req is not None else None
+            yield resp
+
+
+def gce_list_aggregated_iter(service=None, key_name='name', prefetch=False, tag_location=False, **kwargs):
+    """
+    General aggregated list generator for the GCE service. Yields the items page by page.
 
-    while req is not None:
-        resp = req.execute()
-        for location, item in resp['items'].items():
+    :param tag_location: If True, each item is tagged with the zone or region it was listed under,
+                         as 'location' (i.e. 'us-central1-a', 'us-central1' or 'global').
+    """
+    pages = _iter_pages(service.aggregatedList(**kwargs),
+                        lambda req, resp: service.aggregatedList_next(previous_request=req, previous_response=resp),
+                        prefetch=prefetch)
+    for resp in pages:
+        for location, item in resp.get('items', {}).items():
             if key_name in item:
-                resp_list.extend(item[key_name])
+                for i in item[key_name]:
+                    if tag_location:
+                        # i.e. 'zones/us-central1-a' -> 'us-central1-a'
+                        i['location'] = location.split('/')[-1]
+                    yield i
+
+
+def gce_list_iter(service=None, prefetch=False, **kwargs):
+    """General list generator for the GCE service. Yields the items page by page."""
+    pages = _iter_pages(service.list(**kwargs),
+                        lambda req, resp: service.list_next(previous_request=req, previous_response=resp),
+                        prefetch=prefetch)
+    for resp in pages:
+        for item in resp.get('items', []):
+            yield item
 
-        req = service.aggregatedList_next(previous_request=req,
-                                          previous_response=resp)
-    return resp_list
+
+def service_list_iter(service=None, key_name=None, prefetch=False, **kwargs):
+    """General list generator for Google APIs. Yields the items page by page."""
+    def next_page(req, resp):
+        # Not all list calls have a list_next
+        if hasattr(service, 'list_next'):
+            return service.list_next(previous_request=req, previous_response=resp)
+        return None
+
+    for resp in _iter_pages(service.list(**kwargs), next_page, prefetch=prefetch):
+        if key_name and key_name in resp:
+            for item in resp[key_name]:
+                yield item
+        else:
+            yield resp
+
+
+def gce_list_aggregated(service=None, key_name='name', tag_location=False, **kwargs):
+    """General aggregated list function for the GCE service."""
+    return list(gce_list_aggregated_iter(service=service, key_name=key_name, tag_location=tag_location, **kwargs))
 
 
 def gce_list(service=None, **kwargs):
     """General list function for the GCE service."""
-    resp_list = []
-    req = service.list(**kwargs)
-
-    while req is not None:
-        resp = req.execute()
-        for item in resp.get('items', []):
-            resp_list.append(item)
-        req = service.list_next(previous_request=req, previous_response=resp)
-    return resp_list
+    return list(gce_list_iter(service=service, **kwargs))
 
 
 def service_list(service=None, key_name=None, **kwargs):
     """General list function for Google APIs."""
-    resp_list = []
-    req = service.list(**kwargs)
+    return list(service_list_iter(service=service, key_name=key_name, **kwargs))
 
-    while req is not None:
-        resp = req.execute()
-        if key_name and key_name in resp:
-            resp_list.extend(resp[key_name])
-        else:
-            resp_list.append(resp)
-        # Not all list calls have a list_next
-        if hasattr(service, 'list_next'):
-            req = service.list_next(previous_request=req,
-                                    previous_response=resp)
-        else:
-            req = None
-    return resp_list
+
+def batch_execute(client, requests, batch_size=None):
+    """
+    Executes many requests with as few HTTP round trips as possible, using BatchHttpRequest.
+
+    Sub-requests that fail in a batch (or whole batches that fail) are retried individually, once.
+
+    :param client: google-api-python-client client the requests were made with.
+    :param requests: dict of key -> request, i.e. {name: service.get(name=name)}. Not yet executed.
+    :param batch_size: calls per batch. Default is BATCH_SIZE (the APIs allow up to 1000).
+    :returns: tuple of a dict of key -> response and a dict of key -> exception, for the requests
+              that failed on retry.
+    :rtype: ``tuple`` of ``dict``, ``dict``
+    """
+    from cloudaux.gcp.config import BATCH_SIZE
+    batch_size = batch_size or BATCH_SIZE
+
+    keys = list(requests)
+    responses = {}
+    failed = []
+
+    for start in range(0, len(keys), batch_size):
+        chunk = keys[start:start + batch_size]
+
+        def callback(request_id, response, exception):
+            key = chunk[int(request_id)]
+            if exception is not None:
+                failed.append(key)
+            else:
+                responses[key] = response
+
+        batch = client.new_batch_http_request(callback=callback)
+        for index, key in enumerate(chunk):
+            batch.add(requests[key], request_id=str(index))
+
+        try:
+            batch.execute()
+        except Exception:
+            failed.extend(key for key in chunk if key not in responses and key not in failed)
+
+    exceptions = {}
+    for key in failed:
+        try:
+            responses[key] = requests[key].execute()
+        except Exception as e:
+            exceptions[key] = e
+
+    return responses, exceptions
 
 
 def get_cache_stats():
@@ -122,10 +207,15 @@ def get_cache_access_details(key=None):
     return _GCP_CACHE.get_access_details(key=key)
 
 
-def get_gcp_stats():
-    """Retrieve stats, such as function timings."""
+def get_gcp_stats(reset=False):
+    """
+    Retrieve stats, such as function timings.
+
+    :param reset: Clear the stats after taking this snapshot. Default is False.
+    :returns: dict of function name -> count, sum, min, max, mean, p50, p90 and p99 of the call durations.
+    """
     from cloudaux.gcp.decorators import _GCP_STATS
-    return _GCP_STATS
+    return _GCP_STATS.snapshot(reset=reset)
 
 
 def get_user_agent_default(pkg_name='cloudaux'):
@@ -5,20 +5,59 @@
     :license: Apache, see LICENSE for more details.
 .. moduleauthor:: Michael Stair <mstair@att.com>
 """
-import os
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from functools import wraps
 
-from openstack import connect
+from keystoneauth1.exceptions import ClientException
 from openstack.config.loader import OpenStackConfig
+from openstack.connection import Connection
 from openstack.exceptions import HttpException
 
+from cloudaux.stats import StatsRegistry, timed
+from cloudaux.streaming import iter_sharded
+
 """ this is mix of the aws and gcp decorator conventions """
 
 CACHE = {}
+# Guards CACHE and _KEY_LOCKS. Connecting and refreshing happen under the per-key locks, so one
+# cloud region's Keystone round trip doesn't hold up the others:
+_CACHE_LOCK = threading.Lock()
+_KEY_LOCKS = {}
+_OPENSTACK_STATS = StatsRegistry()
+
+RegionResult = namedtuple('RegionResult', ['account_name', 'cloud_name', 'region', 'item', 'exception'])
+
+# Tokens are refreshed when they are this close to expiring, rather than once a request fails:
+TOKEN_REFRESH_SECONDS = 300
 
 def _connect(cloud_name, region, yaml_file):
-    os.environ["OS_CLIENT_CONFIG_FILE"] = yaml_file
-    return connect(cloud=cloud_name, region_name=region)
+    """ load the config directly (rather than through OS_CLIENT_CONFIG_FILE), so concurrent connects don't race """
+    config = OpenStackConfig(config_files=[yaml_file]).get_one(cloud=cloud_name, region_name=region)
+    return Connection(config=config)
+
+
+def _refresh_token(conn):
+    """
+    Check the token against its known expiry, locally, and refresh it if it is about to expire.
+
+    Tokens that are revoked before they expire are re-authenticated by keystoneauth when a request gets a 401.
+
+    :returns: False if the token could not be refreshed.
+    """
+    auth = conn.session.auth
+    auth_ref = getattr(auth, 'auth_ref', None)
+    if auth_ref is None or not auth_ref.will_expire_soon(TOKEN_REFRESH_SECONDS):
+        # Either still valid, or not authenticated yet (which happens on the first request)
+        return True
+
+    auth.invalidate()
+    try:
+        auth.get_access(conn.session)
+    except (ClientException, HttpException):
+        return False
+    return True
 
 
 def get_regions(cloud_name, yaml_file):
@@ -29,24 +68,25 @@ def get_regions(cloud_name, yaml_file):
 def keystone_cached_conn(cloud_name, region, yaml_file):
     key = (
         cloud_name,
-        region )
-
-    if key in CACHE:
-        """ check the token to see if our connection is still valid """
-        _cloud_name, conn = CACHE[key]
-        try:
-            conn.authorize()
-        except HttpException:
-            del CACHE[key]
-        else:
-            return conn
-    try:
-        conn = _connect(cloud_name, region, yaml_file)
-    except Exception as e:
-        raise e
+        region,
+        yaml_file )
+
+    with _CACHE_LOCK:
+        key_lock = _KEY_LOCKS.setdefault(key, threading.Lock())
+
+    with key_lock:
+        with _CACHE_LOCK:
+            cached = CACHE.get(key)
 
-    CACHE[key] = (conn.name, conn)
-    return conn
+        if cached:
+            _cloud_name, conn = cached
+            if _refresh_token(conn):
+                return conn
+
+        conn = _connect(cloud_name, region, yaml_file)
+        with _CACHE_LOCK:
+            CACHE[key] = (conn.name, conn)
+        return conn
 
 def openstack_conn():
     def decorator(f):
@@ -61,24 +101,95 @@ def openstack_conn():
     return decorator
 
 
-def iter_account_region(account_regions):
+def openstack_stats():
+    """ time function calls, see get_openstack_stats() """
+    return timed(_OPENSTACK_STATS)
+
+
+def _account_region_kwargs(account_regions):
+    """ returns the kwargs for each account and region, in the order of account_regions """
+    calls = []
+    for account_creds, regions in account_regions.items():
+        account_name, cloud_name, yaml_file = account_creds
+        calls.extend({'account_name': account_name, 'cloud_name': cloud_name,
+                      'yaml_file': yaml_file, 'region': region} for region in regions)
+    return calls
+
+
+def _interleaved(account_regions):
+    """
+    Returns the indexes into _account_region_kwargs(account_regions), region by region, so that the
+    calls for the different clouds are interleaved rather than queued on one cloud's limit.
+    """
+    ranks = [rank for regions in account_regions.values() for rank in range(len(regions))]
+    return sorted(range(len(ranks)), key=lambda i: ranks[i])
+
+
+def iter_account_region(account_regions, max_workers=10, max_per_cloud=2):
+    """
+    Call decorated function for each account and region, concurrently.
+
+    Returns the list of (non-empty) results, in the order of account_regions.
+
+    :param account_regions: dict of (account_name, cloud_name, yaml_file) -> list of regions.
+    :param max_workers: maximum number of concurrent calls overall. Default is 10.
+    :param max_per_cloud: maximum number of concurrent calls for any one cloud. Default is 2.
+    """
+    def decorator(func):
+        @wraps(func)
+        def decorated_function(*args, **kwargs):
+            calls = _account_region_kwargs(account_regions)
+            semaphores = dict((call['cloud_name'], threading.BoundedSemaphore(max_per_cloud)) for call in calls)
+
+            def call(call_kwargs):
+                with semaphores[call_kwargs['cloud_name']]:
+                    return func(*args, **dict(kwargs, **call_kwargs))
+
+            futures = {}
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                for i in _interleaved(account_regions):
+                    futures[i] = executor.submit(call, calls[i])
+
+            results = [futures[i].result() for i in range(len(calls))]
+            return [result for result in results if result]
+        return decorated_function
+    return decorator
+
+
+def stream_account_region(account_regions, max_workers=10, max_per_cloud=2, buffer_size=1000):
+    """
+    Streams the items from each account and region, listing them concurrently.
+
+    The decorated function returns an iterable of items for one account and region (ideally a
+    generator, i.e. `iter_items`, so the SDK's pagination stays lazy). The decorated function returns
+    a generator of RegionResult(account_name, cloud_name, region, item, exception), yielded as the
+    items are produced. At most `buffer_size` items are held waiting for the caller.
+
+    An exception raised for one region is yielded as a RegionResult (with item None), and doesn't
+    stop the others.
+
+    :param account_regions: dict of (account_name, cloud_name, yaml_file) -> list of regions.
+    :param max_workers: maximum number of regions listed concurrently. Default is 10.
+    :param max_per_cloud: maximum number of regions listed concurrently for any one cloud. Default is 2.
+    :param buffer_size: maximum number of items waiting to be consumed. Default is 1000.
+    """
     def decorator(func):
         @wraps(func)
         def decorated_function(*args, **kwargs):
-            threads = []
-            for account_creds, regions in account_regions.iteritems():
-                account_name, cloud_name, yaml_file = account_creds
-                for region in regions:
-                    kwargs['account_name'] = account_name
-                    kwargs['cloud_name'] = cloud_name
-                    kwargs['yaml_file'] = yaml_file
-                    kwargs['region'] = region
-                    result = func(*args, **kwargs)
-                    if result:
-                        threads.append(result)
-            result = []
-            for thread in threads:
-                result.append(thread)
-            return result
+            calls = _account_region_kwargs(account_regions)
+            semaphores = dict((call['cloud_name'], threading.BoundedSemaphore(max_per_cloud)) for call in calls)
+
+            def list_region(call_kwargs):
+                labels = (call_kwargs['account_name'], call_kwargs['cloud_name'], call_kwargs['region'])
+                with semaphores[call_kwargs['cloud_name']]:
+                    try:
+                        for item in func(*args, **dict(kwargs, **call_kwargs)):
+                            yield RegionResult(*labels, item=item, exception=None)
+                    except Exception as e:
+                        yield RegionResult(*labels, item=None, exception=e)
+
+            calls = [calls[i] for i in _interleaved(account_regions)]
+            for result in iter_sharded(list_region, calls, max_workers=max_workers, buffer_size=buffer_size):
+                yield result
         return decorated_function
     return decorator
@@ -5,12 +5,36 @@
     :license: Apache, see LICENSE for more details.
 .. moduleauthor:: Michael Stair <mstair@att.com>
 """
-from cloudaux.openstack.decorators import openstack_conn
+from cloudaux.openstack.decorators import openstack_conn, openstack_stats, _OPENSTACK_STATS
 
+def _items(conn, **kwargs):
+    return getattr( getattr( conn, kwargs.pop('service') ), kwargs.pop('generator'))(**kwargs)
+
+
+@openstack_stats()
 @openstack_conn()
 def list_items(conn=None, **kwargs):
     """
     :rtype: ``list``
     """
-    return [x for x in getattr( getattr( conn, kwargs.pop('service') ),
-                kwargs.pop('generator'))(**kwargs)]
+    return [x for x in _items(conn, **kwargs)]
+
+
+@openstack_conn()
+def iter_items(conn=None, **kwargs):
+    """
+    Same as list_items, but returns the SDK's generator as is, so pages are only fetched
+    as the items are consumed.
+
+    :rtype: ``generator``
+    """
+    return _items(conn, **kwargs)
+
+
+def get_openstack_stats(reset=False):
+    """
+    Retrieve stats, such as function timings.
+
+    :rtype: ``dict`` of function name -> count, sum, min, max, mean, p50, p90 and p99
+    """
+    return _OPENSTACK_STATS.snapshot(reset=reset)
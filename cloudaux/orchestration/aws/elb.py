@@ -1,11 +1,19 @@
 from cloudaux.aws.elb import *
 from cloudaux.decorators import modify_output
+from cloudaux.orchestration import modify
 from flagpole import FlagRegistry, Flags
+from joblib import Parallel, delayed
 
 
 registry = FlagRegistry()
 FLAGS = Flags('BASE', 'ATTRIBUTES', 'TAGS', 'POLICIES', 'POLICY_TYPES')
 
+# DescribeTags accepts up to 20 load balancer names per call:
+DESCRIBE_TAGS_CHUNK_SIZE = 20
+
+# Upper bound on the concurrent per-ELB calls made by get_all_load_balancers:
+ELB_FETCH_THREADS = 10
+
 
 def _reformat_policy(policy):
     """
@@ -103,16 +111,20 @@ def get_tags(load_balancer, **conn):
 @registry.register(flag=FLAGS.POLICIES, depends_on=FLAGS.BASE, key='policy_descriptions')
 def get_policies(load_balancer, **conn):
     result = dict()
+    descriptions = _describe_policies(load_balancer, **conn)
+    for description in descriptions:
+        policy_name, reformatted_policy = _reformat_policy(description)
+        result[policy_name] = reformatted_policy
+    return result
+
+
+def _describe_policies(load_balancer, **conn):
     policy_names = set()
     for listener in load_balancer['ListenerDescriptions']:
         listener_policy_names = listener['PolicyNames']
         policy_names = policy_names.union(set(listener_policy_names))
 
-    descriptions = describe_load_balancer_policies(load_balancer['LoadBalancerName'], list(policy_names), **conn)
-    for description in descriptions:
-        policy_name, reformatted_policy = _reformat_policy(description)
-        result[policy_name] = reformatted_policy
-    return result
+    return describe_load_balancer_policies(load_balancer['LoadBalancerName'], list(policy_names), **conn)
 
 
 @registry.register(flag=FLAGS.POLICY_TYPES, depends_on=FLAGS.POLICIES, key='policy_type_descriptions')
@@ -187,4 +199,75 @@ def get_load_balancer(load_balancer, flags=FLAGS.ALL ^ FLAGS.POLICY_TYPES, **con
     if isinstance(load_balancer, basestring):
         load_balancer = dict(LoadBalancerName=load_balancer)
 
-    return registry.build_out(flags, start_with=load_balancer, pass_datastructure=True, **conn)
\ No newline at end of file
+    return registry.build_out(flags, start_with=load_balancer, pass_datastructure=True, **conn)
+
+
+def _get_details(load_balancer, flags, **conn):
+    """Makes the per-ELB calls for get_all_load_balancers."""
+    details = dict()
+    if flags & FLAGS.ATTRIBUTES:
+        details['attributes'] = get_attributes(load_balancer, **conn)
+
+    if flags & FLAGS.POLICIES:
+        details['policy_descriptions'] = _describe_policies(load_balancer, **conn)
+
+    return details
+
+
+def get_all_load_balancers(flags=FLAGS.ALL ^ FLAGS.POLICY_TYPES, **conn):
+    """
+    Fully describes all of the ELBs in a region.
+
+    - The ELBs are described with a single (paginated) describe_load_balancers call.
+    - Tags are fetched for DESCRIBE_TAGS_CHUNK_SIZE ELBs per describe_tags call.
+    - Attributes and policies are fetched concurrently for up to ELB_FETCH_THREADS ELBs at a time.
+    - The policy types are described once for the region.
+
+    :param flags: Flags describing which sections should be included in the return value. Default is FLAGS.ALL minus FLAGS.POLICY_TYPES.
+    :return: Returns a list of dictionaries describing the ELBs, in the same format as get_load_balancer.
+    """
+    output = conn.pop('output', 'camelized')
+
+    if flags & FLAGS.POLICY_TYPES:
+        flags = flags | FLAGS.POLICIES
+
+    load_balancers = [get_base(load_balancer, **conn) for load_balancer in describe_load_balancers(**conn)]
+    names = [load_balancer['LoadBalancerName'] for load_balancer in load_balancers]
+
+    tags = dict()
+    if flags & FLAGS.TAGS:
+        for i in range(0, len(names), DESCRIBE_TAGS_CHUNK_SIZE):
+            for description in describe_tags(names[i:i + DESCRIBE_TAGS_CHUNK_SIZE], **conn):
+                tags[description['LoadBalancerName']] = description['Tags']
+
+    all_details = Parallel(n_jobs=ELB_FETCH_THREADS, backend="threading")(
+        delayed(_get_details)(load_balancer, flags, **conn) for load_balancer in load_balancers
+    )
+
+    policy_types = None
+    results = []
+    for load_balancer, details in zip(load_balancers, all_details):
+        if 'attributes' in details:
+            load_balancer['attributes'] = details['attributes']
+
+        if flags & FLAGS.TAGS:
+            load_balancer['tags'] = tags.get(load_balancer['LoadBalancerName'], [])
+
+        if flags & FLAGS.POLICIES:
+            load_balancer['policy_descriptions'] = dict(
+                _reformat_policy(description) for description in details['policy_descriptions'])
+
+        if flags & FLAGS.POLICY_TYPES:
+            if policy_types is None:
+                # Describing no policy types returns all of them:
+                policy_types = {p['PolicyTypeName']: p for p in describe_load_balancer_policy_types([], **conn)}
+
+            type_names = set(policy['type'] for policy in load_balancer['policy_descriptions'].values())
+            if type_names:
+                load_balancer['policy_type_descriptions'] = [policy_types[t] for t in type_names if t in policy_types]
+            else:
+                load_balancer['policy_type_descriptions'] = list(policy_types.values())
+
+        results.append(modify(load_balancer, output=output))
+
+    return results
@@ -1,11 +1,21 @@
+import copy
+
 from cloudaux.aws.elbv2 import *
 from cloudaux.decorators import modify_output
+from cloudaux.orchestration import modify
 from flagpole import FlagRegistry, Flags
+from joblib import Parallel, delayed
 
 registry = FlagRegistry()
 FLAGS = Flags('BASE', 'LISTENERS', 'RULES', 'ATTRIBUTES', 'TAGS',
               'TARGET_GROUPS', 'TARGET_GROUP_ATTRIBUTES', 'TARGET_GROUP_HEALTH')
 
+# DescribeTags accepts up to 20 resource ARNs per call:
+DESCRIBE_TAGS_CHUNK_SIZE = 20
+
+# Upper bound on the concurrent calls made by get_all_load_balancers_v2:
+ELBV2_FETCH_THREADS = 10
+
 
 @registry.register(flag=FLAGS.LISTENERS, depends_on=FLAGS.BASE, key='listeners')
 def get_listeners(alb, **conn):
@@ -112,3 +122,118 @@ def get_elbv2(alb, flags=FLAGS.ALL, **conn):
             alb = dict(LoadBalancerArn=alb)
 
     return registry.build_out(flags, start_with=alb, pass_datastructure=True, **conn)
+
+
+def _fan_out(calls, **conn):
+    """Makes the (func, arg) calls concurrently and returns a dict of arg -> result for each func."""
+    results = Parallel(n_jobs=ELBV2_FETCH_THREADS, backend="threading")(
+        delayed(func)(arg, **conn) for func, arg in calls
+    )
+
+    by_func = dict()
+    for (func, arg), result in zip(calls, results):
+        by_func.setdefault(func, dict())[arg] = result
+    return by_func
+
+
+def _describe_listeners(alb_arn, **conn):
+    return describe_listeners(load_balancer_arn=alb_arn, **conn)
+
+
+def _describe_rules(listener_arn, **conn):
+    return describe_rules(listener_arn=listener_arn, **conn)
+
+
+def get_all_load_balancers_v2(flags=FLAGS.ALL, **conn):
+    """
+    Fully describes all of the ALBs (ELBv2) in a region.
+
+    Rather than walking one ALB at a time:
+    - Tags are fetched for DESCRIBE_TAGS_CHUNK_SIZE ALBs per describe_tags call.
+    - All of the target groups in the region are described once, and joined to their ALBs.
+    - Target groups shared by several ALBs only have their attributes and health described once.
+    - Listeners, rules, and attributes are fetched concurrently (up to ELBV2_FETCH_THREADS calls at a time).
+
+    :param flags: Flags describing which sections should be included in the return value. Default is FLAGS.ALL.
+    :return: Returns a list of dictionaries describing the ALBs, in the same format as get_elbv2.
+    """
+    output = conn.pop('output', 'camelized')
+
+    if flags & FLAGS.RULES:
+        flags = flags | FLAGS.LISTENERS
+    if flags & (FLAGS.TARGET_GROUP_ATTRIBUTES | FLAGS.TARGET_GROUP_HEALTH):
+        flags = flags | FLAGS.TARGET_GROUPS
+
+    albs = [get_base(alb, **conn) for alb in describe_load_balancers(**conn)]
+    if not albs:
+        return []
+
+    alb_arns = [alb['LoadBalancerArn'] for alb in albs]
+
+    tags = dict()
+    if flags & FLAGS.TAGS:
+        for i in range(0, len(alb_arns), DESCRIBE_TAGS_CHUNK_SIZE):
+            for description in describe_tags(alb_arns[i:i + DESCRIBE_TAGS_CHUNK_SIZE], **conn):
+                tags[description['ResourceArn']] = description
+
+    target_groups = dict()
+    if flags & FLAGS.TARGET_GROUPS:
+        for target_group in describe_target_groups(**conn):
+            for alb_arn in target_group.get('LoadBalancerArns', []):
+                target_groups.setdefault(alb_arn, []).append(target_group)
+
+    # Each of the shared target groups is only described once:
+    target_group_arns = list(dict.fromkeys(
+        target_group['TargetGroupArn'] for alb_arn in alb_arns for target_group in target_groups.get(alb_arn, [])))
+
+    calls = list()
+    if flags & FLAGS.LISTENERS:
+        calls.extend((_describe_listeners, alb_arn) for alb_arn in alb_arns)
+    if flags & FLAGS.ATTRIBUTES:
+        calls.extend((describe_load_balancer_attributes, alb_arn) for alb_arn in alb_arns)
+    if flags & FLAGS.TARGET_GROUP_ATTRIBUTES:
+        calls.extend((describe_target_group_attributes, arn) for arn in target_group_arns)
+    if flags & FLAGS.TARGET_GROUP_HEALTH:
+        calls.extend((describe_target_health, arn) for arn in target_group_arns)
+
+    results = _fan_out(calls, **conn)
+
+    if flags & FLAGS.RULES:
+        listener_arns = [listener['ListenerArn'] for alb_arn in alb_arns
+                         for listener in results[_describe_listeners][alb_arn]]
+        results.update(_fan_out([(_describe_rules, arn) for arn in listener_arns], **conn))
+
+    all_albs = list()
+    for alb in albs:
+        alb_arn = alb['LoadBalancerArn']
+
+        if flags & FLAGS.LISTENERS:
+            alb['listeners'] = results[_describe_listeners][alb_arn]
+
+        if flags & FLAGS.RULES:
+            alb['rules'] = [rule for listener in alb['listeners']
+                            for rule in results[_describe_rules][listener['ListenerArn']]]
+
+        if flags & FLAGS.ATTRIBUTES:
+            alb['attributes'] = results[describe_load_balancer_attributes][alb_arn]
+
+        if flags & FLAGS.TAGS:
+            alb['tags'] = [tags[alb_arn]] if alb_arn in tags else []
+
+        # The shared target groups are copied per ALB, so the results don't share (and mutate) nested dicts:
+        if flags & FLAGS.TARGET_GROUPS:
+            alb['target_groups'] = copy.deepcopy(target_groups.get(alb_arn, []))
+
+        if flags & FLAGS.TARGET_GROUP_ATTRIBUTES:
+            alb['target_group_attributes'] = copy.deepcopy([
+                attribute for target_group in alb['target_groups']
+                for attribute in results[describe_target_group_attributes][target_group['TargetGroupArn']]])
+
+        if flags & FLAGS.TARGET_GROUP_HEALTH:
+            alb['target_group_health'] = copy.deepcopy([
+                health for target_group in alb['target_groups']
+                for health in results[describe_target_health][target_group['TargetGroupArn']]])
+
+        all_albs.append(modify(alb, output=output))
+
+    return all_albs
@@ -6,8 +6,10 @@
 .. moduleauthor:: Mike Grima <mgrima@netflix.com>
 """
 from cloudaux import get_iso_string
-from cloudaux.aws.iam import get_policy, get_managed_policy_document
+from cloudaux.aws.iam import get_policy, get_managed_policy_document, \
+    get_all_managed_policies as get_all_managed_policies_api
 from cloudaux.decorators import modify_output
+from cloudaux.orchestration import modify
 from flagpole import FlagRegistry, Flags
 
 from cloudaux.orchestration.aws import _conn_from_args
@@ -18,13 +20,20 @@ registry = FlagRegistry()
 FLAGS = Flags('BASE')
 
 
+def _fingerprint(policy, state_store):
+    """Policy versions are immutable, so the default version and update date identify the current document."""
+    return state_store.fingerprint(policy['DefaultVersionId'], policy['UpdateDate'])
+
+
 @registry.register(flag=FLAGS.BASE)
-def get_base(managed_policy, **conn):
+def get_base(managed_policy, state_store=None, **conn):
     """Fetch the base Managed Policy.
 
     This includes the base policy and the latest version document.
 
     :param managed_policy:
+    :param state_store: Optional IAMStateStore. If the policy is unchanged since it was last stored, the
+                        document is taken from the store rather than fetched again.
     :param conn:
     :return:
     """
@@ -32,7 +41,16 @@ def get_base(managed_policy, **conn):
 
     arn = _get_name_from_structure(managed_policy, 'Arn')
     policy = get_policy(arn, **conn)
-    document = get_managed_policy_document(arn, policy_metadata=policy, **conn)
+
+    document = None
+    if state_store:
+        fingerprint = _fingerprint(policy['Policy'], state_store)
+        stored = state_store.get(arn, fingerprint)
+        if stored:
+            document = stored['Document']
+
+    if document is None:
+        document = get_managed_policy_document(arn, policy_metadata=policy, **conn)
 
     managed_policy.update(policy['Policy'])
     managed_policy['Document'] = document
@@ -41,6 +59,9 @@ def get_base(managed_policy, **conn):
     managed_policy['CreateDate'] = get_iso_string(managed_policy['CreateDate'])
     managed_policy['UpdateDate'] = get_iso_string(managed_policy['UpdateDate'])
 
+    if state_store:
+        state_store.put(arn, fingerprint, dict(managed_policy))
+
     return managed_policy
 
 
@@ -67,7 +88,7 @@ def get_managed_policy(managed_policy, flags=FLAGS.ALL, **conn):
 
     :param managed_policy: dict MUST contain the ARN.
     :param flags:
-    :param conn:
+    :param conn: May contain a `state_store` (IAMStateStore) to skip the document fetch for unchanged policies.
     :return:
     """
     if not managed_policy.get('Arn'):
@@ -75,3 +96,38 @@ def get_managed_policy(managed_policy, flags=FLAGS.ALL, **conn):
 
     _conn_from_args(managed_policy, conn)
     return registry.build_out(flags, start_with=managed_policy, pass_datastructure=True, **conn)
+
+
+def get_all_managed_policies(scope='Local', flags=FLAGS.ALL, state_store=None, **conn):
+    """
+    Returns a list of Managed Policies in the same format as `get_managed_policy`.
+
+    With a `state_store` this is incremental: `list_policies` already returns the DefaultVersionId and
+    UpdateDate of every policy, so policies that are unchanged since the last sweep are built from the store
+    without any further API calls. Only new or changed policies are fetched.
+
+    :param scope: 'Local', 'AWS' or 'All' -- passed to `list_policies`. [Default 'Local']
+    :param flags:
+    :param state_store: Optional IAMStateStore holding the results of the previous sweep.
+    :param conn: dict containing enough information to make a connection to the desired account.
+    :return: list of dicts containing fully built out Managed Policies.
+    """
+    output = conn.pop('output', 'camelized')
+    policies = []
+
+    for policy in get_all_managed_policies_api(Scope=scope, **conn):
+        if state_store:
+            # The store holds the policies as built out by get_base, before `modify`:
+            stored = state_store.get(policy['Arn'], _fingerprint(policy, state_store))
+            if stored:
+                # The attachment counts change without the policy document changing:
+                stored = dict(stored)
+                stored.update({key: policy[key] for key in ('AttachmentCount', 'PermissionsBoundaryUsageCount',
+                                                            'IsAttachable') if key in policy})
+                policies.append(modify(stored, output=output))
+                continue
+
+        policies.append(get_managed_policy({'Arn': policy['Arn']}, flags=flags, state_store=state_store,
+                                           output=output, **conn))
+
+    return policies
@@ -0,0 +1,54 @@
+"""
+.. module: cloudaux.orchestration.aws.iam.state
+    :platform: Unix
+    :copyright: (c) 2018 by Netflix Inc., see AUTHORS for more
+    :license: Apache, see LICENSE for more details.
+"""
+import hashlib
+import json
+import os
+
+
+class IAMStateStore(object):
+    """Local store of the last-seen fingerprint (and value) for IAM entities.
+
+    Used by the IAM orchestrators to skip expensive fetches for entities that have not changed
+    since the previous sweep. The store is a plain dict, optionally persisted as JSON on disk:
+
+        store = IAMStateStore(path='/var/tmp/iam_state.json')
+        policies = get_all_managed_policies(state_store=store, **conn)
+        store.save()
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self._state = {}
+
+        if path and os.path.exists(path):
+            with open(path, 'r') as f:
+                self._state = json.load(f)
+
+    @staticmethod
+    def fingerprint(*parts):
+        """Returns a stable hash over the (JSON serializable) parts that identify an entity's revision."""
+        serialized = json.dumps(parts, sort_keys=True, default=str)
+        return hashlib.sha256(serialized.encode('utf-8')).hexdigest()
+
+    def get(self, key, fingerprint):
+        """Returns the stored value for the key if its fingerprint still matches, otherwise None."""
+        entry = self._state.get(key)
+        if entry and entry['fingerprint'] == fingerprint:
+            return entry['value']
+
+        return None
+
+    def put(self, key, fingerprint, value):
+        self._state[key] = {'fingerprint': fingerprint, 'value': value}
+
+    def save(self):
+        """Writes the store out to the path it was created with (if any)."""
+        if not self.path:
+            return
+
+        with open(self.path, 'w') as f:
+            json.dump(self._state, f, sort_keys=True, default=str)
@@ -1,13 +1,76 @@
 from cloudaux.aws.lambda_function import *
 from cloudaux.decorators import modify_output
+from cloudaux.orchestration import modify
+from botocore.exceptions import ClientError
 from flagpole import FlagRegistry, Flags
+from joblib import Parallel, delayed
 import json
+import threading
 
 from cloudaux.orchestration.aws import ARN
 
 registry = FlagRegistry()
 FLAGS = Flags('BASE', 'ALIASES', 'EVENT_SOURCE_MAPPINGS', 'VERSIONS', 'TAGS', 'POLICY')
 
+# Upper bound on the concurrent GetPolicy calls made for a single function:
+POLICY_FETCH_THREADS = 10
+
+# Upper bound on the functions built out concurrently by get_all_lambda_functions:
+FUNCTION_FETCH_THREADS = 10
+
+BASE_FIELDS = frozenset(
+    ['FunctionName', 'FunctionArn', 'Runtime', 'Role', 'Handler',
+    'CodeSize', 'Description', 'Timeout', 'MemorySize', 'LastModified',
+    'CodeSha256', 'Version', 'VpcConfig', 'DeadLetterConfig', 'Environment',
+    'KMSKeyArn', 'TracingConfig', 'MasterArn'])
+
+# Set on the get_all_lambda_functions workers, which already run FUNCTION_FETCH_THREADS at a time,
+# so each function's policies are fetched in its own job rather than in a nested pool:
+_SERIAL_POLICIES = threading.local()
+
+
+def _fetch_policy(function_name, qualifier=None, **conn):
+    """Returns the parsed policy for the function (or qualifier), or None if it doesn't have one."""
+    kwargs = dict(FunctionName=function_name)
+    if qualifier:
+        kwargs['Qualifier'] = qualifier
+    kwargs.update(conn)
+
+    try:
+        return json.loads(get_policy(**kwargs))
+    except ClientError as e:
+        if e.response['Error']['Code'] != 'ResourceNotFoundException':
+            raise
+
+    return None
+
+
+def _policy_qualifiers(lambda_function):
+    """The qualifiers to fetch the policies of: None (the default policy), the versions and the aliases."""
+    versions = [v['Version'] for v in lambda_function['versions'] if v['Version'] != '$LATEST']
+    aliases = [a['Name'] for a in lambda_function['aliases']]
+    return [None] + versions + aliases
+
+
+def _format_policies(lambda_function, results):
+    """Arranges the fetched policies (a dict of qualifier -> policy) by DEFAULT, Versions and Aliases."""
+    policies = dict(Versions=dict(), Aliases=dict(), DEFAULT=dict())
+
+    if results[None] is not None:
+        policies['DEFAULT'] = results[None]
+        if any(v['Version'] == '$LATEST' for v in lambda_function['versions']):
+            policies['Versions']['$LATEST'] = results[None]
+
+    for version in lambda_function['versions']:
+        if results.get(version['Version']) is not None:
+            policies['Versions'][version['Version']] = results[version['Version']]
+
+    for alias in lambda_function['aliases']:
+        if results.get(alias['Name']) is not None:
+            policies['Aliases'][alias['Name']] = results[alias['Name']]
+
+    return policies
+
 
 @registry.register(flag=FLAGS.POLICY, depends_on=FLAGS.VERSIONS, key='policy')
 def _get_policy(lambda_function, **conn):
@@ -16,33 +79,20 @@ def _get_policy(lambda_function, **conn):
     Lambda Function Policies are overly complicated.  They can be attached to a label,
     a version, and there is also a default policy.
     
-    This method attempts to gather all three types.
-    
-    AWS returns an exception if the policy requested does not exist.  We catch and ignore these exceptions.
-    """
-    policies = dict(Versions=dict(), Aliases=dict(), DEFAULT=dict())
-
-    for version in [v['Version'] for v in lambda_function['versions']]:
-        try:
-            policies['Versions'][version] = get_policy(FunctionName=lambda_function['FunctionName'], Qualifier=version, **conn)
-            policies['Versions'][version] = json.loads(policies['Versions'][version])
-        except Exception as e:
-            pass
-
-    for alias in [v['Name'] for v in lambda_function['aliases']]:
-        try:
-            policies['Aliases'][alias] = get_policy(FunctionName=lambda_function['FunctionName'], Qualifier=alias, **conn)
-            policies['Aliases'][alias] = json.loads(policies['Aliases'][alias])
-        except Exception as e:
-            pass
-
-    try:
-        policies['DEFAULT'] = get_policy(FunctionName=lambda_function['FunctionName'], **conn)
-        policies['DEFAULT'] = json.loads(policies['DEFAULT'])
-    except Exception as e:
-        pass
+    This method attempts to gather all three types.  The policies are fetched concurrently
+    (up to POLICY_FETCH_THREADS at a time), or one at a time on the get_all_lambda_functions workers.
+    The $LATEST version shares the default (unqualified) policy, so that is only fetched once.
 
-    return policies
+    AWS returns a ResourceNotFoundException if the policy requested does not exist.  We catch and ignore these.
+    Any other error (other than throttling, which is retried) is raised.
+    """
+    qualifiers = _policy_qualifiers(lambda_function)
+    n_jobs = 1 if getattr(_SERIAL_POLICIES, 'enabled', False) else POLICY_FETCH_THREADS
+    results = Parallel(n_jobs=n_jobs, backend="threading")(
+        delayed(_fetch_policy)(lambda_function['FunctionName'], qualifier=qualifier, **conn)
+        for qualifier in qualifiers
+    )
+    return _format_policies(lambda_function, dict(zip(qualifiers, results)))
 
 
 @registry.register(flag=FLAGS.ALIASES, key='aliases')
@@ -63,6 +113,10 @@ def _get_versions(lambda_function, **conn):
 @registry.register(flag=FLAGS.EVENT_SOURCE_MAPPINGS, key='event_source_mappings')
 def _get_event_source_mappings(lambda_function, **conn):
     mappings = list_event_source_mappings(FunctionName=lambda_function['FunctionName'], **conn)
+    return _format_event_source_mappings(mappings)
+
+
+def _format_event_source_mappings(mappings):
     for mapping in mappings:
         if 'LastModified' in mapping:
             mapping['LastModified'] = str(mapping['LastModified'])
@@ -71,14 +125,9 @@ def _get_event_source_mappings(lambda_function, **conn):
 
 @registry.register(flag=FLAGS.BASE)
 def get_base(lambda_function, **conn):
-    base_fields = frozenset(
-        ['FunctionName', 'FunctionArn', 'Runtime', 'Role', 'Handler',
-        'CodeSize', 'Description', 'Timeout', 'MemorySize', 'LastModified',
-        'CodeSha256', 'Version', 'VpcConfig', 'DeadLetterConfig', 'Environment',
-        'KMSKeyArn', 'TracingConfig', 'MasterArn'])
     needs_base = False
 
-    for field in base_fields:
+    for field in BASE_FIELDS:
         if field not in lambda_function:
             needs_base = True
             break
@@ -130,3 +179,58 @@ def get_lambda_function(lambda_function, flags=FLAGS.ALL, **conn):
                 conn['region'] = lambda_function_arn.region
 
     return registry.build_out(flags, start_with=lambda_function, pass_datastructure=True, **conn)
+
+
+def _build_listed_function(lambda_function, flags, **conn):
+    """Builds out a function from list_functions, using the list data as BASE."""
+    # list_functions returns the same configuration as get_function_configuration, without the unset fields:
+    lambda_function = dict(lambda_function)
+    for field in BASE_FIELDS:
+        lambda_function.setdefault(field, None)
+
+    _SERIAL_POLICIES.enabled = True
+    try:
+        return registry.build_out(flags, start_with=lambda_function, pass_datastructure=True, **conn)
+    finally:
+        _SERIAL_POLICIES.enabled = False
+
+
+def get_all_lambda_functions(flags=FLAGS.ALL, **conn):
+    """Fully describes all of the lambda functions in a region.
+
+    The functions are streamed from list_functions, one page at a time, and the list data is used as BASE
+    (instead of calling get_function_configuration for each function).  The remaining flags (including the
+    policies) are built out for up to FUNCTION_FETCH_THREADS functions at a time, as the pages arrive.
+
+    The event source mappings are listed once for the region and joined to the functions by FunctionArn.
+
+    Args:
+        flags: Flags describing which sections should be included in the return value. Default ALL
+
+    Returns:
+        list of dictionaries (in the format of get_lambda_function) describing the lambda functions.
+    """
+    output = conn.pop('output', 'camelized')
+
+    mappings = None
+    if flags & FLAGS.EVENT_SOURCE_MAPPINGS:
+        mappings = {}
+        for mapping in _format_event_source_mappings(list_event_source_mappings(**conn)):
+            mappings.setdefault(mapping.get('FunctionArn'), []).append(mapping)
+
+        flags = flags & ~FLAGS.EVENT_SOURCE_MAPPINGS
+
+    # joblib consumes the generator lazily, so the functions are built out while list_functions is still paging:
+    lambda_functions = Parallel(n_jobs=FUNCTION_FETCH_THREADS, backend="threading")(
+        delayed(_build_listed_function)(lambda_function, flags, **conn)
+        for lambda_function in iter_functions(**conn)
+    )
+
+    results = []
+    for lambda_function in lambda_functions:
+        if mappings is not None:
+            lambda_function['event_source_mappings'] = mappings.get(lambda_function['FunctionArn'], [])
+
+        results.append(modify(lambda_function, output=output))
+
+    return results
@@ -1,5 +1,9 @@
-from cloudaux.aws.sg import describe_security_group
+import copy
+from collections import OrderedDict
+
+from cloudaux.aws.sg import describe_security_group, describe_security_groups, SECURITY_GROUP_IDS_CHUNK_SIZE
 from cloudaux.decorators import modify_output
+from cloudaux.orchestration import modify
 from cloudaux.orchestration.aws.arn import ARN
 from flagpole import FlagRegistry, Flags
 from six import string_types
@@ -10,7 +14,8 @@ FLAGS = Flags('BASE')
 
 @registry.register(flag=FLAGS.BASE)
 def _get_base(sg_obj, **conn):
-    base_fields = ['Description', 'GroupName', 'IpPermissions', 'OwnerId', 'GroupId', 'IpPermissionsEgress', 'VpcId']
+    # VpcId is left out, as EC2-Classic groups don't have one:
+    base_fields = ['Description', 'GroupName', 'IpPermissions', 'OwnerId', 'GroupId', 'IpPermissionsEgress']
 
     if not all(field in sg_obj for field in base_fields):
         sg_obj = describe_security_group(sg_obj['GroupId'], **conn)
@@ -48,3 +53,53 @@ def get_security_group(sg_obj, flags=FLAGS.ALL, **conn):
             sg_obj = {'GroupId': group_arn.parsed_name}
 
     return registry.build_out(flags, sg_obj, **conn)
+
+
+def _parse_security_group(sg_obj, **conn):
+    """Returns (GroupId, account_number, region) for a GroupId or ARN, defaulting to the conn's account and region."""
+    group_arn = ARN(sg_obj)
+    if group_arn.error:
+        return sg_obj, conn.get('account_number'), conn.get('region')
+
+    return group_arn.parsed_name, group_arn.account_number or conn.get('account_number'), \
+        group_arn.region or conn.get('region')
+
+
+def get_security_groups(ids_or_arns, flags=FLAGS.ALL, **conn):
+    """
+    Builds out many Security Groups with as few DescribeSecurityGroups calls as possible.
+
+    The groups are grouped by account and region, and each group is described in chunks of
+    SECURITY_GROUP_IDS_CHUNK_SIZE GroupIds per call.
+
+    Args:
+        ids_or_arns: List of GroupIds or ARNs. GroupIds use the account and region from the conn.
+        flags: Flags describing which sections should be included in the return value. Default ALL
+
+    Returns:
+        list of Security Groups (in the format of get_security_group) in the same order as the input.
+        Groups that could not be found are None.
+    """
+    output = conn.pop('output', 'camelized')
+
+    parsed = [_parse_security_group(sg_obj, **conn) for sg_obj in ids_or_arns]
+
+    # (account_number, region) -> unique GroupIds:
+    groups = OrderedDict()
+    for sg_id, account_number, region in parsed:
+        groups.setdefault((account_number, region), OrderedDict())[sg_id] = None
+
+    results = {}
+    for (account_number, region), sg_ids in groups.items():
+        group_conn = dict(conn, account_number=account_number, region=region)
+        sg_ids = list(sg_ids)
+
+        for i in range(0, len(sg_ids), SECURITY_GROUP_IDS_CHUNK_SIZE):
+            described = describe_security_groups(sg_ids[i:i + SECURITY_GROUP_IDS_CHUNK_SIZE], **group_conn)
+
+            for sg_id, sg_obj in described.items():
+                sg_obj = registry.build_out(flags, sg_obj, **group_conn)
+                results[(account_number, region, sg_id)] = modify(sg_obj, output=output)
+
+    # Copied, so that duplicate GroupIds in the input don't share (and mutate) the same dict:
+    return [copy.deepcopy(results.get((account_number, region, sg_id))) for sg_id, account_number, region in parsed]
@@ -1,7 +1,11 @@
-from cloudaux.aws.sqs import get_queue_url, get_queue_attributes, list_queue_tags, list_dead_letter_source_queues
+from cloudaux.aws.sqs import get_queue_url, get_queue_attributes, list_queue_tags, list_dead_letter_source_queues, \
+    list_all_existing_queues
 from cloudaux.decorators import modify_output
+from cloudaux.orchestration import modify
 from flagpole import FlagRegistry, Flags
+from joblib import Parallel, delayed
 
+import json
 import logging
 
 from cloudaux.orchestration.aws import ARN
@@ -11,6 +15,9 @@ logger = logging.getLogger('cloudaux')
 registry = FlagRegistry()
 FLAGS = Flags('BASE', 'TAGS', 'DEAD_LETTER_SOURCE_QUEUES')
 
+# Upper bound on the concurrent per-queue calls made by get_all_queues (for the region in the conn):
+QUEUE_FETCH_THREADS = 10
+
 
 @registry.register(flag=FLAGS.TAGS, key='tags')
 def get_sqs_tags(sqs_queue, **conn):
@@ -25,16 +32,19 @@ def get_dead_letter_queues(sqs_queue, **conn):
 @registry.register(flag=FLAGS.BASE)
 def get_base(sqs_queue, **conn):
     sqs_queue["Attributes"] = get_queue_attributes(QueueUrl=sqs_queue["QueueUrl"], AttributeNames=["All"], **conn)
+    return _format_base(sqs_queue["QueueUrl"], sqs_queue["Attributes"], conn['region'])
+
 
+def _format_base(queue_url, attributes, region):
     # Get the Queue name:
-    name = ARN(sqs_queue["Attributes"]["QueueArn"]).parsed_name
+    name = ARN(attributes["QueueArn"]).parsed_name
 
     return {
-        'arn': sqs_queue["Attributes"]["QueueArn"],
-        'url': sqs_queue["QueueUrl"],
+        'arn': attributes["QueueArn"],
+        'url': queue_url,
         'name': name,
-        'region': conn['region'],
-        'attributes': sqs_queue["Attributes"],
+        'region': region,
+        'attributes': attributes,
         '_version': 1
     }
 
@@ -70,3 +80,57 @@ def get_queue(queue, flags=FLAGS.ALL, **conn):
     sqs_queue = {"QueueUrl": queue_name}
 
     return registry.build_out(flags, sqs_queue, **conn)
+
+
+def _get_queue_details(queue_url, flags, **conn):
+    sqs_queue = _format_base(queue_url, get_queue_attributes(QueueUrl=queue_url, AttributeNames=["All"], **conn),
+                             conn['region'])
+
+    if flags & FLAGS.TAGS:
+        sqs_queue['tags'] = list_queue_tags(QueueUrl=queue_url, **conn)
+
+    return sqs_queue
+
+
+def _dead_letter_target(sqs_queue):
+    redrive_policy = sqs_queue['attributes'].get('RedrivePolicy')
+    if not redrive_policy:
+        return None
+
+    return json.loads(redrive_policy).get('deadLetterTargetArn')
+
+
+def get_all_queues(flags=FLAGS.ALL, **conn):
+    """
+    Fetches all of the SQS queues in the region, in the same format as `get_queue`.
+
+    The attributes and tags are fetched concurrently for up to QUEUE_FETCH_THREADS queues at a time.
+    Rather than calling `list_dead_letter_source_queues` for each queue, the dead letter source queues are
+    derived from each queue's `RedrivePolicy` (a dead letter queue must be in the same account and region
+    as its source queues).
+
+    :param flags: By default, set to ALL fields.
+    :param conn: dict containing enough information to make a connection to the desired account. Must at least have
+                 'assume_role' key.
+    :return: list of dicts containing fully built out SQS queues.
+    """
+    output = conn.pop('output', 'camelized')
+
+    queue_urls = [queue.url for queue in list_all_existing_queues(**conn)]
+
+    # The attributes are needed for the dead letter source queues, so they are always fetched:
+    sqs_queues = Parallel(n_jobs=QUEUE_FETCH_THREADS, backend="threading")(
+        delayed(_get_queue_details)(queue_url, flags, **conn) for queue_url in queue_urls
+    )
+
+    if flags & FLAGS.DEAD_LETTER_SOURCE_QUEUES:
+        sources = {}
+        for sqs_queue in sqs_queues:
+            target = _dead_letter_target(sqs_queue)
+            if target:
+                sources.setdefault(target, []).append(sqs_queue['url'])
+
+        for sqs_queue in sqs_queues:
+            sqs_queue['dead_letter_source_queues'] = sources.get(sqs_queue['arn'], [])
+
+    return [modify(sqs_queue, output=output) for sqs_queue in sqs_queues]
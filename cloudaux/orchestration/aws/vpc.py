@@ -6,11 +6,13 @@
 .. moduleauthor:: Mike Grima <mgrima@netflix.com>
 """
 from botocore.exceptions import ClientError
+from joblib import Parallel, delayed
 
 from cloudaux.aws.ec2 import describe_vpcs, describe_dhcp_options, describe_vpc_classic_link, \
     describe_vpc_classic_link_dns_support, describe_internet_gateways, describe_vpc_peering_connections, \
     describe_subnets, describe_route_tables, describe_network_acls, describe_vpc_attribute, describe_flow_logs
 from cloudaux.decorators import modify_output
+from cloudaux.orchestration import modify
 from flagpole import FlagRegistry, Flags
 
 from cloudaux.exceptions import CloudAuxException
@@ -19,6 +21,9 @@ registry = FlagRegistry()
 FLAGS = Flags('BASE', 'INTERNET_GATEWAY', 'CLASSIC_LINK', 'VPC_PEERING_CONNECTIONS', 'SUBNETS', 'ROUTE_TABLES',
               'NETWORK_ACLS', 'FLOW_LOGS')
 
+# EC2 accepts up to 200 values for a single filter:
+FILTER_VALUES_CHUNK_SIZE = 200
+
 
 @registry.register(flag=FLAGS.FLOW_LOGS, depends_on=FLAGS.BASE, key="flow_logs")
 def get_vpc_flow_logs(vpc, **conn):
@@ -122,6 +127,43 @@ def get_network_acls(vpc, **conn):
     return nacl_ids
 
 
+def _get_attributes(vpc_id, **conn):
+    """Gets the DNS attributes of a VPC (these can only be described one VPC at a time)"""
+    attributes = {}
+    attr_vals = [
+        ("EnableDnsHostnames", "enableDnsHostnames"),
+        ("EnableDnsSupport", "enableDnsSupport")
+    ]
+    for attr, query in attr_vals:
+        attributes[attr] = describe_vpc_attribute(VpcId=vpc_id, Attribute=query, **conn)[attr]
+
+    return attributes
+
+
+def _format_base(vpc, base_result, dhcp_opts, attributes, region):
+    """Updates the VPC with the BASE fields from the describe_vpcs result"""
+    # The name of the VPC is in the tags:
+    vpc_name = None
+    for t in base_result.get("Tags", []):
+        if t["Key"] == "Name":
+            vpc_name = t["Value"]
+
+    vpc.update({
+        'name': vpc_name,
+        'region': region,
+        'tags': base_result.get("Tags", []),
+        'is_default': base_result["IsDefault"],
+        'instance_tenancy': base_result["InstanceTenancy"],
+        'dhcp_options_id': dhcp_opts,
+        'cidr_block': base_result["CidrBlock"],
+        'cidr_block_association_set': base_result.get("CidrBlockAssociationSet", []),
+        'ipv6_cidr_block_association_set': base_result.get("Ipv6CidrBlockAssociationSet", []),
+        'attributes': attributes,
+        '_version': 1
+    })
+    return vpc
+
+
 @registry.register(flag=FLAGS.BASE)
 def get_base(vpc, **conn):
     """
@@ -147,12 +189,6 @@ def get_base(vpc, **conn):
     # Get the base:
     base_result = describe_vpcs(VpcIds=[vpc["id"]], **conn)[0]
 
-    # The name of the VPC is in the tags:
-    vpc_name = None
-    for t in base_result.get("Tags", []):
-        if t["Key"] == "Name":
-            vpc_name = t["Value"]
-
     dhcp_opts = None
     # Get the DHCP Options:
     if base_result.get("DhcpOptionsId"):
@@ -160,28 +196,31 @@ def get_base(vpc, **conn):
         dhcp_opts = describe_dhcp_options(DhcpOptionsIds=[base_result["DhcpOptionsId"]], **conn)[0]["DhcpOptionsId"]
 
     # Get the Attributes:
-    attributes = {}
-    attr_vals = [
-        ("EnableDnsHostnames", "enableDnsHostnames"),
-        ("EnableDnsSupport", "enableDnsSupport")
-    ]
-    for attr, query in attr_vals:
-        attributes[attr] = describe_vpc_attribute(VpcId=vpc["id"], Attribute=query, **conn)[attr]
+    attributes = _get_attributes(vpc["id"], **conn)
+
+    return _format_base(vpc, base_result, dhcp_opts, attributes, conn["region"])
+
+
+def _check_conn(conn, vpc_id=None):
+    # Is the account number that's passed in the same as in the connection dictionary?
+    if not conn.get("account_number"):
+        raise CloudAuxException({"message": "Must supply account number in the connection dict to construct "
+                                            "the VPC ARN.",
+                                 "vpc_id": vpc_id})
+
+    if not conn.get("region"):
+        raise CloudAuxException({"message": "Must supply region in the connection dict to construct "
+                                            "the VPC ARN.",
+                                 "vpc_id": vpc_id})
 
-    vpc.update({
-        'name': vpc_name,
-        'region': conn["region"],
-        'tags': base_result.get("Tags", []),
-        'is_default': base_result["IsDefault"],
-        'instance_tenancy': base_result["InstanceTenancy"],
-        'dhcp_options_id': dhcp_opts,
-        'cidr_block': base_result["CidrBlock"],
-        'cidr_block_association_set': base_result.get("CidrBlockAssociationSet", []),
-        'ipv6_cidr_block_association_set': base_result.get("Ipv6CidrBlockAssociationSet", []),
-        'attributes': attributes,
-        '_version': 1
-    })
-    return vpc
+
+def _start_with(vpc_id, conn):
+    return {
+        'arn': "arn:aws:ec2:{region}:{account}:vpc/{vpc_id}".format(region=conn["region"],
+                                                                    account=conn["account_number"],
+                                                                    vpc_id=vpc_id),
+        'id': vpc_id
+    }
 
 
 @modify_output
@@ -218,22 +257,153 @@ def get_vpc(vpc_id, flags=FLAGS.ALL, **conn):
     :param conn:
     :return:
     """
-    # Is the account number that's passed in the same as in the connection dictionary?
-    if not conn.get("account_number"):
-        raise CloudAuxException({"message": "Must supply account number in the connection dict to construct "
-                                            "the VPC ARN.",
-                                 "vpc_id": vpc_id})
+    _check_conn(conn, vpc_id=vpc_id)
 
-    if not conn.get("region"):
-        raise CloudAuxException({"message": "Must supply region in the connection dict to construct "
-                                            "the VPC ARN.",
-                                 "vpc_id": vpc_id})
-
-    start = {
-        'arn': "arn:aws:ec2:{region}:{account}:vpc/{vpc_id}".format(region=conn["region"],
-                                                                    account=conn["account_number"],
-                                                                    vpc_id=vpc_id),
-        'id': vpc_id
-    }
+    start = _start_with(vpc_id, conn)
 
     return registry.build_out(flags, start_with=start, pass_datastructure=True, **conn)
+
+
+def _chunks(items, size=FILTER_VALUES_CHUNK_SIZE):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def _describe_for_vpcs(describe_func, filter_name, vpc_ids, **conn):
+    """Describes the resources for many VPCs at once by batching the VPC IDs into the filter values."""
+    results = []
+    for chunk in _chunks(vpc_ids):
+        results.extend(describe_func(Filters=[{"Name": filter_name, "Values": chunk}], **conn))
+
+    return results
+
+
+def _index(items, vpc_id_func, value_func):
+    """Groups the values extracted from each item by the VPC ID that the item belongs to."""
+    index = {}
+    for item in items:
+        index.setdefault(vpc_id_func(item), []).append(value_func(item))
+
+    return index
+
+
+def _get_all_classic_link(vpc_ids, **conn):
+    index = {}
+    try:
+        for chunk in _chunks(vpc_ids):
+            for cl_result in describe_vpc_classic_link(VpcIds=chunk, **conn):
+                index[cl_result["VpcId"]] = {"Enabled": cl_result["ClassicLinkEnabled"]}
+
+            for dns_result in describe_vpc_classic_link_dns_support(VpcIds=chunk, **conn):
+                index.setdefault(dns_result["VpcId"], {})["DnsEnabled"] = dns_result["ClassicLinkDnsSupported"]
+    except ClientError as e:
+        # This is not supported for all regions.
+        if 'UnsupportedOperation' not in str(e):
+            raise e
+
+    return index
+
+
+def _get_all_internet_gateways(vpc_ids, **conn):
+    index = {}
+    for ig in _describe_for_vpcs(describe_internet_gateways, "attachment.vpc-id", vpc_ids, **conn):
+        for attachment in ig["Attachments"]:
+            # Only 1 IG can be attached to a VPC:
+            index.setdefault(attachment["VpcId"], {
+                "State": attachment["State"],
+                "Id": ig["InternetGatewayId"],
+                "Tags": ig.get("Tags", [])
+            })
+
+    return index
+
+
+def _get_all_vpc_peering_connections(vpc_ids, **conn):
+    index = {}
+    for filter_name, side in [("accepter-vpc-info.vpc-id", "AccepterVpcInfo"),
+                              ("requester-vpc-info.vpc-id", "RequesterVpcInfo")]:
+        peerings = _describe_for_vpcs(describe_vpc_peering_connections, filter_name, vpc_ids, **conn)
+
+        for vpc_id, peer_ids in _index(peerings, lambda p: p[side]["VpcId"],
+                                       lambda p: p["VpcPeeringConnectionId"]).items():
+            index.setdefault(vpc_id, []).extend(peer_ids)
+
+    return index
+
+
+def get_all_vpcs(vpc_ids=None, flags=FLAGS.ALL, **conn):
+    """
+    Fetches the details for all VPCs in a region (or for the given VPC IDs) in the same format as `get_vpc`.
+
+    Rather than making separate filtered calls per VPC, each `describe_*` call is made once per region (with the
+    VPC IDs batched into the filter values), and the results are joined to the VPCs in memory. Only the VPC
+    attributes (part of BASE) need a call per VPC, as `describe_vpc_attribute` does not support batching.
+
+    :param vpc_ids: Optional list of VPC IDs. If not provided, all VPCs in the region are returned.
+    :param flags:
+    :param conn:
+    :return: list of dicts describing the VPCs.
+    """
+    _check_conn(conn)
+
+    output = conn.pop('output', 'camelized')
+    # Adds the flags the requested sections depend on (i.e. BASE), as build_out does for get_vpc:
+    flags = registry._validate_flags(flags)
+    vpc_kwargs = {'VpcIds': vpc_ids} if vpc_ids else {}
+    base_results = describe_vpcs(**dict(conn, **vpc_kwargs))
+    vpc_ids = [b["VpcId"] for b in base_results]
+    if not vpc_ids:
+        return []
+
+    dhcp_opts = {}
+    all_attributes = [None] * len(vpc_ids)
+    if flags & FLAGS.BASE:
+        dhcp_ids = list({b["DhcpOptionsId"] for b in base_results if b.get("DhcpOptionsId")})
+        for chunk in _chunks(dhcp_ids):
+            for dhcp in describe_dhcp_options(Filters=[{"Name": "dhcp-options-id", "Values": chunk}], **conn):
+                dhcp_opts[dhcp["DhcpOptionsId"]] = dhcp["DhcpOptionsId"]
+
+        all_attributes = Parallel(n_jobs=20, backend="threading")(
+            delayed(_get_attributes)(vpc_id, **conn) for vpc_id in vpc_ids
+        )
+
+    sections = {}
+    if flags & FLAGS.FLOW_LOGS:
+        flow_logs = _describe_for_vpcs(describe_flow_logs, "resource-id", vpc_ids, **conn)
+        sections['flow_logs'] = (_index(flow_logs, lambda f: f["ResourceId"], lambda f: f["FlowLogId"]), [])
+
+    if flags & FLAGS.CLASSIC_LINK:
+        sections['classic_link'] = (_get_all_classic_link(vpc_ids, **conn), {})
+
+    if flags & FLAGS.INTERNET_GATEWAY:
+        sections['internet_gateway'] = (_get_all_internet_gateways(vpc_ids, **conn), {})
+
+    if flags & FLAGS.VPC_PEERING_CONNECTIONS:
+        sections['vpc_peering_connections'] = (_get_all_vpc_peering_connections(vpc_ids, **conn), [])
+
+    if flags & FLAGS.SUBNETS:
+        subnets = _describe_for_vpcs(describe_subnets, "vpc-id", vpc_ids, **conn)
+        sections['subnets'] = (_index(subnets, lambda s: s["VpcId"], lambda s: s["SubnetId"]), [])
+
+    if flags & FLAGS.ROUTE_TABLES:
+        route_tables = _describe_for_vpcs(describe_route_tables, "vpc-id", vpc_ids, **conn)
+        sections['route_tables'] = (_index(route_tables, lambda r: r["VpcId"], lambda r: r["RouteTableId"]), [])
+
+    if flags & FLAGS.NETWORK_ACLS:
+        network_acls = _describe_for_vpcs(describe_network_acls, "vpc-id", vpc_ids, **conn)
+        sections['network_acls'] = (_index(network_acls, lambda n: n["VpcId"], lambda n: n["NetworkAclId"]), [])
+
+    vpcs = []
+    for base_result, attributes in zip(base_results, all_attributes):
+        vpc_id = base_result["VpcId"]
+        vpc = _start_with(vpc_id, conn)
+        if flags & FLAGS.BASE:
+            vpc = _format_base(vpc, base_result, dhcp_opts.get(base_result.get("DhcpOptionsId")), attributes,
+                               conn["region"])
+
+        for key, (index, default) in sections.items():
+            vpc[key] = index.get(vpc_id, default)
+
+        vpcs.append(modify(vpc, output=output))
+
+    return vpcs
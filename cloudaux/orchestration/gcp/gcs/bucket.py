@@ -5,22 +5,23 @@
     :license: Apache, see LICENSE for more details.
 .. moduleauthor:: Tom Melendez (@supertom) <supertom@google.com>
 """
-from cloudaux.gcp.gcs import get_bucket as fetch_bucket
+from google.cloud.exceptions import BadRequest, Forbidden
+from joblib import Parallel, delayed
+
+from cloudaux.gcp.gcs import get_bucket as fetch_bucket, iter_buckets
 from cloudaux.gcp.utils import strdate
 from cloudaux.decorators import modify_output
+from cloudaux.orchestration import modify
 from flagpole import FlagRegistry, Flags
 
 
 registry = FlagRegistry()
 FLAGS = Flags('BASE')
 
+ACL_FETCH_THREADS = 10
 
-@registry.register(flag=FLAGS.BASE)
-def _get_base(bucket_name, **conn):
-    bucket = fetch_bucket(Bucket=bucket_name, **conn)
-    if not bucket:
-        return dict(Error='Unauthorized')
 
+def _format_bucket(bucket):
     result = dict()
     result['acl'] = list(bucket.acl)
     result['default_object_acl'] = list(bucket.default_object_acl)
@@ -40,6 +41,78 @@ def _get_base(bucket_name, **conn):
     return result
 
 
+@registry.register(flag=FLAGS.BASE)
+def _get_base(bucket_name, **conn):
+    bucket = fetch_bucket(Bucket=bucket_name, **conn)
+    if not bucket:
+        return dict(Error='Unauthorized')
+
+    return _format_bucket(bucket)
+
+
+def _load_acl(acl, entries):
+    """Loads the ACL from the entries in a full projection listing, so it isn't fetched again."""
+    if entries is None:
+        return False
+
+    # Marked as loaded first, as adding entities would otherwise trigger a reload:
+    acl.loaded = True
+    acl.entities.clear()
+    for entry in entries:
+        acl.add_entity(acl.entity_from_dict(entry))
+    return True
+
+
+def _fetch_acls(bucket):
+    """
+    Fetches the bucket's ACLs, if the listing didn't include them.
+
+    :returns: False if the ACLs can't be read (i.e. the caller isn't an owner, or the bucket
+              has uniform bucket-level access).
+    """
+    try:
+        list(bucket.acl)
+        list(bucket.default_object_acl)
+    except (Forbidden, BadRequest):
+        return False
+    return True
+
+
 @modify_output
 def get_bucket(bucket_name, flags=FLAGS.ALL, **conn):
     return registry.build_out(flags, bucket_name, **conn)
+
+
+def get_all_buckets(project, flags=FLAGS.ALL, **conn):
+    """
+    Builds out all of the buckets in a project, in the same format as get_bucket.
+
+    The buckets are listed once with projection=full, which includes the ACLs of the buckets the caller owns.
+    The ACLs that are missing from the listing are fetched concurrently. Buckets whose ACLs can't be read
+    are returned as {'Id': ..., 'Error': 'Unauthorized'}, rather than failing the whole project.
+    """
+    output = conn.pop('output', 'camelized')
+
+    if not flags & FLAGS.BASE:
+        return [modify({}, output=output) for _ in iter_buckets(project=project, **conn)]
+
+    buckets = list(iter_buckets(project=project, projection='full', **conn))
+    missing = []
+    for bucket in buckets:
+        loaded = _load_acl(bucket.acl, bucket._properties.get('acl'))
+        loaded = _load_acl(bucket.default_object_acl, bucket._properties.get('defaultObjectAcl')) and loaded
+        if not loaded:
+            missing.append(bucket)
+
+    fetched = Parallel(n_jobs=ACL_FETCH_THREADS, backend="threading")(
+        delayed(_fetch_acls)(bucket) for bucket in missing
+    )
+    unauthorized = set(bucket.name for bucket, ok in zip(missing, fetched) if not ok)
+
+    results = []
+    for bucket in buckets:
+        if bucket.name in unauthorized:
+            results.append(modify(dict(id=bucket.id, Error='Unauthorized'), output=output))
+        else:
+            results.append(modify(_format_bucket(bucket), output=output))
+    return results
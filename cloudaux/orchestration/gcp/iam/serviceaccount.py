@@ -1,5 +1,7 @@
-from cloudaux.gcp.iam import get_iam_policy, get_serviceaccount, get_serviceaccount_keys
+from cloudaux.gcp.iam import get_iam_policy, get_iam_policies, get_serviceaccount, get_serviceaccounts, \
+    get_serviceaccount_keys, get_serviceaccounts_keys, list_serviceaccounts
 from cloudaux.decorators import modify_output
+from cloudaux.orchestration import modify
 from flagpole import FlagRegistry, Flags
 
 
@@ -27,3 +29,53 @@ def _get_base(service_account, **conn):
 @modify_output
 def get_serviceaccount_complete(service_account, flags=FLAGS.ALL, **conn):
     return registry.build_out(flags, service_account, **conn)
+
+
+def get_serviceaccounts_complete(service_accounts=None, flags=FLAGS.ALL, **conn):
+    """
+    Batched get_serviceaccount_complete, for many (by default, all) of the service accounts in a project.
+
+    Each part of the build out is fetched with batch requests, rather than a request per service account.
+
+    :param service_accounts: list of service account names. Default is all of the service accounts in conn['project'].
+    :returns: tuple of a list of service accounts (in the same format as get_serviceaccount_complete)
+              and a dict of service account -> exception, for the ones that could not be fetched.
+    """
+    output = conn.pop('output', 'camelized')
+    exceptions = {}
+
+    if service_accounts is None:
+        # The list has the same details as a get:
+        base = {sa['name']: sa for sa in list_serviceaccounts(**conn)}
+        service_accounts = list(base)
+    elif flags & FLAGS.BASE:
+        base, errors = get_serviceaccounts(service_accounts=service_accounts, **conn)
+        exceptions.update(errors)
+    else:
+        base = {sa: {} for sa in service_accounts}
+
+    keys = policies = {}
+    if flags & FLAGS.KEYS:
+        keys, errors = get_serviceaccounts_keys(service_accounts=service_accounts, **conn)
+        exceptions.update(errors)
+    if flags & FLAGS.POLICY:
+        policies, errors = get_iam_policies(service_accounts=service_accounts, **conn)
+        exceptions.update(errors)
+
+    results = []
+    for sa in service_accounts:
+        if sa in exceptions:
+            continue
+
+        item = {}
+        if flags & FLAGS.BASE:
+            item.update(base[sa])
+            item['_version'] = 1
+        if flags & FLAGS.KEYS:
+            item['keys'] = keys[sa]
+        if flags & FLAGS.POLICY:
+            item['policy'] = policies[sa]
+
+        results.append(modify(item, output=output))
+
+    return results, exceptions
@@ -5,21 +5,16 @@
     :license: Apache, see LICENSE for more details.
 .. moduleauthor:: Michael Stair <mstair@att.com>
 """
-from cloudaux.openstack.utils import list_items
+from cloudaux.openstack.utils import iter_items, list_items
+from cloudaux.orchestration.openstack.utils import get_item
 from flagpole import FlagRegistry, Flags
 
 registry = FlagRegistry()
 FLAGS = Flags('RULES','INSTANCES')
 
 
-@registry.register(flag=FLAGS.INSTANCES, depends_on=FLAGS.RULES, key='assigned_to')
-def get_instances(security_group, **kwargs):
-    detail = kwargs.pop('instance_detail', 'FULL')
-
-    kwargs['service'] = 'compute'
-    kwargs['generator'] = 'servers'
-    instances = list_items(**kwargs)
-
+def _index_instances(instances):
+    """ security group name -> the instances in it """
     sg_instances = {}
     for instance in instances:
         for group in instance.security_groups:
@@ -27,6 +22,19 @@ def get_instances(security_group, **kwargs):
                 sg_instances[group['name']] = [instance]
             else:
                 sg_instances[group['name']].append(instance)
+    return sg_instances
+
+
+@registry.register(flag=FLAGS.INSTANCES, depends_on=FLAGS.RULES, key='assigned_to')
+def get_instances(security_group, **kwargs):
+    detail = kwargs.pop('instance_detail', 'FULL')
+
+    sg_instances = kwargs.pop('sg_instances', None)
+    if sg_instances is None:
+        kwargs['service'] = 'compute'
+        kwargs['generator'] = 'servers'
+        sg_instances = _index_instances(list_items(**kwargs))
+
     if detail == 'SUMMARY':
         if security_group['name'] in sg_instances:
             assigned_to = "{} instances".format(len(sg_instances[security_group['name']]))
@@ -59,3 +67,20 @@ def get_security_group(security_group, flags=FLAGS.ALL, **kwargs):
     """ just store the AWS formatted rules """
     result.pop('security_group_rules', [])
     return result
+
+
+def iter_security_groups(flags=FLAGS.ALL, **kwargs):
+    """
+    Streams the security groups of a cloud region, fully described, as they are listed.
+
+    The servers are listed (and indexed by security group) once for all of the groups, rather than
+    once per group, when the INSTANCES flag is set. For every account and region, use with `stream_account_region`.
+
+    :param kwargs: cloud_name, region and yaml_file, plus any kwargs for get_security_group.
+    """
+    conn_kwargs = dict((k, kwargs[k]) for k in ('cloud_name', 'region', 'yaml_file'))
+    if flags & FLAGS.INSTANCES:
+        kwargs['sg_instances'] = _index_instances(list_items(service='compute', generator='servers', **conn_kwargs))
+
+    for security_group in iter_items(service='network', generator='security_groups', **conn_kwargs):
+        yield get_security_group(get_item(security_group), flags=flags, **kwargs)
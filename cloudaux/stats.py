@@ -0,0 +1,131 @@
+"""
+.. module: cloudaux.stats
+    :platform: Unix
+    :copyright: (c) 2018 by Netflix Inc., see AUTHORS for more
+    :license: Apache, see LICENSE for more details.
+"""
+import math
+import threading
+import time
+from functools import wraps
+
+
+class StreamingHistogram(object):
+    """
+    Fixed memory summary of a stream of (non-negative) values, such as call durations.
+
+    Tracks the count, sum, min and max exactly. Quantiles are estimated from log-scaled buckets
+    (in the spirit of an HDR histogram) with a relative error of at most `precision`. The number of
+    buckets depends only on the range of the values, not on how many are recorded; durations from
+    1 microsecond to 1 day fit in ~1,300 buckets at the default precision.
+    """
+
+    # Values smaller than this are counted in the first bucket:
+    MIN_VALUE = 1e-6
+
+    def __init__(self, precision=0.01):
+        self._log_base = math.log(1 + 2 * precision)
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+        self._buckets = {}
+
+    def _bucket(self, value):
+        return int(math.log(max(value, self.MIN_VALUE) / self.MIN_VALUE) / self._log_base)
+
+    def _bucket_value(self, bucket):
+        # The midpoint of the bucket, so the error is at most half its width either way:
+        return self.MIN_VALUE * math.exp((bucket + 0.5) * self._log_base)
+
+    def record(self, value):
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+        bucket = self._bucket(value)
+        self._buckets[bucket] = self._buckets.get(bucket, 0) + 1
+
+    def quantile(self, q):
+        """Estimates the q-th quantile (0 <= q <= 1) of the recorded values."""
+        if not self.count:
+            return None
+
+        rank = q * (self.count - 1)
+        seen = 0
+        for bucket in sorted(self._buckets):
+            seen += self._buckets[bucket]
+            if seen > rank:
+                # Clamp to the exact extremes:
+                return min(max(self._bucket_value(bucket), self.min), self.max)
+
+        return self.max
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'sum': self.total,
+            'min': self.min,
+            'max': self.max,
+            'mean': self.total / self.count if self.count else None,
+            'p50': self.quantile(0.5),
+            'p90': self.quantile(0.9),
+            'p99': self.quantile(0.99),
+        }
+
+
+class StatsRegistry(object):
+    """
+    Thread safe collection of StreamingHistograms, one per name (typically the function name).
+
+        registry = StatsRegistry()
+        registry.record('list_instances', 0.25)
+        registry.snapshot()  # {'list_instances': {'count': 1, 'sum': 0.25, ..., 'p99': 0.25}}
+    """
+
+    def __init__(self):
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def record(self, name, value):
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = StreamingHistogram()
+
+            histogram.record(value)
+
+    def snapshot(self, reset=False):
+        """
+        Returns a dict of name -> summary (count, sum, min, max, mean, p50, p90, p99).
+
+        :param reset: If True, the stats are cleared once the snapshot is taken, so the next snapshot
+                      only covers the calls made after this one.
+        """
+        with self._lock:
+            snapshot = {name: histogram.summary() for name, histogram in self._histograms.items()}
+            if reset:
+                self._histograms = {}
+
+        return snapshot
+
+    def reset(self):
+        with self._lock:
+            self._histograms = {}
+
+
+def timed(registry):
+    """Records the duration of each call to the decorated function in the registry, under the function name."""
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            start_time = time.time()
+            try:
+                return f(*args, **kwargs)
+            finally:
+                registry.record(f.__name__, time.time() - start_time)
+
+        return decorated_function
+
+    return decorator
@@ -0,0 +1,75 @@
+"""
+.. module: cloudaux.streaming
+    :platform: Unix
+    :copyright: (c) 2018 by Netflix Inc., see AUTHORS for more
+    :license: Apache, see LICENSE for more details.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from six.moves import queue
+
+_ITEM = 'item'
+_ERROR = 'error'
+_DONE = 'done'
+
+
+def iter_sharded(list_shard, shards, max_workers=10, buffer_size=1000):
+    """
+    Streams the items of many shards (i.e. the prefixes of a bucket), listing them concurrently.
+
+    Each shard is listed on a worker thread by `list_shard(shard)`, a generator. The items are passed
+    back through a queue of at most `buffer_size` items, so the memory used is bounded no matter how
+    many items there are: workers wait while the caller catches up. Items are yielded as they arrive,
+    so the items of different shards are interleaved.
+
+    If a shard raises, the exception is raised to the caller, and the remaining shards are stopped.
+    The same happens if the caller stops iterating early.
+
+    :param list_shard: callable taking a shard, returning an iterable of its items.
+    :param shards: list of shards.
+    :param max_workers: maximum number of shards listed concurrently. Default is 10.
+    :param buffer_size: maximum number of items waiting to be consumed. Default is 1000.
+    """
+    shards = list(shards)
+    items = queue.Queue(maxsize=buffer_size)
+    stop = threading.Event()
+
+    def put(entry):
+        while not stop.is_set():
+            try:
+                items.put(entry, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def worker(shard):
+        try:
+            if stop.is_set():
+                return
+            for item in list_shard(shard):
+                if not put((_ITEM, item)):
+                    return
+        except Exception as e:
+            put((_ERROR, e))
+        finally:
+            put((_DONE, None))
+
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        for shard in shards:
+            executor.submit(worker, shard)
+
+        remaining = len(shards)
+        while remaining:
+            (kind, value) = items.get()
+            if kind == _ITEM:
+                yield value
+            elif kind == _ERROR:
+                raise value
+            else:
+                remaining -= 1
+    finally:
+        stop.set()
+        executor.shutdown(wait=True)
@@ -5,13 +5,15 @@
     :license: Apache, see LICENSE for more details.
 .. moduleauthor:: Mike Grima <mgrima@netflix.com>
 """
+import io
 import os
+import zipfile
 from datetime import datetime
 import json
 
 import pytest
 
-from moto import mock_ec2, mock_iam, mock_sts
+from moto import mock_ec2, mock_elb, mock_elbv2, mock_iam, mock_lambda, mock_s3, mock_sqs, mock_sts
 import boto3
 
 from cloudaux.aws.sts import boto3_cached_conn
@@ -77,6 +79,57 @@ def iam(sts, conn_dict):
         yield boto3_cached_conn("iam", **conn_dict)
 
 
+@pytest.fixture(scope="function")
+def elb(ec2, conn_dict):
+    with mock_elb():
+        yield boto3_cached_conn("elb", **conn_dict)
+
+
+@pytest.fixture(scope="function")
+def elbv2(ec2, conn_dict):
+    with mock_elbv2():
+        yield boto3_cached_conn("elbv2", **conn_dict)
+
+
+@pytest.fixture(scope="function")
+def sqs(sts, conn_dict):
+    with mock_sqs():
+        yield boto3_cached_conn("sqs", **conn_dict)
+
+
+@pytest.fixture(scope="function")
+def s3(sts, conn_dict):
+    with mock_s3():
+        client = boto3_cached_conn("s3", **conn_dict)
+        client.create_bucket(Bucket="test-bucket")
+        yield client
+
+
+@pytest.fixture(scope="function")
+def lambda_client(iam, conn_dict):
+    with mock_lambda():
+        yield boto3_cached_conn("lambda", **conn_dict)
+
+
+@pytest.fixture(scope="function")
+def test_lambda_function(lambda_client, iam):
+    """Creates a test Lambda function with a published version, an alias, and a policy."""
+    role_arn = iam.create_role(RoleName="testLambdaRole", AssumeRolePolicyDocument="{}")["Role"]["Arn"]
+
+    code = io.BytesIO()
+    with zipfile.ZipFile(code, "w") as z:
+        z.writestr("lambda_function.py", "def handler(event, context):\n    return event\n")
+
+    lambda_client.create_function(FunctionName="testCloudAuxFunction", Runtime="python3.9", Role=role_arn,
+                                  Handler="lambda_function.handler", Code={"ZipFile": code.getvalue()},
+                                  Publish=True)
+    lambda_client.create_alias(FunctionName="testCloudAuxFunction", Name="live", FunctionVersion="1")
+    lambda_client.add_permission(FunctionName="testCloudAuxFunction", StatementId="s3invoke",
+                                 Action="lambda:InvokeFunction", Principal="s3.amazonaws.com")
+
+    return lambda_client.get_function_configuration(FunctionName="testCloudAuxFunction")
+
+
 @pytest.fixture(scope="function")
 def test_vpc(ec2):
     """Creates a test VPC"""
@@ -6,9 +6,10 @@
 .. moduleauthor:: Patrick Sanders <psanders@netflix.com>
 """
 
+import pytest
 from mock import MagicMock, call
 
-from cloudaux.aws.decorators import paginated
+from cloudaux.aws.decorators import aws_cache, paginated, paginated_iterator, rate_limited
 
 
 def test_paginated_single_page():
@@ -86,3 +87,118 @@ def test_paginated_multiple_pages_empty_results():
     assert result == ["e", "f"]
     assert mock_responder.call_count == 4
     mock_responder.assert_has_calls([call(), call(NextToken="1"), call(NextToken="2"), call(NextToken="3")])
+
+
+def test_paginated_iterator():
+    pages = [
+        {"Data": ["a", "b"], "NextToken": "1"},
+        {"NextToken": "2"},
+        {"Data": ["c"]},
+    ]
+    mock_responder = MagicMock()
+    mock_responder.side_effect = pages
+
+    @paginated_iterator("Data")
+    def retrieve_letters(**kwargs):
+        return mock_responder(**kwargs)
+
+    result = retrieve_letters(max_results=2, Filters=[])
+    # Nothing is fetched until the items are consumed:
+    assert not mock_responder.called
+
+    assert list(result) == ["a", "b", "c"]
+    mock_responder.assert_has_calls([call(Filters=[], MaxResults=2), call(Filters=[], MaxResults=2, NextToken="1"),
+                                     call(Filters=[], MaxResults=2, NextToken="2")])
+
+
+def test_paginated_iterator_rate_limited():
+    import boto3
+    from botocore.stub import Stubber
+    from mock import patch
+
+    client = boto3.client("ec2", region_name="us-east-1", aws_access_key_id="x", aws_secret_access_key="x")
+    stubber = Stubber(client)
+    stubber.add_response("describe_vpcs", {"Vpcs": [{"VpcId": "vpc-1"}], "NextToken": "1"})
+    # Throttled part way through the listing:
+    stubber.add_client_error("describe_vpcs", service_error_code="Throttling", expected_params={"NextToken": "1"})
+    stubber.add_response("describe_vpcs", {"Vpcs": [{"VpcId": "vpc-2"}]}, expected_params={"NextToken": "1"})
+
+    @paginated_iterator("Vpcs")
+    @rate_limited()
+    def iter_vpcs(**kwargs):
+        return client.describe_vpcs(**kwargs)
+
+    with stubber, patch("cloudaux.aws.decorators.time.sleep") as mock_sleep:
+        assert [vpc["VpcId"] for vpc in iter_vpcs()] == ["vpc-1", "vpc-2"]
+        mock_sleep.assert_called_once_with(1)
+
+
+def test_aws_stats(sts):
+    from cloudaux.aws.decorators import get_aws_stats
+    from cloudaux.aws.sts import boto3_cached_conn
+
+    get_aws_stats(reset=True)
+    boto3_cached_conn("ec2", region="us-east-1")
+    boto3_cached_conn("ec2", region="us-east-1")
+
+    stats = get_aws_stats(reset=True)
+    assert list(stats) == ["boto3_cached_conn"]
+    assert stats["boto3_cached_conn"]["count"] == 2
+    assert not get_aws_stats()
+
+
+def test_aws_cache():
+    from cloudaux.aws.cache import enable_cache, disable_cache, get_cache_stats, get_cache_access_details
+
+    mock_responder = MagicMock()
+    mock_responder.side_effect = lambda **kwargs: {"Data": ["a", "b"]}
+
+    @aws_cache()
+    def describe_things(**kwargs):
+        return mock_responder(**kwargs)
+
+    # Mutating calls are never cached:
+    with pytest.raises(ValueError):
+        aws_cache()(lambda **kwargs: None)
+
+    # Disabled by default:
+    describe_things(region="us-east-1")
+    describe_things(region="us-east-1")
+    assert mock_responder.call_count == 2
+
+    enable_cache(max_size=2)
+    try:
+        result = describe_things(account_number="111111111111", region="us-east-1", Filters=[1])
+        result["Data"].append("c")  # Callers get a copy of the cached response
+        assert describe_things(account_number="111111111111", region="us-east-1", Filters=[1]) == {"Data": ["a", "b"]}
+        assert mock_responder.call_count == 3
+
+        # The connection pool and session name aren't part of the key, but the account, region and arguments are:
+        describe_things(account_number="111111111111", region="us-east-1", Filters=[1], session_name="other")
+        assert mock_responder.call_count == 3
+        describe_things(account_number="111111111111", region="us-west-2", Filters=[1])
+        describe_things(account_number="222222222222", region="us-east-1", Filters=[1])
+        assert mock_responder.call_count == 5
+
+        # Only 2 are kept, so the least recently used was evicted:
+        describe_things(account_number="111111111111", region="us-east-1", Filters=[1])
+        assert mock_responder.call_count == 6
+
+        # force_client bypasses the cache:
+        describe_things(force_client=MagicMock())
+        assert mock_responder.call_count == 7
+
+        stats = get_cache_stats()["totals"]
+        assert stats == {"keys": 2, "hit": 2, "miss": 4, "expired": 0, "evicted": 2}
+        assert get_cache_access_details(("test_decorators", "describe_things"))["hit"] == 2
+
+        # Per operation TTLs:
+        enable_cache(ttls={"describe_things": 0})
+        describe_things(region="us-east-1")
+        describe_things(region="us-east-1")
+        assert mock_responder.call_count == 9
+        assert get_cache_stats()["totals"]["expired"] == 1
+    finally:
+        disable_cache()
+
+    assert get_cache_stats()["totals"]["keys"] == 0
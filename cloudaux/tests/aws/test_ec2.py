@@ -128,3 +128,18 @@ def test_describe_vpc_attribute(test_vpc):
     assert result["EnableDnsSupport"]
     result = describe_vpc_attribute(VpcId=test_vpc["VpcId"], Attribute="enableDnsHostnames")
     assert result["EnableDnsHostnames"]
+
+
+def test_iter_subnets(ec2):
+    from cloudaux.aws.ec2 import iter_subnets, iter_vpcs
+
+    vpc_id = ec2.create_vpc(CidrBlock="10.0.0.0/16")["Vpc"]["VpcId"]
+    subnet_ids = []
+    for i in range(3):
+        subnet_ids.append(ec2.create_subnet(CidrBlock="10.0.{}.0/24".format(i), VpcId=vpc_id)["Subnet"]["SubnetId"])
+
+    result = iter_subnets(Filters=[{"Name": "vpc-id", "Values": [vpc_id]}], max_results=5)
+    assert not isinstance(result, list)
+    assert sorted(s["SubnetId"] for s in result) == sorted(subnet_ids)
+
+    assert vpc_id in [v["VpcId"] for v in iter_vpcs()]
@@ -0,0 +1,56 @@
+"""
+.. module: cloudaux.tests.aws.test_elb_orchestration
+    :platform: Unix
+    :copyright: (c) 2018 by Netflix Inc., see AUTHORS for more
+    :license: Apache, see LICENSE for more details.
+"""
+from mock import patch
+
+
+def test_get_all_load_balancers(elb):
+    from cloudaux.orchestration.aws import elb as elb_orchestration
+    from cloudaux.orchestration.aws.elb import get_all_load_balancers, get_load_balancer, FLAGS
+
+    names = ['testElb{}'.format(i) for i in range(3)]
+    for name in names:
+        elb.create_load_balancer(LoadBalancerName=name, AvailabilityZones=['us-east-1a'], Listeners=[
+            {'Protocol': 'HTTP', 'LoadBalancerPort': 80, 'InstancePort': 8080}],
+            Tags=[{'Key': 'Name', 'Value': name}])
+
+    # The same named policy on two of the ELBs:
+    for name in names[:2]:
+        elb.create_load_balancer_policy(LoadBalancerName=name, PolicyName='ELBSecurityPolicy-2016-08',
+                                        PolicyTypeName='SSLNegotiationPolicyType', PolicyAttributes=[
+                                            {'AttributeName': 'Reference-Security-Policy',
+                                             'AttributeValue': 'ELBSecurityPolicy-2016-08'}])
+        elb.set_load_balancer_policies_of_listener(LoadBalancerName=name, LoadBalancerPort=80,
+                                                   PolicyNames=['ELBSecurityPolicy-2016-08'])
+
+    conn = dict(account_number='012345678912', region='us-east-1')
+
+    with patch.object(elb_orchestration, 'DESCRIBE_TAGS_CHUNK_SIZE', 2), \
+            patch.object(elb_orchestration, 'describe_tags', wraps=elb_orchestration.describe_tags) as mock_tags:
+        result = get_all_load_balancers(**conn)
+        assert mock_tags.call_count == 2
+
+    assert [r['LoadBalancerName'] for r in result] == names
+    for r in result:
+        assert r['Tags'] == [{'Key': 'Name', 'Value': r['LoadBalancerName']}]
+        assert r['Arn'] == 'arn:aws:elasticloadbalancing:us-east-1:012345678912:loadbalancer/{}'.format(
+            r['LoadBalancerName'])
+        assert r['_version'] == 2
+        assert r['ListenerDescriptions'][0]['InstancePort'] == 8080
+
+    policy = result[0]['PolicyDescriptions']['ELBSecurityPolicy-2016-08']
+    assert policy['reference_security_policy'] == 'ELBSecurityPolicy-2016-08'
+    assert result[1]['PolicyDescriptions'] == result[0]['PolicyDescriptions']
+
+    # Same results as get_load_balancer:
+    assert result[1] == get_load_balancer(names[1], **conn)
+    assert result[2] == get_load_balancer(names[2], **conn)
+
+    result = get_all_load_balancers(flags=FLAGS.BASE | FLAGS.TAGS, output='underscored', **conn)
+    assert len(result) == 3
+    assert result[0]['tags']
+    assert 'attributes' not in result[0]
+    assert 'policy_descriptions' not in result[0]
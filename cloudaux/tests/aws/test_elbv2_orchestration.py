@@ -0,0 +1,60 @@
+"""
+.. module: cloudaux.tests.aws.test_elbv2_orchestration
+    :platform: Unix
+    :copyright: (c) 2018 by Netflix Inc., see AUTHORS for more
+    :license: Apache, see LICENSE for more details.
+"""
+from mock import patch
+
+
+def test_get_all_load_balancers_v2(ec2, elbv2):
+    from cloudaux.orchestration.aws import elbv2 as elbv2_orchestration
+    from cloudaux.orchestration.aws.elbv2 import get_all_load_balancers_v2, get_elbv2, FLAGS
+
+    vpc_id = ec2.create_vpc(CidrBlock='10.0.0.0/16')['Vpc']['VpcId']
+    subnets = [ec2.create_subnet(VpcId=vpc_id, CidrBlock='10.0.{}.0/24'.format(i),
+                                 AvailabilityZone='us-east-1{}'.format(az))['Subnet']['SubnetId']
+               for i, az in enumerate('ab')]
+
+    # One target group, shared by both ALBs:
+    target_group_arn = elbv2.create_target_group(Name='testTargetGroup', Protocol='HTTP', Port=80,
+                                                 VpcId=vpc_id)['TargetGroups'][0]['TargetGroupArn']
+
+    alb_arns = []
+    for i in range(2):
+        alb_arn = elbv2.create_load_balancer(Name='testAlb{}'.format(i), Subnets=subnets,
+                                             Tags=[{'Key': 'Name', 'Value': 'testAlb{}'.format(i)}]
+                                             )['LoadBalancers'][0]['LoadBalancerArn']
+        elbv2.create_listener(LoadBalancerArn=alb_arn, Protocol='HTTP', Port=80,
+                              DefaultActions=[{'Type': 'forward', 'TargetGroupArn': target_group_arn}])
+        alb_arns.append(alb_arn)
+
+    conn = dict(region='us-east-1')
+
+    with patch.object(elbv2_orchestration, 'describe_tags', wraps=elbv2_orchestration.describe_tags) as mock_tags, \
+            patch.object(elbv2_orchestration, 'describe_target_health',
+                         wraps=elbv2_orchestration.describe_target_health) as mock_health:
+        result = get_all_load_balancers_v2(**conn)
+        assert mock_tags.call_count == 1
+        assert mock_health.call_count == 1
+
+    assert [r['Arn'] for r in result] == alb_arns
+    for r in result:
+        assert r['Tags'][0]['Tags'] == [{'Key': 'Name', 'Value': r['LoadBalancerName']}]
+        assert len(r['Listeners']) == 1
+        assert len(r['Rules']) == 1
+        assert [t['TargetGroupArn'] for t in r['TargetGroups']] == [target_group_arn]
+        assert r['TargetGroupAttributes']
+        assert r['_version'] == 2
+
+    # Same results as get_elbv2:
+    assert result[1] == get_elbv2(alb_arns[1], **conn)
+
+    # The shared target group is copied per ALB:
+    assert result[0]['TargetGroups'][0] is not result[1]['TargetGroups'][0]
+    assert result[0]['TargetGroupAttributes'][0] is not result[1]['TargetGroupAttributes'][0]
+
+    result = get_all_load_balancers_v2(flags=FLAGS.RULES, output='underscored', **conn)
+    assert len(result[0]['listeners']) == 1
+    assert len(result[0]['rules']) == 1
+    assert 'target_groups' not in result[0]
@@ -6,6 +6,8 @@
 .. moduleauthor:: Will Bengtson <wbengtson@netflix.com>
 .. moduleauthor:: Mike Grima <mgrima@netflix.com>
 """
+import json
+
 import pytest
 
 from cloudaux.aws.iam import InvalidAuthorizationFilterException
@@ -248,3 +250,50 @@ def test_get_server_certificate_orchestration(server_certificates):
     assert result['Path'] == '/'
     assert result['Arn'] == 'arn:aws:iam::123456789012:server-certificate/certOne'
     assert result['ServerCertificateName'] == 'certOne'
+
+
+def test_get_managed_policy_orchestration_state_store(test_iam, mock_iam_client, tmpdir):
+    """Tests that unchanged managed policies are served from the state store."""
+    from mock import patch
+    from cloudaux.orchestration.aws.iam import managed_policy
+    from cloudaux.orchestration.aws.iam.state import IAMStateStore
+
+    arn = 'arn:aws:iam::123456789012:policy/testCloudAuxPolicy'
+    path = str(tmpdir.join('iam_state.json'))
+    store = IAMStateStore(path=path)
+
+    result = managed_policy.get_managed_policy({'Arn': arn}, state_store=store, force_client=mock_iam_client)
+    assert result['Document']['Statement'][0]['Action'] == 's3:ListBucket'
+    store.save()
+
+    # A fresh store loaded from disk should skip the document fetch for the unchanged policy:
+    store = IAMStateStore(path=path)
+    with patch.object(managed_policy, 'get_managed_policy_document') as mock_document:
+        result = managed_policy.get_managed_policy({'Arn': arn}, state_store=store, force_client=mock_iam_client)
+        assert not mock_document.called
+    assert result['Document']['Statement'][0]['Action'] == 's3:ListBucket'
+
+    # The sweep should not need to make any per-policy calls:
+    with patch.object(managed_policy, 'get_policy') as mock_get_policy:
+        results = managed_policy.get_all_managed_policies(state_store=store, force_client=mock_iam_client)
+        assert not mock_get_policy.called
+    assert len(results) == 1
+    assert results[0]['Arn'] == arn
+    assert results[0]['Document'] == result['Document']
+
+    # Stored and fetched policies are output in the same shape:
+    results = managed_policy.get_all_managed_policies(state_store=store, output='underscored',
+                                                      force_client=mock_iam_client)
+    fetched = managed_policy.get_managed_policy({'Arn': arn}, output='underscored', force_client=mock_iam_client)
+    assert set(fetched) <= set(results[0])
+    assert not [key for key in results[0] if key != key.lower()]
+    assert results[0]['attachment_count'] == fetched['attachment_count']
+
+    # A new default version changes the fingerprint:
+    test_iam.create_policy_version(PolicyArn=arn, SetAsDefault=True, PolicyDocument=json.dumps({
+        "Version": "2012-10-17",
+        "Statement": [{"Action": "s3:GetObject", "Resource": "*", "Effect": "Allow"}]
+    }))
+    results = managed_policy.get_all_managed_policies(state_store=store, force_client=mock_iam_client)
+    assert results[0]['DefaultVersionId'] == 'v2'
+    assert results[0]['Document']['Statement'][0]['Action'] == 's3:GetObject'
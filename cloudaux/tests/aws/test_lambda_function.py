@@ -0,0 +1,91 @@
+"""
+.. module: cloudaux.tests.aws.test_lambda_function
+    :platform: Unix
+    :copyright: (c) 2018 by Netflix Inc., see AUTHORS for more
+    :license: Apache, see LICENSE for more details.
+"""
+import pytest
+from botocore.exceptions import ClientError
+from mock import patch
+
+
+def test_get_policy(test_lambda_function):
+    from cloudaux.orchestration.aws import lambda_function
+    from cloudaux.orchestration.aws.lambda_function import get_lambda_function, FLAGS
+
+    function_name = test_lambda_function['FunctionName']
+    flags = FLAGS.POLICY | FLAGS.VERSIONS | FLAGS.ALIASES
+
+    with patch.object(lambda_function, 'get_policy', wraps=lambda_function.get_policy) as mock_get_policy:
+        result = get_lambda_function(function_name, flags=flags, region='us-east-1')
+
+        # $LATEST shares the default policy -- one call each for: the default, version 1, and the "live" alias:
+        qualifiers = sorted(str(call[1].get('Qualifier')) for call in mock_get_policy.call_args_list)
+        assert qualifiers == ['1', 'None', 'live']
+
+    assert result['Policy']['DEFAULT']['Statement'][0]['Sid'] == 's3invoke'
+    assert result['Policy']['Versions']['$LATEST'] == result['Policy']['DEFAULT']
+    assert set(result['Policy']['Versions']) == {'$LATEST', '1'}
+    assert set(result['Policy']['Aliases']) == {'live'}
+
+    # Missing policies are skipped:
+    not_found = ClientError({'Error': {'Code': 'ResourceNotFoundException', 'Message': ''}}, 'GetPolicy')
+    with patch.object(lambda_function, 'get_policy', side_effect=not_found):
+        result = get_lambda_function(function_name, flags=flags, region='us-east-1')
+
+    assert result['Policy'] == {'Versions': {}, 'Aliases': {}, 'DEFAULT': {}}
+
+    # ...but other errors are not:
+    access_denied = ClientError({'Error': {'Code': 'AccessDeniedException', 'Message': ''}}, 'GetPolicy')
+    with patch.object(lambda_function, 'get_policy', side_effect=access_denied):
+        with pytest.raises(ClientError):
+            get_lambda_function(function_name, flags=flags, region='us-east-1')
+
+
+def test_get_all_lambda_functions(test_lambda_function, lambda_client):
+    from cloudaux.orchestration.aws import lambda_function
+    from cloudaux.orchestration.aws.lambda_function import get_all_lambda_functions, FLAGS
+
+    lambda_client.create_function(FunctionName='otherFunction', Runtime='python3.9', Role=test_lambda_function['Role'],
+                                  Handler='lambda_function.handler', Code={'ZipFile': b'not a real zip'})
+
+    mapping = {'UUID': 'abcd', 'FunctionArn': test_lambda_function['FunctionArn'], 'LastModified': 1}
+
+    with patch.object(lambda_function, 'list_event_source_mappings', return_value=[mapping]) as mock_mappings, \
+            patch.object(lambda_function, 'get_function_configuration') as mock_configuration, \
+            patch.object(lambda_function, 'Parallel', wraps=lambda_function.Parallel) as mock_parallel:
+        result = get_all_lambda_functions(region='us-east-1')
+
+        # The event source mappings are listed once for the region, and the list data is used as the base:
+        assert mock_mappings.call_count == 1
+        assert not mock_configuration.called
+
+        # The policies are fetched within each function's job, rather than in a pool per function:
+        assert [c[1]['n_jobs'] for c in mock_parallel.call_args_list] == [lambda_function.FUNCTION_FETCH_THREADS, 1, 1]
+
+    assert len(result) == 2
+    result = {r['FunctionName']: r for r in result}
+
+    function = result['testCloudAuxFunction']
+    assert function['Arn'] == test_lambda_function['FunctionArn']
+    assert function['Role'] == test_lambda_function['Role']
+    assert function['_version'] == 1
+    assert function['EventSourceMappings'] == [{'UUID': 'abcd', 'FunctionArn': function['Arn'], 'LastModified': '1'}]
+    assert set(function['Policy']['Aliases']) == {'live'}
+    assert len(function['Versions']) == 2
+    assert function['Tags'] == {}
+
+    assert result['otherFunction']['EventSourceMappings'] == []
+    assert result['otherFunction']['Policy']['Aliases'] == {}
+
+    # A previous result is still refreshed by get_lambda_function:
+    with patch.object(lambda_function, 'get_function_configuration',
+                      return_value=dict(test_lambda_function, Description='refreshed')) as mock_configuration:
+        refreshed = lambda_function.get_lambda_function({'FunctionName': 'testCloudAuxFunction', '_version': 1},
+                                                        flags=FLAGS.BASE, region='us-east-1')
+        assert mock_configuration.called
+        assert refreshed['Description'] == 'refreshed'
+
+    result = get_all_lambda_functions(flags=FLAGS.BASE, output='underscored', region='us-east-1')
+    assert sorted(r['function_name'] for r in result) == ['otherFunction', 'testCloudAuxFunction']
+    assert 'policy' not in result[0]
@@ -0,0 +1,150 @@
+"""
+.. module: cloudaux.tests.aws.test_s3
+    :platform: Unix
+    :copyright: (c) 2018 by Netflix Inc., see AUTHORS for more
+    :license: Apache, see LICENSE for more details.
+"""
+import csv
+import io
+import json
+
+import pytest
+
+OBJECT_KEYS = ['top.txt', 'logs/1', 'logs/2', 'data/a/1', 'data/b/1', 'data/b/2']
+
+
+def test_list_objects(s3):
+    from cloudaux.aws.s3 import list_objects
+
+    for key in OBJECT_KEYS:
+        s3.put_object(Bucket='test-bucket', Key=key, Body=b'data')
+
+    objects = list_objects(Bucket='test-bucket', Prefix='data/', max_results=1, force_client=s3)
+    assert not isinstance(objects, list)
+    objects = list(objects)
+    assert [o['Key'] for o in objects] == ['data/a/1', 'data/b/1', 'data/b/2']
+    assert objects[0]['Size'] == 4
+
+
+def test_list_objects_sharded(s3):
+    from cloudaux.aws import s3 as s3_module
+    from cloudaux.aws.s3 import list_objects_sharded, write_objects
+
+    for key in OBJECT_KEYS:
+        s3.put_object(Bucket='test-bucket', Key=key, Body=b'data')
+
+    objects = list(list_objects_sharded('test-bucket', max_workers=2, buffer_size=1, force_client=s3))
+    assert objects[0]['Key'] == 'top.txt'
+    assert sorted(o['Key'] for o in objects) == sorted(OBJECT_KEYS)
+    assert 'test-bucket' in s3_module._BUCKET_SEMAPHORES
+
+    objects = list_objects_sharded('test-bucket', shards=['data/a/', 'logs/'], force_client=s3)
+    assert sorted(o['Key'] for o in objects) == ['data/a/1', 'logs/1', 'logs/2']
+
+    # NDJSON:
+    out = io.StringIO()
+    assert write_objects(list_objects_sharded('test-bucket', prefix='logs/', force_client=s3), out) == 2
+    lines = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert sorted(line['Key'] for line in lines) == ['logs/1', 'logs/2']
+    assert set(lines[0]) == {'Key', 'LastModified', 'ETag', 'Size', 'StorageClass'}
+    assert isinstance(lines[0]['LastModified'], str)
+
+    # CSV:
+    out = io.StringIO()
+    write_objects(list_objects_sharded('test-bucket', prefix='logs/', force_client=s3), out, output_format='csv',
+                  fields=('Key', 'Size'))
+    rows = list(csv.reader(io.StringIO(out.getvalue())))
+    assert rows[0] == ['Key', 'Size']
+    assert sorted(rows[1:]) == [['logs/1', '4'], ['logs/2', '4']]
+
+    with pytest.raises(ValueError):
+        write_objects([], out, output_format='parquet')
+
+
+INVENTORY_CONFIGURATION = {
+    'Id': 'daily',
+    'IsEnabled': True,
+    'IncludedObjectVersions': 'Current',
+    'Schedule': {'Frequency': 'Daily'},
+    'Destination': {'S3BucketDestination': {'Bucket': 'arn:aws:s3:::inventory-bucket', 'Format': 'CSV',
+                                            'Prefix': 'inventory'}},
+}
+
+INVENTORY_ROWS = [
+    ['test-bucket', 'data/a/1', '4', '2018-01-01T00:00:00.000Z', '8d777f385d3dfec8815d20f7496026dc', 'STANDARD'],
+    ['test-bucket', 'logs/1', '10', '2018-01-02T00:00:00.000Z', 'd41d8cd98f00b204e9800998ecf8427e', 'GLACIER'],
+    ['test-bucket', 'dir/my+file%21.txt', '0', '2018-01-02T00:00:00.000Z', 'd41d8cd98f00b204e9800998ecf8427e',
+     'STANDARD'],
+]
+
+
+def _gzip_csv(rows):
+    import gzip
+
+    out = io.BytesIO()
+    with gzip.GzipFile(fileobj=out, mode='wb') as gz:
+        text = io.StringIO()
+        csv.writer(text).writerows(rows)
+        gz.write(text.getvalue().encode('utf-8'))
+    return out.getvalue()
+
+
+def test_iter_inventory_file(tmpdir):
+    from cloudaux.aws.s3 import iter_inventory_file
+
+    # Reads local copies of the reports:
+    path = tmpdir.join('report.csv.gz')
+    path.write_binary(_gzip_csv(INVENTORY_ROWS))
+    with open(str(path), 'rb') as f:
+        records = list(iter_inventory_file(f, file_schema='Bucket, Key, Size, LastModifiedDate, ETag, StorageClass'))
+
+    assert len(records) == 3
+    assert records[0]['Key'] == 'data/a/1'
+    assert records[0]['Size'] == 4
+    assert records[0]['LastModified'].year == 2018
+    assert records[0]['ETag'] == '"8d777f385d3dfec8815d20f7496026dc"'
+    assert records[1]['StorageClass'] == 'GLACIER'
+    assert 'Bucket' not in records[0]
+    # The keys are URL-decoded, as in the listing:
+    assert records[2]['Key'] == 'dir/my file!.txt'
+
+    with pytest.raises(ValueError):
+        list(iter_inventory_file(io.BytesIO(), file_format='XML'))
+
+
+def test_iter_inventory(s3):
+    from mock import patch
+    from cloudaux.aws import s3 as s3_module
+    from cloudaux.aws.s3 import InventoryNotFoundException, iter_inventory
+
+    s3.create_bucket(Bucket='inventory-bucket')
+    report_prefix = 'inventory/test-bucket/daily/2018-01-02T00-00Z/'
+    files = []
+    for i, rows in enumerate([INVENTORY_ROWS[:1], INVENTORY_ROWS[1:]]):
+        key = 'inventory/test-bucket/daily/data/{}.csv.gz'.format(i)
+        s3.put_object(Bucket='inventory-bucket', Key=key, Body=_gzip_csv(rows))
+        files.append({'key': key})
+
+    s3.put_object(Bucket='inventory-bucket', Key=report_prefix + 'manifest.json', Body=json.dumps({
+        'sourceBucket': 'test-bucket',
+        'destinationBucket': 'arn:aws:s3:::inventory-bucket',
+        'fileFormat': 'CSV',
+        'fileSchema': 'Bucket, Key, Size, LastModifiedDate, ETag, StorageClass',
+        'files': files,
+    }))
+    # A report that is still being delivered (no manifest yet):
+    s3.put_object(Bucket='inventory-bucket', Key='inventory/test-bucket/daily/2018-01-03T00-00Z/partial', Body=b'')
+
+    with patch.object(s3_module, 'list_bucket_inventory_configurations', return_value=[INVENTORY_CONFIGURATION]):
+        records = list(iter_inventory('test-bucket', max_workers=2, force_client=s3))
+        assert sorted(r['Key'] for r in records) == ['data/a/1', 'dir/my file!.txt', 'logs/1']
+        assert set(records[0]) == {'Key', 'LastModified', 'ETag', 'Size', 'StorageClass'}
+
+        with pytest.raises(InventoryNotFoundException):
+            list(iter_inventory('test-bucket', inventory_id='weekly', force_client=s3))
+
+    # Disabled configurations are skipped, rather than reading their stale reports:
+    disabled = dict(INVENTORY_CONFIGURATION, IsEnabled=False)
+    with patch.object(s3_module, 'list_bucket_inventory_configurations', return_value=[disabled]):
+        with pytest.raises(InventoryNotFoundException):
+            list(iter_inventory('test-bucket', force_client=s3))
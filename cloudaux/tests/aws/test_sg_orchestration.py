@@ -0,0 +1,46 @@
+"""
+.. module: cloudaux.tests.aws.test_sg_orchestration
+    :platform: Unix
+    :copyright: (c) 2018 by Netflix Inc., see AUTHORS for more
+    :license: Apache, see LICENSE for more details.
+"""
+from mock import patch
+
+
+def test_get_security_groups(ec2):
+    from cloudaux.orchestration.aws import sg
+    from cloudaux.orchestration.aws.sg import get_security_group, get_security_groups
+
+    vpc_id = ec2.create_vpc(CidrBlock='10.0.0.0/16')['Vpc']['VpcId']
+    sg_ids = [ec2.create_security_group(GroupName='sg{}'.format(i), Description='Test SG {}'.format(i),
+                                        VpcId=vpc_id)['GroupId'] for i in range(3)]
+    sg_arn = 'arn:aws:ec2:us-east-1:012345678912:security-group/{}'.format(sg_ids[2])
+    conn = dict(account_number='012345678912', region='us-east-1')
+
+    # Results come back in input order, with None for groups that don't exist:
+    with patch.object(sg, 'SECURITY_GROUP_IDS_CHUNK_SIZE', 2):
+        result = get_security_groups([sg_arn, sg_ids[1], 'sg-00000000', sg_ids[0], sg_ids[1]], **conn)
+
+    assert len(result) == 5
+    assert result[0]['GroupId'] == sg_ids[2]
+    assert result[0]['GroupName'] == 'sg2'
+    assert result[1]['GroupId'] == result[4]['GroupId'] == sg_ids[1]
+    assert result[1] is not result[4]
+    assert result[2] is None
+    assert result[3] == get_security_group(sg_ids[0], **conn)
+    assert result[3]['_version'] == 1
+    assert result[3]['VpcId'] == vpc_id
+
+    result = get_security_groups([sg_ids[0]], output='underscored', **conn)
+    assert result[0]['group_id'] == sg_ids[0]
+
+
+def test_get_base_classic():
+    from cloudaux.orchestration.aws import sg
+
+    # EC2-Classic groups have no VpcId, but are otherwise complete:
+    classic = {'Description': 'Classic SG', 'GroupName': 'classic', 'IpPermissions': [], 'OwnerId': '012345678912',
+               'GroupId': 'sg-12345678', 'IpPermissionsEgress': []}
+    with patch.object(sg, 'describe_security_group') as mock_describe:
+        assert sg._get_base(dict(classic))['_version'] == 1
+        assert not mock_describe.called
@@ -0,0 +1,41 @@
+"""
+.. module: cloudaux.tests.aws.test_sqs_orchestration
+    :platform: Unix
+    :copyright: (c) 2018 by Netflix Inc., see AUTHORS for more
+    :license: Apache, see LICENSE for more details.
+"""
+import json
+
+from mock import patch
+
+
+def test_get_all_queues(sqs):
+    from cloudaux.orchestration.aws import sqs as sqs_orchestration
+    from cloudaux.orchestration.aws.sqs import get_all_queues, get_queue, FLAGS
+
+    dlq_url = sqs.create_queue(QueueName='testDeadLetterQueue')['QueueUrl']
+    dlq_arn = sqs.get_queue_attributes(QueueUrl=dlq_url, AttributeNames=['QueueArn'])['Attributes']['QueueArn']
+    redrive_policy = json.dumps({'deadLetterTargetArn': dlq_arn, 'maxReceiveCount': 5})
+
+    source_urls = [sqs.create_queue(QueueName='testSourceQueue{}'.format(i), Attributes={'RedrivePolicy': redrive_policy},
+                                    tags={'Source': str(i)})['QueueUrl'] for i in range(2)]
+
+    with patch.object(sqs_orchestration, 'list_dead_letter_source_queues') as mock_dlq_sources:
+        result = get_all_queues(region='us-east-1')
+        assert not mock_dlq_sources.called
+
+    assert len(result) == 3
+    result = {r['Name']: r for r in result}
+
+    assert sorted(result['testDeadLetterQueue']['DeadLetterSourceQueues']) == sorted(source_urls)
+    assert result['testSourceQueue0']['DeadLetterSourceQueues'] == []
+    assert result['testSourceQueue1']['Tags'] == {'Source': '1'}
+    assert result['testSourceQueue1']['Arn'] == result['testSourceQueue1']['Attributes']['QueueArn']
+
+    # Same results as get_queue:
+    assert result['testSourceQueue0'] == get_queue(source_urls[0], region='us-east-1')
+
+    result = get_all_queues(flags=FLAGS.BASE, output='underscored', region='us-east-1')
+    assert len(result) == 3
+    assert 'tags' not in result[0]
+    assert 'dead_letter_source_queues' not in result[0]
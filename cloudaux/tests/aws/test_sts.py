@@ -5,6 +5,9 @@
     :license: Apache, see LICENSE for more details.
 .. moduleauthor:: Josafat Gonzalez <josafatg@netflix.com>
 """
+import datetime
+
+import dateutil.tz
 from botocore.client import Config
 from cloudaux.aws.sts import boto3_cached_conn
 from mock import patch
@@ -111,3 +114,49 @@ def test_boto3_cached_conn_config(sts):
         conn = boto3_cached_conn('s3', config=Config(signature_version='s3v4'), **conn_details)
         assert conn.mock_calls[1].kwargs['config'].signature_version == 's3v4'
         cloudaux.aws.sts.CACHE = {}
+
+
+def test_connection_pool(sts):
+    from cloudaux.aws import ConnectionPool
+    from cloudaux.aws.sts import _client, sts_conn
+    import cloudaux.aws.sts
+
+    pool = ConnectionPool()
+    conn_details = {
+        'account_number': '111111111111',
+        'assume_role': 'role_one',
+        'region': 'us-east-1',
+        'connection_pool': pool
+    }
+
+    @sts_conn('s3')
+    def get_client(client=None):
+        return client
+
+    with patch('cloudaux.aws.sts._client', wraps=_client) as mock_client:
+        first = get_client(**conn_details)
+        assert get_client(**conn_details) is first
+        assert mock_client.call_count == 1
+        assert len(pool) == 1
+
+        # Different region, service or partition -> different client:
+        assert get_client(**dict(conn_details, region='us-west-2')) is not first
+        assert boto3_cached_conn('ec2', **conn_details) is not first
+        assert get_client(**dict(conn_details, arn_partition='aws-us-gov')) is not first
+        assert mock_client.call_count == 4
+        assert len(pool) == 4
+
+        # Without the pool, a new client is made each time:
+        conn_details.pop('connection_pool')
+        assert get_client(**conn_details) is not first
+        assert mock_client.call_count == 5
+
+    # Clients expire with their credentials:
+    key = next(k for k in pool._conns if k[4] == 'us-east-1' and k[6] == 's3' and k[7] == 'aws')
+    pool._conns[key] = (first, datetime.datetime.now(dateutil.tz.tzutc()))
+    assert pool.get(key) is None
+    assert key not in pool._conns
+
+    pool.clear()
+    assert not len(pool)
+    cloudaux.aws.sts.CACHE = {}
@@ -239,3 +239,52 @@ def test_get_network_acls(test_vpc, dhcp_options, network_acl):
             found = True
     assert found
     perform_base_tests(test_vpc, dhcp_options, result)
+
+
+def test_get_all_vpcs(ec2):
+    from cloudaux.orchestration.aws.vpc import get_all_vpcs, get_vpc, FLAGS
+
+    # Skipping the IPv6 CIDR in the test_vpc fixture:
+    options_id = ec2.create_dhcp_options(DhcpConfigurations=[
+        {"Key": "domain-name-servers", "Values": ["10.0.5.1"]}
+    ])["DhcpOptions"]["DhcpOptionsId"]
+
+    vpc_ids = []
+    for cidr in ["10.0.0.0/16", "10.1.0.0/16"]:
+        vpc_id = ec2.create_vpc(CidrBlock=cidr)["Vpc"]["VpcId"]
+        ec2.associate_dhcp_options(DhcpOptionsId=options_id, VpcId=vpc_id)
+        ec2.create_tags(Resources=[vpc_id], Tags=[{"Key": "Name", "Value": "vpc-{}".format(cidr)}])
+        ec2.create_subnet(CidrBlock=cidr, VpcId=vpc_id)
+        vpc_ids.append(vpc_id)
+
+    gateway_id = ec2.create_internet_gateway()["InternetGateway"]["InternetGatewayId"]
+    ec2.attach_internet_gateway(InternetGatewayId=gateway_id, VpcId=vpc_ids[0])
+
+    flags = FLAGS.ALL
+    conn = dict(account_number="012345678912", region="us-east-1")
+
+    # All VPCs in the region (including the default VPC):
+    result = get_all_vpcs(flags=flags, **conn)
+    assert len(result) == 3
+
+    # Just the requested VPCs should match the per-VPC orchestration:
+    result = get_all_vpcs(vpc_ids=vpc_ids, flags=flags, **conn)
+    assert [v["Id"] for v in result] == vpc_ids
+
+    for vpc in result:
+        expected = get_vpc(vpc["Id"], flags=flags, **conn)
+        assert vpc == expected
+
+    assert result[0]["InternetGateway"]["Id"] == gateway_id
+    assert not result[1]["InternetGateway"]
+    assert len(result[0]["Subnets"]) == 1
+
+    # Underscored output:
+    result = get_all_vpcs(vpc_ids=vpc_ids[:1], flags=FLAGS.BASE, output="underscored", **conn)
+    assert result[0]["name"] == "vpc-10.0.0.0/16"
+    assert "subnets" not in result[0]
+
+    # The sections depend on BASE, so it is built for them too, as in get_vpc:
+    result = get_all_vpcs(vpc_ids=vpc_ids[:1], flags=FLAGS.SUBNETS, **conn)
+    assert result[0] == get_vpc(vpc_ids[0], flags=FLAGS.SUBNETS, **conn)
+    assert len(result[0]["Subnets"]) == 1
@@ -35,3 +35,9 @@ def test_cloudaux():
     assert ca_two.conn_details["assume_role"] == "role_two"
     assert ca_two.conn_details["region"] == "us-east-2"
     assert ca_two.conn_details["session_name"] == "conn_two"
+
+    # Each CloudAux reuses its own clients, unless a pool is passed in to share:
+    assert ca_one.conn_details["connection_pool"] is not ca_two.conn_details["connection_pool"]
+
+    ca_three = CloudAux(connection_pool=ca_one.conn_details["connection_pool"], **conn_two)
+    assert ca_three.conn_details["connection_pool"] is ca_one.conn_details["connection_pool"]
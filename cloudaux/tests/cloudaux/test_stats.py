@@ -0,0 +1,57 @@
+"""
+.. module: cloudaux.tests.cloudaux.test_stats
+    :platform: Unix
+    :copyright: (c) 2018 by Netflix Inc., see AUTHORS for more
+    :license: Apache, see LICENSE for more details.
+"""
+import random
+
+import pytest
+
+from cloudaux.stats import StatsRegistry, StreamingHistogram, timed
+
+
+def test_streaming_histogram():
+    histogram = StreamingHistogram()
+    assert histogram.quantile(0.5) is None
+    assert histogram.summary()['mean'] is None
+
+    values = [random.uniform(0.001, 10) for _ in range(20000)]
+    for value in values:
+        histogram.record(value)
+
+    values.sort()
+    summary = histogram.summary()
+    assert summary['count'] == 20000
+    assert summary['sum'] == pytest.approx(sum(values))
+    assert summary['min'] == values[0]
+    assert summary['max'] == values[-1]
+
+    # Quantiles are within the histogram's precision (1%) of the exact values:
+    for q, key in [(0.5, 'p50'), (0.9, 'p90'), (0.99, 'p99')]:
+        assert summary[key] == pytest.approx(values[int(q * (len(values) - 1))], rel=0.011)
+
+    # Memory is bounded by the range of the values, not their count:
+    assert len(histogram._buckets) < 1000
+
+
+def test_stats_registry():
+    registry = StatsRegistry()
+
+    @timed(registry)
+    def describe_things(fail=False):
+        if fail:
+            raise ValueError()
+
+    describe_things()
+    with pytest.raises(ValueError):
+        describe_things(fail=True)
+
+    snapshot = registry.snapshot()
+    assert snapshot['describe_things']['count'] == 2
+    assert registry.snapshot(reset=True) == snapshot
+    assert registry.snapshot() == {}
+
+    registry.record('list_things', 1.5)
+    registry.reset()
+    assert registry.snapshot() == {}
@@ -0,0 +1,45 @@
+"""
+.. module: cloudaux.tests.cloudaux.test_streaming
+    :platform: Unix
+    :copyright: (c) 2018 by Netflix Inc., see AUTHORS for more
+    :license: Apache, see LICENSE for more details.
+"""
+import threading
+
+import pytest
+
+from cloudaux.streaming import iter_sharded
+
+
+def test_iter_sharded():
+    shards = {'a/': range(0, 500), 'b/': range(500, 1000), 'c/': []}
+    items = list(iter_sharded(lambda shard: iter(shards[shard]), list(shards), max_workers=2, buffer_size=10))
+    assert sorted(items) == list(range(1000))
+
+
+def test_iter_sharded_bounded():
+    produced = []
+    lock = threading.Lock()
+
+    def list_shard(shard):
+        for i in range(1000):
+            with lock:
+                produced.append(i)
+            yield i
+
+    items = iter_sharded(list_shard, ['a/', 'b/', 'c/'], max_workers=3, buffer_size=10)
+    assert next(items) is not None
+
+    # The workers wait for the caller, and stop when it does:
+    items.close()
+    assert len(produced) < 100
+
+
+def test_iter_sharded_error():
+    def list_shard(shard):
+        if shard == 'broken/':
+            raise ValueError('Access Denied')
+        return iter(range(10))
+
+    with pytest.raises(ValueError, match='Access Denied'):
+        list(iter_sharded(list_shard, ['a/', 'broken/', 'c/']))
@@ -0,0 +1,95 @@
+"""
+.. module: cloudaux.tests.gcp.test_decorators
+    :platform: Unix
+    :copyright: (c) 2018 by Netflix Inc., see AUTHORS for more
+    :license: Apache, see LICENSE for more details.
+"""
+import threading
+import time
+import unittest
+
+from cloudaux.gcp.decorators import _build_key, gcp_stats, iter_project_zone
+
+
+class SecretCredentials(object):
+    def __repr__(self):
+        return 'private_key=' + 'x' * 10000
+
+
+class TestDecorators(unittest.TestCase):
+    def test_build_key(self):
+        key = _build_key('get_client', ('gce',), {'project': 'my-project', 'key_file': None, 'api_version': 'v1'})
+
+        # Deterministic, regardless of the kwargs ordering:
+        self.assertEqual(key, _build_key('get_client', ['gce'], {'api_version': 'v1', 'key_file': None,
+                                                                 'project': 'my-project'}))
+        self.assertNotEqual(key, _build_key('get_client', ('gce',), {'project': 'other-project'}))
+        self.assertNotEqual(key, _build_key('other_function', ('gce',), {'project': 'my-project', 'key_file': None,
+                                                                         'api_version': 'v1'}))
+
+        # Clients and credentials are left out of the key, rather than repr'ed (or keyed by identity):
+        key = _build_key('get_client', ('gce',), {'http_auth': SecretCredentials(), 'project': 'my-project'})
+        self.assertNotIn('private_key', key)
+        self.assertLess(len(key), 64)
+        self.assertEqual(key, _build_key('get_client', ('gce',), {'http_auth': SecretCredentials(),
+                                                                   'project': 'my-project'}))
+        self.assertEqual(key, _build_key('get_client', ('gce',), {'project': 'my-project'}))
+        self.assertEqual(_build_key('get_client', (SecretCredentials(), 'gce'), {}),
+                         _build_key('get_client', (SecretCredentials(), 'gce'), {}))
+
+    def test_gcp_stats(self):
+        from cloudaux.gcp.utils import get_gcp_stats
+
+        @gcp_stats()
+        def list_things(project=None):
+            return project
+
+        get_gcp_stats(reset=True)
+        for project in ['one', 'two', 'three']:
+            list_things(project=project)
+
+        # Aggregated per function, rather than per call:
+        stats = get_gcp_stats(reset=True)
+        self.assertEqual(list(stats), ['list_things'])
+        self.assertEqual(stats['list_things']['count'], 3)
+        self.assertFalse(get_gcp_stats())
+
+    def test_iter_project_zone(self):
+        lock = threading.Lock()
+        running = {}
+        max_running = {}
+
+        projects = ['project-one', {'project': 'project-two', 'key_file': '/path/to/project-two.json'}, 'broken']
+
+        @iter_project_zone(projects, zones=['zone-a', 'zone-b', 'zone-c'], key_file='/path/to/key.json',
+                           max_workers=6, max_per_project=2)
+        def list_things(project=None, zone=None, key_file=None, prefix=None):
+            with lock:
+                running[project] = running.get(project, 0) + 1
+                max_running[project] = max(max_running.get(project, 0), running[project])
+            time.sleep(0.02)
+            with lock:
+                running[project] -= 1
+
+            if project == 'broken':
+                raise ValueError('Permission denied')
+            return [prefix, key_file, zone]
+
+        results = list(list_things(prefix='thing'))
+        self.assertEqual(len(results), 9)
+        self.assertTrue(all(count <= 2 for count in max_running.values()))
+
+        by_project_zone = {(r.project, r.zone): r for r in results}
+        self.assertEqual(by_project_zone[('project-one', 'zone-b')].result, ['thing', '/path/to/key.json', 'zone-b'])
+        self.assertEqual(by_project_zone[('project-two', 'zone-a')].result,
+                         ['thing', '/path/to/project-two.json', 'zone-a'])
+
+        # Errors are isolated to their project:
+        for zone in ['zone-a', 'zone-b', 'zone-c']:
+            self.assertIsNone(by_project_zone[('broken', zone)].result)
+            self.assertIsInstance(by_project_zone[('broken', zone)].exception, ValueError)
+            self.assertIsNone(by_project_zone[('project-one', zone)].exception)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,136 @@
+"""
+.. module: cloudaux.tests.gcp.test_gcs
+    :platform: Unix
+    :copyright: (c) 2018 by Netflix Inc., see AUTHORS for more
+    :license: Apache, see LICENSE for more details.
+"""
+import unittest
+
+import mock
+from google.cloud.storage.bucket import Bucket
+
+from cloudaux.gcp.gcs import iter_objects, iter_objects_sharded
+from cloudaux.orchestration.gcp.gcs import bucket as bucket_orchestration
+
+OBJECTS = ['top.txt', 'a/1', 'a/2', 'a/3', 'b/1', 'c/d/1']
+
+
+def _list_objects(method=None, path=None, query_params=None):
+    """Stand-in for the objects.list API, returning one object per page."""
+    prefix = query_params.get('prefix') or ''
+    delimiter = query_params.get('delimiter')
+
+    names, prefixes = [], set()
+    for name in OBJECTS:
+        if not name.startswith(prefix):
+            continue
+        if delimiter and delimiter in name[len(prefix):]:
+            prefixes.add(prefix + name[len(prefix):].split(delimiter)[0] + delimiter)
+        else:
+            names.append(name)
+
+    start = int(query_params.get('pageToken', 0))
+    page = {'items': [{'name': name} for name in names[start:start + 1]], 'prefixes': sorted(prefixes)}
+    if start + 1 < len(names):
+        page['nextPageToken'] = str(start + 1)
+    return page
+
+
+def _make_client():
+    client = mock.Mock()
+    client.bucket.side_effect = lambda name: Bucket(client, name)
+    client._connection.api_request.side_effect = _list_objects
+    return client
+
+
+def _make_bucket(client, name, full=True):
+    properties = {
+        'name': name,
+        'id': name,
+        'location': 'US',
+        'storageClass': 'STANDARD',
+        'timeCreated': '2018-01-01T00:00:00.000Z',
+    }
+    if full:
+        properties['acl'] = [{'entity': 'project-owners-123', 'role': 'OWNER'}]
+        properties['defaultObjectAcl'] = [{'entity': 'allUsers', 'role': 'READER'}]
+
+    bucket = Bucket(client, name)
+    bucket._set_properties(properties)
+    return bucket
+
+
+class TestGCSOrchestration(unittest.TestCase):
+
+    def test_get_all_buckets(self):
+        client = mock.Mock()
+        client._connection.api_request.return_value = {'items': [{'entity': 'user-me@example.com', 'role': 'OWNER'}]}
+        buckets = [_make_bucket(client, 'listed-acls'), _make_bucket(client, 'not-owned', full=False)]
+
+        with mock.patch.object(bucket_orchestration, 'iter_buckets', return_value=iter(buckets)) as mock_iter:
+            results = bucket_orchestration.get_all_buckets('my-project', key_file='/path/to/key.json')
+
+        mock_iter.assert_called_once_with(project='my-project', projection='full', key_file='/path/to/key.json')
+        self.assertEqual([r['Id'] for r in results], ['listed-acls', 'not-owned'])
+
+        # The ACLs from the listing aren't fetched again:
+        self.assertEqual(results[0]['Acl'], [{'entity': 'project-owners-123', 'role': 'OWNER'}])
+        self.assertEqual(results[0]['DefaultObjectAcl'], [{'entity': 'allUsers', 'role': 'READER'}])
+        self.assertEqual(results[0]['TimeCreated'], '2018-01-01T00:00:00Z')
+        self.assertEqual(results[0]['_version'], 1)
+
+        # Only the missing ones are:
+        self.assertEqual(client._connection.api_request.call_count, 2)
+        self.assertEqual(results[1]['Acl'], [{'entity': 'user-me@example.com', 'role': 'OWNER'}])
+
+    def test_get_all_buckets_unauthorized(self):
+        from google.cloud.exceptions import Forbidden
+
+        client = mock.Mock()
+        client._connection.api_request.side_effect = Forbidden('Caller does not have storage.buckets.getIamPolicy')
+        buckets = [_make_bucket(client, 'listed-acls'), _make_bucket(client, 'not-owned', full=False)]
+
+        with mock.patch.object(bucket_orchestration, 'iter_buckets', return_value=iter(buckets)):
+            results = bucket_orchestration.get_all_buckets('my-project')
+
+        # The other buckets are still built out:
+        self.assertEqual(results[0]['Acl'], [{'entity': 'project-owners-123', 'role': 'OWNER'}])
+        self.assertEqual(results[1], {'Id': 'not-owned', 'Error': 'Unauthorized'})
+
+        # Nothing to fetch without the BASE flag:
+        client.reset_mock()
+        with mock.patch.object(bucket_orchestration, 'iter_buckets', return_value=iter(buckets)) as mock_iter:
+            results = bucket_orchestration.get_all_buckets('my-project', flags=0)
+
+        mock_iter.assert_called_once_with(project='my-project')
+        self.assertEqual(results, [{}, {}])
+        self.assertFalse(client._connection.api_request.called)
+
+    def test_iter_objects(self):
+        client = _make_client()
+        objects = iter_objects.__wrapped__(client=client, Bucket='my-bucket', Prefix='a/', PageSize=1,
+                                           Fields='items(name)')
+        self.assertEqual([o.name for o in objects], ['a/1', 'a/2', 'a/3'])
+
+        query_params = client._connection.api_request.call_args[1]['query_params']
+        self.assertEqual(query_params['maxResults'], 1)
+        self.assertEqual(query_params['fields'], 'items(name),nextPageToken,prefixes')
+
+    def test_iter_objects_sharded(self):
+        client = _make_client()
+        objects = list(iter_objects_sharded.__wrapped__(client=client, Bucket='my-bucket', Workers=2, BufferSize=2))
+        self.assertEqual(objects[0].name, 'top.txt')
+        self.assertEqual(sorted(o.name for o in objects), sorted(OBJECTS))
+
+        # The shards are listed without the delimiter:
+        shard_calls = [c[1]['query_params'] for c in client._connection.api_request.call_args_list
+                       if 'delimiter' not in c[1]['query_params']]
+        self.assertEqual(set(q['prefix'] for q in shard_calls), {'a/', 'b/', 'c/'})
+
+        client = _make_client()
+        objects = iter_objects_sharded.__wrapped__(client=client, Bucket='my-bucket', Shards=['a/', 'c/'])
+        self.assertEqual(sorted(o.name for o in objects), ['a/1', 'a/2', 'a/3', 'c/d/1'])
+
+
+if __name__ == '__main__':
+    unittest.main()
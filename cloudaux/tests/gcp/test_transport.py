@@ -0,0 +1,142 @@
+"""
+.. module: cloudaux.tests.gcp.test_transport
+    :platform: Unix
+    :copyright: (c) 2018 by Netflix Inc., see AUTHORS for more
+    :license: Apache, see LICENSE for more details.
+"""
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+import mock
+
+from apiclient.discovery import Resource
+
+from cloudaux.gcp import auth, config, transport
+from cloudaux.gcp.transport import DiscoveryCache, ThreadLocalHttp
+
+
+class TestTransport(unittest.TestCase):
+
+    def test_thread_local_http(self):
+        http_auth = ThreadLocalHttp(mock.Mock, credentials='creds')
+        self.assertEqual(http_auth.credentials, 'creds')
+
+        # Same thread, same Http:
+        self.assertIs(http_auth.http, http_auth.http)
+        http_auth.request('https://www.googleapis.com/', method='GET')
+        http_auth.http.request.assert_called_once_with('https://www.googleapis.com/', method='GET')
+
+        # Each thread gets its own:
+        seen = []
+        thread = threading.Thread(target=lambda: seen.append(http_auth.http))
+        thread.start()
+        thread.join()
+        self.assertIsNot(seen[0], http_auth.http)
+
+    def test_discovery_cache(self):
+        cache_dir = os.path.join(tempfile.mkdtemp(), 'discovery')
+        cache = DiscoveryCache(cache_dir, max_age=60)
+        url = 'https://www.googleapis.com/discovery/v1/apis/compute/v1/rest'
+
+        self.assertIsNone(cache.get(url))
+        cache.set(url, b'{"name": "compute"}')
+        self.assertEqual(cache.get(url), '{"name": "compute"}')
+        self.assertEqual(os.listdir(cache_dir), [os.path.basename(cache._path(url))])
+
+        # Kept in memory, even without a disk cache:
+        self.assertEqual(DiscoveryCache(max_age=60).get(url), '{"name": "compute"}')
+
+        # Expired:
+        cache.max_age = 0
+        time.sleep(0.01)
+        self.assertIsNone(cache.get(url))
+        transport._DOCUMENTS.clear()
+
+    def test_vendored_documents(self):
+        documents_dir = tempfile.mkdtemp()
+        fixture = os.path.join(os.path.dirname(__file__), 'fixtures', 'compute.json')
+        with open(fixture, 'rb') as f:
+            document = f.read()
+
+        http = mock.Mock()
+        http.request.return_value = (mock.Mock(status=200), document)
+        paths = transport.vendor_discovery_documents(documents_dir, services=['compute'], http=http)
+        self.assertEqual(paths, [os.path.join(documents_dir, 'compute.v1.json')])
+        http.request.assert_called_once_with('https://www.googleapis.com/discovery/v1/apis/compute/v1/rest')
+
+        http.request.return_value = (mock.Mock(status=404), b'')
+        with self.assertRaises(ValueError):
+            transport.vendor_discovery_documents(documents_dir, services=['nope'], http=http)
+
+        # Clients are built from the vendored document, without fetching it:
+        with mock.patch.object(config, 'DISCOVERY_DOCUMENTS_DIR', documents_dir), \
+                mock.patch.object(auth, 'build') as mock_build:
+            client = auth._build_google_client('compute', 'v1', http_auth=mock.Mock())
+            self.assertIsInstance(client, Resource)
+            self.assertFalse(mock_build.called)
+
+            # The document is only read once:
+            shutil.rmtree(documents_dir)
+            self.assertIsInstance(auth._build_google_client('compute', 'v1', http_auth=mock.Mock()), Resource)
+
+            # Not vendored:
+            auth._build_google_client('iam', 'v1', http_auth=mock.Mock())
+            self.assertTrue(mock_build.called)
+
+            # ...until it is:
+            os.makedirs(documents_dir)
+            shutil.copy(fixture, os.path.join(documents_dir, 'iam.v1.json'))
+            self.assertIsNotNone(transport.get_vendored_document(documents_dir, 'iam', 'v1'))
+
+        self.assertFalse(transport._DOCUMENTS)
+        transport._VENDORED_DOCUMENTS.clear()
+
+    def test_google_client_shared(self):
+        with mock.patch.object(auth, '_build_google_client') as mock_build, \
+                mock.patch.object(auth, '_get_credentials'):
+            mock_build.side_effect = lambda **kwargs: mock.Mock()
+            auth._GOOGLE_CLIENTS.clear()
+
+            client = auth.get_google_client(mod_name='compute', key_file=None, user_agent='cloudaux/test')
+            self.assertIs(client, auth.get_google_client(mod_name='compute', key_file=None,
+                                                         user_agent='cloudaux/test'))
+            self.assertIsInstance(mock_build.call_args[1]['http_auth'], ThreadLocalHttp)
+
+            self.assertIsNot(client, auth.get_google_client(mod_name='iam', key_file=None,
+                                                            user_agent='cloudaux/test'))
+            self.assertEqual(mock_build.call_count, 2)
+            auth._GOOGLE_CLIENTS.clear()
+
+    def test_google_client_built_per_key(self):
+        building = threading.Event()
+        release = threading.Event()
+        released = []
+
+        def slow_build(service=None, **kwargs):
+            if service == 'compute':
+                building.set()
+                released.append(release.wait(5))
+            return mock.Mock(service=service)
+
+        with mock.patch.object(auth, '_build_google_client', side_effect=slow_build), \
+                mock.patch.object(auth, '_get_credentials'):
+            auth._GOOGLE_CLIENTS.clear()
+            thread = threading.Thread(target=auth.get_google_client,
+                                      kwargs=dict(mod_name='compute', key_file=None))
+            thread.start()
+            building.wait(5)
+
+            # Another service isn't held up by the slow build:
+            self.assertEqual(auth.get_google_client(mod_name='iam', key_file=None).service, 'iam')
+            release.set()
+            thread.join()
+            self.assertEqual(released, [True])
+            auth._GOOGLE_CLIENTS.clear()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -7,9 +7,65 @@
 """
 import unittest
 
+import mock
+
 from cloudaux.gcp import utils
 
 
+class FakeBatch(object):
+    """Stand-in for BatchHttpRequest: requests named 'flaky' or 'broken' fail in the batch."""
+    def __init__(self, callback):
+        self.callback = callback
+        self.requests = []
+
+    def add(self, request, request_id=None):
+        self.requests.append((request_id, request))
+
+    def execute(self):
+        for request_id, request in self.requests:
+            if request.name in ('flaky', 'broken'):
+                self.callback(request_id, None, Exception('Rate Limit Exceeded'))
+            else:
+                self.callback(request_id, {'name': request.name}, None)
+
+
+def _make_request(name):
+    request = mock.Mock()
+    request.name = name
+    if name == 'broken':
+        request.execute.side_effect = Exception('Not Found')
+    else:
+        request.execute.return_value = {'name': name, 'retried': True}
+    return request
+
+
+class FakeListService(object):
+    """Stand-in for a paginated google-api-python-client collection."""
+    def __init__(self, pages):
+        self.pages = pages
+        self.executed = []
+
+    def _request(self, page):
+        request = mock.Mock()
+
+        def execute():
+            self.executed.append(page)
+            return self.pages[page]
+        request.execute.side_effect = execute
+        request.page = page
+        return request
+
+    def list(self, **kwargs):
+        return self._request(0)
+
+    def list_next(self, previous_request=None, previous_response=None):
+        page = previous_request.page + 1
+        return self._request(page) if page < len(self.pages) else None
+
+    aggregatedList = list
+    aggregatedList_next = list_next
+
+
 class TestUtils(unittest.TestCase):
     def test_get_creds_from_kwargs(self):
         data = {'project': 'my-project',
@@ -51,6 +107,70 @@ class TestUtils(unittest.TestCase):
         actual_no_change = utils.rewrite_kwargs('general', data)
         self.assertEqual(expected_no_change, actual_no_change)
 
+    def test_gce_list_iter(self):
+        for prefetch in (False, True):
+            service = FakeListService([{'items': [1, 2]}, {}, {'items': [3]}])
+            items = utils.gce_list_iter(service=service, prefetch=prefetch, project='my-project')
+
+            self.assertEqual(next(items), 1)
+            if not prefetch:
+                # Pages are only fetched as they are needed:
+                self.assertEqual(service.executed, [0])
+            self.assertEqual(list(items), [2, 3])
+            self.assertEqual(service.executed, [0, 1, 2])
+
+        service = FakeListService([{'items': [1, 2]}, {'items': [3]}])
+        self.assertEqual(utils.gce_list(service=service, project='my-project'), [1, 2, 3])
+
+    def test_gce_list_aggregated_iter(self):
+        service = FakeListService([
+            {'items': {'regions/us-central1': {'subnetworks': [1, 2]}, 'regions/us-east1': {'warning': {}}}},
+            {'items': {'regions/us-west1': {'subnetworks': [3]}}},
+        ])
+        self.assertEqual(list(utils.gce_list_aggregated_iter(service=service, key_name='subnetworks', prefetch=True)),
+                         [1, 2, 3])
+
+        service = FakeListService([
+            {'items': {'zones/us-central1-a': {'instances': [{'name': 'one'}]}, 'zones/us-east1-b': {'warning': {}}}},
+            {'items': {'zones/us-west1-c': {'instances': [{'name': 'two'}]}}},
+        ])
+        self.assertEqual(utils.gce_list_aggregated(service=service, key_name='instances', tag_location=True),
+                         [{'name': 'one', 'location': 'us-central1-a'}, {'name': 'two', 'location': 'us-west1-c'}])
+
+    def test_service_list_iter(self):
+        service = FakeListService([{'accounts': [1, 2]}, {'accounts': [3]}, {'other': True}])
+        self.assertEqual(utils.service_list(service=service, key_name='accounts'), [1, 2, 3, {'other': True}])
+
+        # Without a list_next, there is only the one page:
+        service = mock.Mock(spec=['list'])
+        service.list.return_value.execute.return_value = {'keys': [1]}
+        self.assertEqual(list(utils.service_list_iter(service=service, key_name='keys')), [1])
+
+    def test_batch_execute(self):
+        client = mock.Mock()
+        batches = []
+
+        def new_batch_http_request(callback=None):
+            batches.append(FakeBatch(callback))
+            return batches[-1]
+
+        client.new_batch_http_request.side_effect = new_batch_http_request
+
+        names = ['sa-%d' % i for i in range(5)] + ['flaky', 'broken']
+        requests = {name: _make_request(name) for name in names}
+        responses, exceptions = utils.batch_execute(client, requests, batch_size=3)
+
+        self.assertEqual(len(batches), 3)
+        self.assertEqual(sorted(responses), sorted(names[:-1]))
+        for name in names[:5]:
+            self.assertEqual(responses[name], {'name': name})
+            self.assertFalse(requests[name].execute.called)
+
+        # Failed sub-requests are retried individually:
+        self.assertEqual(responses['flaky'], {'name': 'flaky', 'retried': True})
+        self.assertEqual(list(exceptions), ['broken'])
+        self.assertEqual(str(exceptions['broken']), 'Not Found')
+
 
 if __name__ == '__main__':
     unittest.main()
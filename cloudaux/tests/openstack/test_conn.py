@@ -6,10 +6,14 @@
 .. moduleauthor:: Michael Stair <mstair@att.com>
 """
 import os
+import threading
 import unittest
 import mock
 
-from cloudaux.openstack.decorators import _connect, get_regions
+from keystoneauth1.exceptions import Unauthorized
+
+from cloudaux.openstack import decorators
+from cloudaux.openstack.decorators import _connect, get_regions, keystone_cached_conn
 
 class TestConn(unittest.TestCase):
 
@@ -25,6 +29,65 @@ class TestConn(unittest.TestCase):
         conn = _connect("mycloud", "RegionOne", self._get_fixture("test-clouds.yaml") )
         self.assertEqual(conn.name, "mycloud")
     
+    def test_connect_leaves_environ(self):
+        with mock.patch.dict(os.environ, {}, clear=True):
+            _connect("mycloud", "RegionOne", self._get_fixture("test-clouds.yaml"))
+            self.assertNotIn("OS_CLIENT_CONFIG_FILE", os.environ)
+
+    def test_cached_conn(self):
+        decorators.CACHE.clear()
+        conn = mock.Mock()
+        conn.session.auth.auth_ref.will_expire_soon.return_value = False
+        with mock.patch.object(decorators, '_connect', return_value=conn) as mock_connect:
+            self.assertIs(keystone_cached_conn("mycloud", "RegionOne", "clouds.yaml"), conn)
+            self.assertIs(keystone_cached_conn("mycloud", "RegionOne", "clouds.yaml"), conn)
+            self.assertEqual(mock_connect.call_count, 1)
+
+            # The token is checked locally, without a round trip:
+            self.assertFalse(conn.authorize.called)
+            self.assertFalse(conn.session.auth.get_access.called)
+
+            # About to expire, so it is refreshed:
+            conn.session.auth.auth_ref.will_expire_soon.return_value = True
+            self.assertIs(keystone_cached_conn("mycloud", "RegionOne", "clouds.yaml"), conn)
+            conn.session.auth.invalidate.assert_called_once_with()
+            conn.session.auth.get_access.assert_called_once_with(conn.session)
+
+            # Can't be refreshed, so it is reconnected:
+            conn.session.auth.get_access.side_effect = Unauthorized()
+            keystone_cached_conn("mycloud", "RegionOne", "clouds.yaml")
+            self.assertEqual(mock_connect.call_count, 2)
+
+        decorators.CACHE.clear()
+
+    def test_cached_conn_refresh_per_key(self):
+        decorators.CACHE.clear()
+        refreshing = threading.Event()
+        release = threading.Event()
+
+        def slow_refresh(conn):
+            if conn.name == 'slow':
+                refreshing.set()
+                release.wait(5)
+            return True
+
+        for name in ('slow', 'fast'):
+            conn = mock.Mock()
+            conn.name = name
+            decorators.CACHE[(name, "RegionOne", "clouds.yaml")] = (name, conn)
+
+        with mock.patch.object(decorators, '_refresh_token', side_effect=slow_refresh):
+            thread = threading.Thread(target=keystone_cached_conn, args=("slow", "RegionOne", "clouds.yaml"))
+            thread.start()
+            refreshing.wait(5)
+
+            # Another cloud isn't held up by the slow refresh:
+            self.assertEqual(keystone_cached_conn("fast", "RegionOne", "clouds.yaml").name, 'fast')
+            release.set()
+            thread.join()
+
+        decorators.CACHE.clear()
+
     def test_get_regions(self):
         regions = [{'name': u'RegionOne', 'values': {}}, {'name': u'RegionTwo', 'values': {}}]
         self.assertEqual(regions, get_regions("mycloud", self._get_fixture("test-clouds.yaml") ) )
@@ -0,0 +1,75 @@
+"""
+.. module: cloudaux.tests.openstack.test_decorators
+    :platform: Unix
+    :copyright: (c) 2018 by Netflix Inc., see AUTHORS for more
+    :license: Apache, see LICENSE for more details.
+"""
+import threading
+import time
+import unittest
+
+from cloudaux.openstack.decorators import iter_account_region, stream_account_region
+
+ACCOUNT_REGIONS = {
+    ('account-one', 'cloud-one', 'clouds.yaml'): ['RegionOne', 'RegionTwo', 'RegionThree'],
+    ('account-two', 'cloud-two', 'clouds.yaml'): ['RegionOne'],
+    ('broken', 'cloud-three', 'clouds.yaml'): ['RegionOne'],
+}
+
+
+class TestDecorators(unittest.TestCase):
+
+    def setUp(self):
+        self.lock = threading.Lock()
+        self.running = {}
+        self.max_running = {}
+
+    def _call(self, cloud_name):
+        with self.lock:
+            self.running[cloud_name] = self.running.get(cloud_name, 0) + 1
+            self.max_running[cloud_name] = max(self.max_running.get(cloud_name, 0), self.running[cloud_name])
+        time.sleep(0.02)
+        with self.lock:
+            self.running[cloud_name] -= 1
+
+    def test_iter_account_region(self):
+        @iter_account_region(ACCOUNT_REGIONS, max_workers=5, max_per_cloud=1)
+        def list_things(account_name=None, cloud_name=None, yaml_file=None, region=None, prefix=None):
+            self._call(cloud_name)
+            if account_name == 'broken':
+                return []
+            return [prefix, account_name, region]
+
+        results = list_things(prefix='thing')
+        self.assertEqual(sorted(results), sorted([
+            ['thing', 'account-one', 'RegionOne'],
+            ['thing', 'account-one', 'RegionTwo'],
+            ['thing', 'account-one', 'RegionThree'],
+            ['thing', 'account-two', 'RegionOne']]))
+        # In the order of the regions:
+        self.assertEqual([result[2] for result in results if result[1] == 'account-one'],
+                         ['RegionOne', 'RegionTwo', 'RegionThree'])
+        self.assertEqual(max(self.max_running.values()), 1)
+
+    def test_stream_account_region(self):
+        @stream_account_region(ACCOUNT_REGIONS, max_workers=5, max_per_cloud=2, buffer_size=2)
+        def iter_things(account_name=None, cloud_name=None, yaml_file=None, region=None):
+            self._call(cloud_name)
+            if account_name == 'broken':
+                raise ValueError('Unauthorized')
+            for i in range(3):
+                yield '{}-{}'.format(region, i)
+
+        results = list(iter_things())
+        items = [result for result in results if result.exception is None]
+        self.assertEqual(len(items), 12)
+        self.assertIn(('account-one', 'cloud-one', 'RegionTwo', 'RegionTwo-2', None), items)
+
+        errors = [result for result in results if result.exception is not None]
+        self.assertEqual([(error.account_name, error.item) for error in errors], [('broken', None)])
+        self.assertIsInstance(errors[0].exception, ValueError)
+        self.assertTrue(all(count <= 2 for count in self.max_running.values()))
+
+
+if __name__ == '__main__':
+    unittest.main()
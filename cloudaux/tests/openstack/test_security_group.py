@@ -0,0 +1,51 @@
+"""
+.. module: cloudaux.tests.openstack.test_security_group
+    :platform: Unix
+    :copyright: (c) 2018 by Netflix Inc., see AUTHORS for more
+    :license: Apache, see LICENSE for more details.
+"""
+import unittest
+
+import mock
+
+from cloudaux.orchestration.openstack import security_group
+
+
+class SecurityGroup(object):
+    def __init__(self, name):
+        self.id = name
+        self.name = name
+        self.security_group_rules = []
+
+
+class Server(object):
+    def __init__(self, id, group_names):
+        self.id = id
+        self.security_groups = [{'name': name} for name in group_names]
+
+
+class TestSecurityGroup(unittest.TestCase):
+
+    def test_iter_security_groups(self):
+        groups = [SecurityGroup('web'), SecurityGroup('db'), SecurityGroup('unused')]
+        servers = [Server('i-1', ['web']), Server('i-2', ['web', 'db'])]
+
+        with mock.patch.object(security_group, 'iter_items', return_value=iter(groups)), \
+                mock.patch.object(security_group, 'list_items', return_value=servers) as mock_list, \
+                mock.patch.object(security_group, '_index_instances',
+                                  wraps=security_group._index_instances) as mock_index:
+            results = list(security_group.iter_security_groups(cloud_name='mycloud', region='RegionOne',
+                                                               yaml_file='clouds.yaml'))
+
+            # The servers are listed and indexed once, rather than once per group:
+            self.assertEqual(mock_list.call_count, 1)
+            self.assertEqual(mock_index.call_count, 1)
+
+        self.assertEqual([r['name'] for r in results], ['web', 'db', 'unused'])
+        self.assertEqual(results[0]['assigned_to'], [{'instance_id': 'i-1'}, {'instance_id': 'i-2'}])
+        self.assertEqual(results[1]['assigned_to'], [{'instance_id': 'i-2'}])
+        self.assertEqual(results[2]['assigned_to'], [])
+
+
+if __name__ == '__main__':
+    unittest.main()
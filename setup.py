@@ -51,6 +51,11 @@ openstack_require = [
     'openstacksdk>=0.13.0'
 ]
 
+# For reading Parquet and ORC S3 Inventory reports (CSV reports need nothing extra):
+s3_inventory_require = [
+    'pyarrow'
+]
+
 tests_require = [
     'pytest',
     'pytest-cov',
@@ -82,6 +87,7 @@ setup(
     extras_require={
         'gcp': gcp_require,
         'openstack': openstack_require,
+        's3_inventory': s3_inventory_require,
         'tests': tests_require,
         'docs': docs_require,
         'dev': dev_require